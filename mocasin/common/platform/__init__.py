@@ -10,7 +10,7 @@ import math
 from collections import Counter
 from enum import Enum
 from hydra.utils import to_absolute_path
-from mocasin.platforms.utils import simpleDijkstra, yxRouting
+from mocasin.platforms.utils import RoutingTable, simpleDijkstra, yxRouting
 from mocasin.platforms.topologies import meshTopology
 
 log = logging.getLogger(__name__)
@@ -25,6 +25,11 @@ class CommunicationResourceType(Enum):
 
 
 class FrequencyDomain:
+    # Counts the frequency changes of all frequency domains. This allows to
+    # detect whether values derived from frequencies (e.g., cached
+    # communication costs) are outdated.
+    generation = 0
+
     def __init__(self, name, frequency):
         self.name = name
         self.frequency = frequency
@@ -37,6 +42,16 @@ class FrequencyDomain:
         # model and never changed. The actual running frequency, i.e. "frequency", is
         # modified at runtime according to the number of running threads in the processor.
 
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, frequency):
+        if getattr(self, "_frequency", None) != frequency:
+            FrequencyDomain.generation += 1
+        self._frequency = frequency
+
     def cycles_to_ticks(self, cycles):
         tmp = float(cycles) * 1000000000000 / float(self.frequency)
         return int(round(tmp))
@@ -160,6 +175,10 @@ class CommunicationResource(object):
             1
         )
 
+    @property
+    def frequency_domain(self):
+        return self._frequency_domain
+
     def frequency_domain_name(self):
         return self._frequency_domain.name
 
@@ -245,6 +264,10 @@ class Primitive:
     to the primitive may communicate using this primitive.
     """
 
+    # Counts the modifications of all primitives. This allows to detect
+    # whether indexes of suitable primitives are outdated.
+    generation = 0
+
     def __init__(self, name):
         self.name = name
         self.consume_phases = {}
@@ -262,6 +285,7 @@ class Primitive:
                 raise RuntimeError("A consumer can only use read phases")
         self.consume_phases[sink.name] = phases
         self.consumers.append(sink)
+        Primitive.generation += 1
 
     def add_producer(self, src, phases):
         if src.name in self.produce_phases:
@@ -271,6 +295,7 @@ class Primitive:
                 raise RuntimeError("A producer can only use produces phases")
         self.produce_phases[src.name] = phases
         self.producers.append(src)
+        Primitive.generation += 1
 
     def static_consume_costs(self, sink_processor, token_size=8):
         """Returns the total (static) costs for a consume operation
@@ -426,6 +451,10 @@ class Platform(object):
         self._communication_resources = {}  #: dict of communication resources
         self._primitives = {}  #: dict of communication primitives
         self._schedulers = {}  #: dict of schedulers
+        # index of suitable primitives (see suitable_primitives())
+        self._suitable_primitives = {}
+        self._primitives_by_producer = None
+        self._primitive_index_key = None
         self.network = {}
         self.nocs = {}
         if symmetries_json is not None:
@@ -524,6 +553,64 @@ class Platform(object):
                 "Primitive %s was already added to the platform" % (x.name)
             )
         self._primitives[x.name] = x
+        self._primitives_by_producer = None
+
+    def suitable_primitives(self, src, sinks, token_size=None):
+        """Get all primitives that are suitable to implement a channel.
+
+        The result is looked up in an index, which is built lazily. The
+        index is invalidated when primitives are added or modified, or when
+        a frequency changes.
+
+        Args:
+            src (Processor): the processor the channel's source is mapped to
+            sinks (list of Processor): the processors the channel's sinks are
+                mapped to
+            token_size (int, optional): If given, the primitives are sorted
+                by their static costs for tokens of this size. For multiple
+                sinks, the average costs over the sink processors are used.
+                Otherwise, the primitives are ordered as in
+                :meth:`primitives`.
+
+        Returns:
+            tuple of Primitive: the suitable primitives
+        """
+        assert len(sinks) > 0
+        key = (Primitive.generation, FrequencyDomain.generation)
+        if self._primitives_by_producer is None or (
+            self._primitive_index_key != key
+        ):
+            self._primitive_index_key = key
+            self._suitable_primitives = {}
+            self._primitives_by_producer = {}
+            for prim in self._primitives.values():
+                for producer in prim.producers:
+                    self._primitives_by_producer.setdefault(
+                        producer, []
+                    ).append(prim)
+
+        sinks = frozenset(sinks)
+        lookup = (src, sinks, token_size)
+        result = self._suitable_primitives.get(lookup)
+        if result is None:
+            if token_size is None:
+                result = tuple(
+                    prim
+                    for prim in self._primitives_by_producer.get(src, ())
+                    if prim.is_suitable(src, sinks)
+                )
+            else:
+                result = tuple(
+                    sorted(
+                        self.suitable_primitives(src, sinks),
+                        key=lambda prim: sum(
+                            prim.static_costs(src, s, token_size) for s in sinks
+                        )
+                        / len(sinks),
+                    )
+                )
+            self._suitable_primitives[lookup] = result
+        return result
 
     def get_processor_types(self):
         """Returns the counter of processors of each type."""
@@ -680,21 +767,43 @@ class Platform(object):
         return latency_dict
 
     def generate_all_primitives(self):
-        for pe1 in self.processors():
-            for pe2 in self.processors():
-                prim = self.generate_primitive(pe1, pe2)
+        # compute the routes between all processors once, instead of
+        # searching a route for each pair
+        processors = list(self.processors())
+        routing = RoutingTable(self.network, sources=processors)
+        noc_routing = {
+            name: RoutingTable(noc[0])
+            for name, noc in self.nocs.items()
+            if noc[1] != meshTopology
+        }
+        for pe1 in processors:
+            for pe2 in processors:
+                prim = self.generate_primitive(pe1, pe2, routing, noc_routing)
                 self.add_primitive(prim[0])
 
-    def generate_primitive(self, src, sink):
+    def generate_primitive(self, src, sink, routing=None, noc_routing=None):
+        """Generate a primitive for communication from `src` to `sink`.
+
+        Args:
+            src (Processor): the producing processor
+            sink (Processor): the consuming processor
+            routing (RoutingTable, optional): precomputed routes in the
+                platform network. If None, the route is searched.
+            noc_routing (dict, optional): precomputed routes within each NoC
+                that does not use Y-X routing, keyed by the NoC name
+        """
         platform = self
 
         # check if nodes are in the same noc
-        nocResources = self.find_resources_for_Noc(src, sink)
+        nocResources = self.find_resources_for_Noc(src, sink, noc_routing)
         resources = nocResources
 
         # if not in the same noc, apply simpleDijkstra routing algorithm
         if not nocResources:
-            resources = simpleDijkstra(platform.network, src, sink)
+            if routing is not None:
+                resources = routing.route(src, sink)
+            else:
+                resources = simpleDijkstra(platform.network, src, sink)
             # fill with physical links
             resources = self.find_physical_links(resources)
 
@@ -746,7 +855,7 @@ class Platform(object):
 
     # checks if nodes are in a same Noc and returns communication
     # resources
-    def find_resources_for_Noc(self, src, sink):
+    def find_resources_for_Noc(self, src, sink, noc_routing=None):
         platform = self
 
         # get all routers the src is connected to
@@ -783,6 +892,8 @@ class Platform(object):
         if sameNoc:
             if v[1] == meshTopology:
                 resources = yxRouting(v[0], src_router, sink_router)
+            elif noc_routing is not None and k in noc_routing:
+                resources = noc_routing[k].route(src_router, sink_router)
             else:
                 resources = simpleDijkstra(v[0], src_router, sink_router)
             resources.insert(0, src)
@@ -21,3 +21,12 @@ def test_cycles_to_ticks(frequency_domain):
     frequency_domain.frequency = 20
     # one cycle should be 50 ms at 20Hz
     assert frequency_domain.cycles_to_ticks(1) == 50000000000
+
+
+def test_generation(frequency_domain):
+    generation = frequency_domain.generation
+    # assigning the current frequency is not a change
+    frequency_domain.frequency = 1500000000
+    assert frequency_domain.generation == generation
+    frequency_domain.frequency = 20
+    assert frequency_domain.generation == generation + 1
@@ -9,6 +9,7 @@ import pytest
 from mocasin.common.platform import (
     CommunicationResource,
     CommunicationPhase,
+    Platform,
     Primitive,
 )
 
@@ -213,3 +214,45 @@ def test_multi_phase_primitive(
     assert prim.static_costs(src, sink) == expected_costs_8
     assert prim.static_costs(src, sink, 100) == expected_costs_100
     assert prim.static_costs(src, sink, 8) <= prim.static_costs(src, sink, 16)
+
+
+def test_suitable_primitives(
+    slow_resource, mediocre_resource, fast_resource, mocker
+):
+    pe0 = mocker.Mock(name="pe0")
+    pe1 = mocker.Mock(name="pe1")
+    pe2 = mocker.Mock(name="pe2")
+    pe0.name, pe1.name, pe2.name = "pe0", "pe1", "pe2"
+
+    def make_primitive(name, resource, producers, consumers):
+        prim = Primitive(name)
+        for pe in producers:
+            prim.add_producer(
+                pe, [CommunicationPhase("write", [resource], "write")]
+            )
+        for pe in consumers:
+            prim.add_consumer(
+                pe, [CommunicationPhase("read", [resource], "read")]
+            )
+        return prim
+
+    platform = Platform("platform")
+    slow = make_primitive("slow", slow_resource, [pe0, pe1], [pe1, pe2])
+    platform.add_primitive(slow)
+    fast = make_primitive("fast", fast_resource, [pe0], [pe1])
+    platform.add_primitive(fast)
+
+    assert platform.suitable_primitives(pe0, [pe1]) == (slow, fast)
+    assert platform.suitable_primitives(pe0, [pe1], 8) == (fast, slow)
+    assert platform.suitable_primitives(pe0, [pe1, pe2]) == (slow,)
+    assert platform.suitable_primitives(pe1, [pe1]) == (slow,)
+    assert platform.suitable_primitives(pe2, [pe1]) == ()
+
+    # the index is updated when primitives are added or modified
+    mediocre = make_primitive("mediocre", mediocre_resource, [pe2], [pe1])
+    platform.add_primitive(mediocre)
+    assert platform.suitable_primitives(pe2, [pe1]) == (mediocre,)
+    fast.add_consumer(
+        pe2, [CommunicationPhase("read", [fast_resource], "read")]
+    )
+    assert platform.suitable_primitives(pe0, [pe1, pe2], 8) == (fast, slow)
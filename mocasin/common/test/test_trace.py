@@ -3,11 +3,15 @@
 #
 # Authors: Christian Menard
 
+import pickle
+
 from mocasin.common.trace import (
+    CompiledTrace,
     DataflowTrace,
     EmptyTrace,
     ComputeSegment,
     ReadTokenSegment,
+    SegmentType,
     WriteTokenSegment,
 )
 
@@ -49,3 +53,80 @@ def test_accumulate_processor_cycles():
     assert trace.accumulate_processor_cycles("empty") is None
     assert trace.accumulate_processor_cycles("baz") == {"A": 100, "B": 1000}
     assert trace.accumulate_processor_cycles("bar") == {"A": 200, "B": 2000}
+
+
+class ChannelTrace(DataflowTrace):
+    def get_trace(self, process):
+        if process == "foo":
+            yield ReadTokenSegment("c0", 1)
+            yield WriteTokenSegment("c1", 2)
+        if process == "bar":
+            yield ReadTokenSegment("c0", 1)
+            yield ComputeSegment({"A": 100, "B": 1000})
+            yield WriteTokenSegment("c1", 4)
+            yield ComputeSegment({"A": 50, "B": 500})
+            yield ComputeSegment({"A": 100, "B": 1000})
+            yield ReadTokenSegment("c2", 3)
+            yield ComputeSegment({"A": 20, "B": 200})
+            yield WriteTokenSegment("c1", 4)
+
+
+def _segment_tuples(segments):
+    for s in segments:
+        if s.segment_type == SegmentType.COMPUTE:
+            yield (s.segment_type, dict(s.processor_cycles))
+        else:
+            yield (s.segment_type, s.channel, s.num_tokens)
+
+
+def test_compiled_trace():
+    trace = ChannelTrace()
+    compiled = CompiledTrace(trace)
+
+    for process in ["foo", "bar", "empty"]:
+        expected = list(_segment_tuples(trace.get_trace(process)))
+        assert list(_segment_tuples(compiled.get_trace(process))) == expected
+        cursor = compiled.get_compiled_trace(process).cursor()
+        assert list(_segment_tuples(cursor)) == expected
+        assert compiled.accumulate_processor_cycles(
+            process
+        ) == trace.accumulate_processor_cycles(process)
+
+    # the trace is compiled only once
+    assert compiled.get_compiled_trace("bar") is compiled.get_compiled_trace(
+        "bar"
+    )
+
+
+def test_compiled_trace_cursor_seek():
+    compiled = CompiledTrace(ChannelTrace()).get_compiled_trace("bar")
+    assert len(compiled) == 8
+    cursor = compiled.cursor()
+    segments = list(_segment_tuples(cursor))
+    cursor.seek(3)
+    assert list(_segment_tuples(cursor)) == segments[3:]
+    cursor.seek(0)
+    assert list(_segment_tuples(cursor)) == segments
+
+
+def test_compiled_trace_missing_cycles():
+    class PartialTrace(DataflowTrace):
+        def get_trace(self, process):
+            yield ComputeSegment({"A": 10, "B": 20})
+            yield ComputeSegment({"A": 1.5})
+
+    compiled = CompiledTrace(PartialTrace())
+    segments = list(compiled.get_trace("foo"))
+    assert segments[0].processor_cycles == {"A": 10, "B": 20}
+    assert segments[1].processor_cycles == {"A": 1.5}
+    assert compiled.accumulate_processor_cycles("foo") == {"A": 11.5, "B": 20}
+
+
+def test_compiled_trace_pickle():
+    compiled = CompiledTrace(ChannelTrace()).get_compiled_trace("bar")
+    compiled.processor_cycles(1)
+    restored = pickle.loads(pickle.dumps(compiled))
+    assert list(_segment_tuples(restored.segments())) == list(
+        _segment_tuples(compiled.segments())
+    )
+    assert restored.total_cycles() == {"A": 270, "B": 2700}
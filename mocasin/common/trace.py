@@ -7,6 +7,8 @@ import copy
 import enum
 import logging
 
+import numpy as np
+
 log = logging.getLogger(__name__)
 
 
@@ -28,6 +30,8 @@ class _BaseSegment:
        segment_type (SegmentType): The type of the segment to be created
     """
 
+    __slots__ = ("_segment_type",)
+
     def __init__(self, segment_type):
         self._segment_type = segment_type = segment_type
 
@@ -49,6 +53,8 @@ class ComputeSegment(_BaseSegment):
             respective number of computation cycles for this segment.
     """
 
+    __slots__ = ("_processor_cycles",)
+
     def __init__(self, processor_cycles):
         super().__init__(SegmentType.COMPUTE)
         self._processor_cycles = processor_cycles
@@ -72,6 +78,8 @@ class ReadTokenSegment(_BaseSegment):
         num_tokens (int): The number of data tokens to read
     """
 
+    __slots__ = ("_channel", "_num_tokens")
+
     def __init__(self, channel, num_tokens):
         super().__init__(SegmentType.READ_TOKEN)
         self._channel = channel
@@ -104,6 +112,8 @@ class WriteTokenSegment(_BaseSegment):
         num_tokens (int): The number of data tokens to write
     """
 
+    __slots__ = ("_channel", "_num_tokens")
+
     def __init__(self, channel, num_tokens):
         super().__init__(SegmentType.WRITE_TOKEN)
         self._channel = channel
@@ -210,3 +220,313 @@ class EmptyTrace(DataflowTrace):
         )
         return
         yield
+
+
+# maps the values stored in compiled traces to segment types
+_SEGMENT_TYPES = {t.value: t for t in SegmentType}
+
+
+class CompiledProcessTrace:
+    """A compact, array-based representation of a process trace.
+
+    Instead of storing one object per segment, the trace is stored in columns
+    of NumPy arrays. Each segment is described by its type, the index of the
+    accessed channel, the number of tokens, and the index of a row in the
+    table of processor cycles. Since the processor cycles of compute segments
+    repeat frequently, the cycles table only contains unique rows.
+
+    A compiled trace is meant to be created once and replayed many times.
+    Objects of this class should be considered immutable.
+
+    Use :meth:`from_segments` to compile a trace.
+
+    Attributes:
+        segment_types (numpy.ndarray): the segment type values
+        channels (numpy.ndarray): indexes into :attr:`channel_names`, -1 for
+            compute segments
+        num_tokens (numpy.ndarray): number of tokens of read and write
+            segments, 0 for compute segments
+        cycle_rows (numpy.ndarray): indexes into :attr:`cycles`, -1 for read
+            and write segments
+        cycles (numpy.ndarray): a table of processor cycles with one column
+            per processor type
+        channel_names (tuple of str): names of the accessed channels
+        processor_types (tuple of str): processor types of the columns in
+            :attr:`cycles`
+    """
+
+    def __init__(
+        self,
+        segment_types,
+        channels,
+        num_tokens,
+        cycle_rows,
+        cycles,
+        channel_names,
+        processor_types,
+        total_cycles,
+    ):
+        self.segment_types = segment_types
+        self.channels = channels
+        self.num_tokens = num_tokens
+        self.cycle_rows = cycle_rows
+        self.cycles = cycles
+        self.channel_names = channel_names
+        self.processor_types = processor_types
+        self._total_cycles = total_cycles
+        self._processor_cycles = [None] * len(cycles)
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Compile a sequence of trace segments.
+
+        Args:
+            segments (iterable): the segments of a process trace as produced
+                by :meth:`DataflowTrace.get_trace`
+
+        Returns:
+            CompiledProcessTrace: the compiled trace
+        """
+        segment_types = []
+        channels = []
+        num_tokens = []
+        cycle_rows = []
+        channel_names = {}
+        processor_types = {}
+        rows = {}
+        total_cycles = None
+
+        for s in segments:
+            segment_types.append(s.segment_type.value)
+            if s.segment_type == SegmentType.COMPUTE:
+                cycles = s.processor_cycles
+                for t in cycles:
+                    processor_types.setdefault(t, len(processor_types))
+                key = tuple(sorted(cycles.items()))
+                cycle_rows.append(rows.setdefault(key, len(rows)))
+                channels.append(-1)
+                num_tokens.append(0)
+                # accumulate cycles in the same way as
+                # DataflowTrace.accumulate_processor_cycles
+                if total_cycles is None:
+                    total_cycles = dict(cycles)
+                else:
+                    for k, v in cycles.items():
+                        total_cycles[k] += v
+            else:
+                channel = channel_names.setdefault(
+                    s.channel, len(channel_names)
+                )
+                channels.append(channel)
+                num_tokens.append(s.num_tokens)
+                cycle_rows.append(-1)
+
+        # Build the cycles table. Cycles that are not defined for a
+        # processor type are stored as NaN.
+        values = [v for key in rows for _, v in key]
+        integral = all(isinstance(v, (int, np.integer)) for v in values)
+        complete = all(len(key) == len(processor_types) for key in rows)
+        shape = (len(rows), len(processor_types))
+        if integral and complete:
+            table = np.zeros(shape, dtype=np.int64)
+        else:
+            table = np.full(shape, np.nan)
+        for key, row in rows.items():
+            for t, v in key:
+                table[row, processor_types[t]] = v
+
+        return cls(
+            np.array(segment_types, dtype=np.uint8),
+            np.array(channels, dtype=np.int32),
+            np.array(num_tokens, dtype=np.int64),
+            np.array(cycle_rows, dtype=np.int32),
+            table,
+            tuple(channel_names),
+            tuple(processor_types),
+            total_cycles,
+        )
+
+    def __len__(self):
+        return len(self.segment_types)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # do not ship the lazily created dicts
+        state["_processor_cycles"] = [None] * len(self.cycles)
+        return state
+
+    def total_cycles(self):
+        """Get the accumulated cycles of all compute segments.
+
+        Returns:
+           (dict of str: int): A dict mapping processor types to the respective
+                number of total computation cycles.
+           None: If the trace does not contain any compute segments
+        """
+        if self._total_cycles is None:
+            return None
+        return dict(self._total_cycles)
+
+    def processor_cycles(self, index):
+        """Get the processor cycles of a compute segment.
+
+        The returned dicts are created on first access and shared by all
+        subsequent calls. They must not be modified.
+
+        Args:
+            index (int): index of a compute segment
+
+        Returns:
+            (dict of str: int): A mapping of processor types to the
+                respective number of computation cycles for this segment.
+        """
+        row = self.cycle_rows[index]
+        cycles = self._processor_cycles[row]
+        if cycles is None:
+            cycles = {
+                t: v
+                for t, v in zip(self.processor_types, self.cycles[row].tolist())
+                if v == v  # skip NaN
+            }
+            self._processor_cycles[row] = cycles
+        return cycles
+
+    def segments(self):
+        """Replay the trace as segment objects.
+
+        Yields:
+            ComputeSegment, ReadTokenSegment, or WriteTokenSegment: The next
+                segment in the process trace
+        """
+        for i, segment_type in enumerate(self.segment_types.tolist()):
+            if segment_type == SegmentType.COMPUTE.value:
+                yield ComputeSegment(self.processor_cycles(i))
+            else:
+                channel = self.channel_names[self.channels[i]]
+                num_tokens = int(self.num_tokens[i])
+                if segment_type == SegmentType.READ_TOKEN.value:
+                    yield ReadTokenSegment(channel, num_tokens)
+                else:
+                    yield WriteTokenSegment(channel, num_tokens)
+
+    def cursor(self):
+        """Get a cursor for replaying the trace without segment objects.
+
+        Returns:
+            CompiledTraceCursor: a new cursor positioned before the first
+                segment
+        """
+        return CompiledTraceCursor(self)
+
+
+class CompiledTraceCursor:
+    """An iterator over a compiled process trace.
+
+    The cursor provides the same interface as a trace segment, describing the
+    segment at the current position. Advancing the cursor with :func:`next`
+    returns the cursor itself. Thus, replaying a trace does not allocate an
+    object per segment. Note that references to the segment returned by
+    :func:`next` become invalid when the cursor advances.
+
+    Args:
+        trace (CompiledProcessTrace): the trace to iterate over
+    """
+
+    __slots__ = ("_trace", "_index", "segment_type", "channel", "num_tokens")
+
+    def __init__(self, trace):
+        self._trace = trace
+        self._index = -1
+        self.segment_type = None
+        self.channel = None
+        self.num_tokens = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        trace = self._trace
+        index = self._index + 1
+        if index >= len(trace):
+            raise StopIteration
+        self._index = index
+        segment_type = _SEGMENT_TYPES[int(trace.segment_types[index])]
+        self.segment_type = segment_type
+        if segment_type == SegmentType.COMPUTE:
+            self.channel = None
+            self.num_tokens = None
+        else:
+            self.channel = trace.channel_names[trace.channels[index]]
+            self.num_tokens = int(trace.num_tokens[index])
+        return self
+
+    @property
+    def processor_cycles(self):
+        """Processor cycles of the current compute segment"""
+        return self._trace.processor_cycles(self._index)
+
+    def seek(self, index):
+        """Move the cursor, such that the next segment is at `index`."""
+        self._index = index - 1
+
+
+class CompiledTrace(DataflowTrace):
+    """A trace that compiles and caches the traces of another trace.
+
+    The trace of each process is compiled to a :class:`CompiledProcessTrace`
+    on first access and kept for all later accesses. This is useful if the
+    same trace is replayed many times, for instance, when simulating many
+    mappings of the same application. The runtime processes of the simulation
+    replay compiled traces directly without creating segment objects.
+
+    Args:
+        trace (DataflowTrace): the trace to compile
+    """
+
+    def __init__(self, trace):
+        self.trace = trace
+        self._compiled = {}
+
+    def get_compiled_trace(self, process):
+        """Get the compiled trace of a process.
+
+        Args:
+            process (str): Name of the process to get a trace for
+
+        Returns:
+            CompiledProcessTrace: the compiled trace
+        """
+        compiled = self._compiled.get(process)
+        if compiled is None:
+            log.debug(f"compile the trace of process {process}")
+            compiled = CompiledProcessTrace.from_segments(
+                self.trace.get_trace(process)
+            )
+            self._compiled[process] = compiled
+        return compiled
+
+    def get_trace(self, process):
+        """Get the trace for a specific process/actor in the dataflow app
+
+        Args:
+            process (str): Name of the process to get a trace for
+
+        Yields:
+            ComputeSegment: if the next segment is a compute segment
+            ReadTokenSegment: if the next segment is a read segment
+            WriteTokenSegment: if the next segment is a write segment
+        """
+        yield from self.get_compiled_trace(process).segments()
+
+    def accumulate_processor_cycles(self, process):
+        """Calculate the total (accumulated) cycles of all compute segments
+
+        Args:
+            process (str): Name of the process to get accumulated cycles for
+
+        Return
+           (dict of str: int): A dict mapping processor types to the respective
+                number of total computation cycles for the given process.
+           None: If the trace for process does not contain any compute segments
+        """
+        return self.get_compiled_trace(process).total_cycles()
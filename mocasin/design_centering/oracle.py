@@ -3,19 +3,45 @@
 #
 # Authors: Gerald Hempel, Andres Goens
 
+import math
+import multiprocessing as mp
 import sys
 import traceback
 
+import cloudpickle
 import pint
+from hydra.core.hydra_config import HydraConfig
 
 from mocasin.mapper.partial import ProcPartialMapper, ComPartialMapper
 from mocasin.mapper.random import RandomPartialMapper
-from mocasin.mapper.utils import run_simulation
+from mocasin.mapper.utils import (
+    encode_mapping,
+    init_simulation_worker,
+    run_simulation_worker,
+    run_simulation,
+)
 from mocasin.simulate import DataflowSimulation
 from mocasin.util import logging
 
 log = logging.getLogger(__name__)
 
+# Creating a unit registry is expensive, so all oracles share one.
+_ureg = pint.UnitRegistry()
+
+
+def _run_sample_worker(task):
+    """Simulate a sample inside a worker process.
+
+    In contrast to :func:`run_simulation_worker`, a failing simulation does
+    not abort the whole batch. Instead, no result and the formatted
+    exception are returned.
+    """
+    try:
+        result, _ = run_simulation_worker(task)
+    except Exception:
+        return None, traceback.format_exc()
+    return result, None
+
 
 class Oracle(object):
     def __init__(
@@ -52,12 +78,6 @@ class Oracle(object):
         res = []
         self.prepare_sim_contexts_for_samples(samples)
 
-        for s in samples:
-            mapping = tuple(s.getMapping().to_list())
-            if mapping in self.cache:
-                log.debug(f"skipping simulation for mapping {mapping}: cached.")
-                s.sim_context.result = self.cache[mapping]
-
         if self.oracle_type != "simulation":
             for s in samples:
                 res.append(self.is_feasible(s.sample2simpleTuple))
@@ -68,9 +88,23 @@ class Oracle(object):
 
 
 class Simulation(Oracle):
-    """simulation code"""
+    """simulation code
+
+    The simulation results are cached by the canonical mapping vector of the
+    samples, i.e., by the vector of the mapping in the representation of the
+    sample. Thus, samples that were already simulated in a previous iteration
+    (or that are equivalent to such a sample) are not simulated again. If
+    multiple threads are used, the simulations run on a worker pool that is
+    created on first use and kept alive until :meth:`close` is called.
+
+    Samples whose simulation fails are logged and considered infeasible.
+    If `fast_path` is set, the simulations use the low-overhead mode of the
+    runtime processes, which yields identical results.
+    """
 
-    def __init__(self, graph, platform, trace, threshold, threads=1):
+    def __init__(
+        self, graph, platform, trace, threshold, threads=1, fast_path=True
+    ):
         self.graph = graph
         self.platform = platform
         self.trace = trace
@@ -80,10 +114,87 @@ class Simulation(Oracle):
             self.graph, self.platform, self.comMapGen
         )
         self.threads = threads
+        self.fast_path = fast_path
         self.threshold = threshold
+        # Only the feasibility is of interest. Thus, simulations can be
+        # aborted as soon as they exceed the threshold.
+        self._time_budget = _ureg(threshold).to(_ureg.ps).magnitude
         self.cache = {}
         self.total_cached = 0
         self.oracle_type = "simulation"
+        self._pool = None
+
+    def _get_pool(self):
+        """Get the worker pool, create it on first use."""
+        if self._pool is None:
+            # Logging is not configured in the spawned processes on mac OS.
+            # As a workaround, we pass the hydra configuration to the child
+            # processes (see SimulationManager).
+            cfg_pickled = None
+            if HydraConfig.initialized():
+                cfg_pickled = cloudpickle.dumps(HydraConfig.get())
+            self._pool = mp.Pool(
+                processes=self.threads,
+                initializer=init_simulation_worker,
+                initargs=(
+                    self.platform,
+                    self.graph,
+                    self.trace,
+                    self.fast_path,
+                    cfg_pickled,
+                ),
+            )
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool if it is running."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    def share_cache(self, other):
+        """Share the cache of simulation results with another oracle.
+
+        Afterwards, results simulated by either oracle are reused by both.
+        The oracles need to use the same threshold.
+        """
+        if not math.isclose(other._time_budget, self._time_budget):
+            raise ValueError("Cannot share the cache of different thresholds")
+        self.cache = other.cache
+
+    def cache_key(self, sample):
+        """The canonical mapping vector of a sample with a sim context."""
+        mapping = sample.getMapping()
+        if sample.representation is None:
+            return tuple(mapping.to_list())
+        return tuple(sample.representation.toRepresentation(mapping))
+
+    def check_feasibility(self, sample):
+        """Set the feasibility of a simulated sample according to the
+        threshold.
+
+        Samples without a simulation result (because the simulation failed)
+        are infeasible.
+        """
+        result = sample.sim_context.result
+        if result is None:
+            sample.setFeasibility(False)
+            return False
+        feasible = not result.censored and result.exec_time <= self._time_budget
+        sample.setFeasibility(feasible)
+        return feasible
 
     def prepare_sim_contexts_for_samples(self, samples):
         """Prepare simualtion/application context and mapping for a each element
@@ -101,7 +212,12 @@ class Simulation(Oracle):
     def prepare_sim_context(self, mapping):
         sim_mapping = self.dcMapGen.generate_mapping(mapping.to_list())
         sim_context = DataflowSimulation(
-            self.platform, self.graph, sim_mapping, self.trace
+            self.platform,
+            self.graph,
+            sim_mapping,
+            self.trace,
+            fast_path=self.fast_path,
+            time_budget=self._time_budget,
         )
         log.debug("Mapping toList: {}".format(sim_mapping.to_list()))
         return sim_context
@@ -110,50 +226,78 @@ class Simulation(Oracle):
         """Checks if a set of samples is feasible in context of a given timing
         threshold.
 
-        Trigger the simulation on 4 for parallel jobs and process the resulting
-        array of simulation results according to the given threshold.
+        Samples whose canonical mapping vector is already in the cache are
+        not simulated again. The remaining distinct mappings are simulated,
+        in parallel if more than one thread is used, and the resulting
+        simulation results are checked against the threshold.
         """
-        results = []
-        # run simulations and search for the best mapping
-        if len(samples) > 1 and self.threads > 1:
-            # run parallel simulation for more than one sample in samples list
-            from multiprocessing import Pool
+        # look up cached results and find the distinct mappings to simulate
+        pending = {}
+        for s in samples:
+            if s.sim_context.result is not None:
+                self.total_cached += 1
+                continue
+            key = self.cache_key(s)
+            if key in self.cache:
+                log.debug(f"skipping simulation for mapping {key}: cached.")
+                s.sim_context.result = self.cache[key]
+                self.total_cached += 1
+            elif key in pending:
+                pending[key].append(s)
+                self.total_cached += 1
+            else:
+                pending[key] = [s]
 
+        to_simulate = [group[0] for group in pending.values()]
+        if len(to_simulate) > 1 and self.threads > 1:
             log.debug(
                 "Running parallel simulation for {} samples".format(
-                    len(samples)
+                    len(to_simulate)
                 )
             )
-            pool = Pool(processes=self.threads, maxtasksperchild=100)
-            results = list(
-                pool.map(self.run_simulation, samples, chunksize=self.threads)
+            pool = self._get_pool()
+            simulated = pool.imap(
+                _run_sample_worker,
+                [
+                    (encode_mapping(s.getMapping()), self._time_budget, None)
+                    for s in to_simulate
+                ],
+                chunksize=max(1, len(to_simulate) // self.threads),
             )
+            for s, (result, error) in zip(to_simulate, simulated):
+                if error is not None:
+                    log.warning(
+                        "Simulation of mapping {} failed, considering it "
+                        "infeasible:\n{}".format(
+                            s.getMapping().to_list(), error
+                        )
+                    )
+                s.sim_context.result = result
         else:
-            # results list of simulation contexts
             log.debug("Running single simulation")
-            results = list(map(self.run_simulation, samples))
-
-        # find runtime from results
-        exec_times = []  # in ps
-        for r in results:
-            exec_times.append(float(r.sim_context.result.exec_time))
-
-        feasible = []
-        for r in results:
-            assert r.sim_context.result and r.sim_context.result.exec_time
-            ureg = pint.UnitRegistry()
-            threshold = ureg(self.threshold).to(ureg.ps).magnitude
-
-            if r.sim_context.result.exec_time > threshold:
-                r.setFeasibility(False)
-                feasible.append(False)
-            else:
-                r.setFeasibility(True)
-                feasible.append(True)
+            for s in to_simulate:
+                self.run_simulation(s)
 
+        for key, group in pending.items():
+            result = group[0].sim_context.result
+            if result is None:
+                continue
+            self.cache[key] = result
+            for s in group[1:]:
+                s.sim_context.result = result
+
+        feasible = [self.check_feasibility(s) for s in samples]
+        exec_times = [
+            (
+                float(s.sim_context.result.exec_time)
+                if s.sim_context.result is not None
+                else None
+            )
+            for s in samples
+        ]
         log.debug("Exec.-Times: {} Feasible: {}".format(exec_times, feasible))
         # return samples with the according sim context
-        return results
+        return samples
 
     def run_simulation(self, sample):
         # do simulation requires sim_context
@@ -164,11 +308,13 @@ class Simulation(Oracle):
             run_simulation(sample.sim_context)
 
             # add to cache
-            mapping = tuple(sample.getMapping().to_list())
-            self.cache[mapping] = sample.sim_context.result
+            self.cache[self.cache_key(sample)] = sample.sim_context.result
 
         except Exception as e:
-            log.debug("Exception in Simulation: {}".format(str(e)))
+            log.warning(
+                "Simulation of mapping {} failed, considering it "
+                "infeasible: {}".format(sample.getMapping().to_list(), e)
+            )
             traceback.print_exc()
             # log.exception(str(e))
             if hasattr(e, "details"):
@@ -7,7 +7,6 @@ import random as rand
 import sys
 
 import numpy as np
-import pint
 
 from mocasin.design_centering import sample as dc_sample
 from mocasin.design_centering import oracle
@@ -53,6 +52,10 @@ class PerturbationManager(object):
         # self.representation = (reps.RepresentationType['SimpleVector'].
         #    getClassType())(self.graph, self.platform)
 
+    def close(self):
+        """Shut down the worker pool of the simulation oracle."""
+        self.sim.close()
+
     def create_randomMappings(self):
         """Creates a defined number of unique random mappings"""
         mapping_set = set([])
@@ -181,23 +184,18 @@ class PerturbationManager(object):
             )
             samples.append(sample)
         self.sim.prepare_sim_contexts_for_samples(samples)
-
-        results = list(
-            map(self.sim.run_simulation, samples)
-        )  # these should be samples
+        results = self.sim.is_feasible(samples)
 
         exec_times = []
-        for r in results:
-            exec_times.append(float(r.sim_context.result.exec_time))
-
         feasible = []
-        for e in exec_times:
-            ureg = pint.UnitRegistry()
-            threshold = ureg(self.threshold).to(ureg.ps).magnitude
-            if e > threshold:
-                feasible.append(False)
+        for r in results:
+            # samples whose simulation failed have no result
+            result = r.sim_context.result
+            if result is None:
+                exec_times.append(None)
             else:
-                feasible.append(True)
+                exec_times.append(float(result.exec_time))
+            feasible.append(r.getFeasibility())
 
         log.debug(
             "exec. Times: {} Feasible: {} History: {}".format(
@@ -212,7 +210,10 @@ class PerturbationManager(object):
         for i in range(0, self.num_perturbations):
             complex_res["p" + str(i)] = {}
             complex_res["p" + str(i)]["mapping"] = history[i].to_list()
-            complex_res["p" + str(i)]["runtime"] = exec_times[i] / 1000000000.0
+            runtime = exec_times[i]
+            if runtime is not None:
+                runtime /= 1000000000.0
+            complex_res["p" + str(i)]["runtime"] = runtime
             complex_res["p" + str(i)]["feasible"] = feasible[i]
 
         return simple_res, complex_res
@@ -197,25 +197,30 @@ class MetricSpaceSampleGen(SampleGenerator):
                 "Error!, distribution '" + str(distr) + "' not supported (yet)."
             )
             exit(1)
-        sample_list = []
-        for _ in range(nsamples):
-            lp_random_vector = lp.uniform_from_p_ball(p=vol.norm_p, n=vol.dim)
-            scaled_vector = vol.radius * lp_random_vector
-            transformed_vector = vol.covariance @ scaled_vector
-            new_sample_vector = vol.center + transformed_vector
-            sample_ints = self.representation.approximate(new_sample_vector)
-            new_sample = MetricSpaceSample(self.representation, sample_ints)
-            sample_list.append(new_sample)
-            distance = self.representation._distance(sample_ints, vol.center)
-
-            if distance > vol.radius:
-                log.warning(
-                    f"Generated vector with distance ({distance}) greater than radius ({vol.radius})."
-                )
-
-            log.debug(
-                f"Generated sample (distance: {distance}):\n {sample_ints}"
+        # sample all points at once and transform them into the volume
+        lp_random_vectors = lp.uniform_from_p_ball_batch(
+            p=vol.norm_p, n=vol.dim, num=nsamples
+        )
+        transformed_vectors = (
+            vol.radius * lp_random_vectors @ np.transpose(vol.covariance)
+        )
+        new_sample_vectors = vol.center + transformed_vectors
+        samples_ints = self.representation.approximateBatch(new_sample_vectors)
+        sample_list = [
+            MetricSpaceSample(self.representation, sample_ints)
+            for sample_ints in samples_ints
+        ]
+
+        distances = lp.p_norm(samples_ints - vol.center, vol.norm_p)
+        num_outside = int(np.count_nonzero(distances > vol.radius))
+        if num_outside > 0:
+            log.warning(
+                f"Generated {num_outside} vectors with distance greater than "
+                f"radius ({vol.radius}). Maximal distance: {distances.max()}"
             )
+        log.debug(
+            f"Generated samples (distances: {distances}):\n{samples_ints}"
+        )
 
         return sample_list
 
@@ -0,0 +1,95 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+import pytest
+
+from mocasin.common.trace import EmptyTrace
+from mocasin.design_centering.oracle import Simulation, _run_sample_worker
+from mocasin.design_centering.sample import Sample
+from mocasin.simulate import SimulationResult
+
+
+@pytest.fixture
+def simulated(mocker):
+    """Replace the simulation by a function of the mapping vector"""
+    simulated = []
+
+    def run_simulation(simulation):
+        vector = simulation.mapping.to_list()
+        simulated.append(tuple(vector))
+        exec_time = 1000.0 * (1 + sum(vector))
+        censored = exec_time > simulation.time_budget
+        simulation.result = SimulationResult(
+            exec_time=min(exec_time, simulation.time_budget),
+            static_energy=None,
+            dynamic_energy=None,
+            censored=censored,
+        )
+        return simulation, 0.0
+
+    mocker.patch(
+        "mocasin.design_centering.oracle.run_simulation", run_simulation
+    )
+    return simulated
+
+
+def samples(representation, vectors):
+    return [Sample(list(v), representation=representation) for v in vectors]
+
+
+def test_feasibility(graph, platform, representation, simulated):
+    sim = Simulation(graph, platform, EmptyTrace(), "5 ns")
+    assert sim._time_budget == pytest.approx(5000)
+    result = sim.validate_set(samples(representation, [[0, 1], [2, 3]]))
+    assert [s.getFeasibility() for s in result] == [True, False]
+    assert result[1].getSimContext().result.censored
+
+
+def test_feasibility_cache(graph, platform, representation, simulated):
+    sim = Simulation(graph, platform, EmptyTrace(), "5 ns")
+    vectors = [[0, 1], [2, 3], [0, 1]]
+    result = sim.validate_set(samples(representation, vectors))
+    assert simulated == [(0, 1), (2, 3)]
+    assert sim.total_cached == 1
+    assert [s.getFeasibility() for s in result] == [True, False, True]
+
+    # later iterations reuse the results
+    result = sim.validate_set(samples(representation, [[2, 3], [1, 1]]))
+    assert simulated == [(0, 1), (2, 3), (1, 1)]
+    assert sim.total_cached == 2
+    assert [s.getFeasibility() for s in result] == [False, True]
+    assert len(sim.cache) == 3
+
+
+def test_share_cache(graph, platform, representation, simulated):
+    sim = Simulation(graph, platform, EmptyTrace(), "5 ns")
+    sim.validate_set(samples(representation, [[0, 1]]))
+    other = Simulation(graph, platform, EmptyTrace(), "5000 ps", threads=4)
+    other.share_cache(sim)
+    result = other.validate_set(samples(representation, [[0, 1]]))
+    assert result[0].getFeasibility()
+    assert simulated == [(0, 1)]
+    with pytest.raises(ValueError):
+        Simulation(graph, platform, EmptyTrace(), "1 ns").share_cache(sim)
+
+
+def test_failing_sample(graph, platform, representation, simulated, mocker):
+    run_simulation = mocker.patch(
+        "mocasin.design_centering.oracle.run_simulation"
+    )
+    run_simulation.side_effect = RuntimeError("deadlock")
+    sim = Simulation(graph, platform, EmptyTrace(), "5 ns")
+    result = sim.validate_set(samples(representation, [[0, 1]]))
+    assert not result[0].getFeasibility()
+    assert result[0].getSimContext().result is None
+    assert len(sim.cache) == 0
+
+
+def test_failing_sample_worker(mocker):
+    mocker.patch(
+        "mocasin.design_centering.oracle.run_simulation_worker",
+        side_effect=RuntimeError("deadlock"),
+    )
+    result, error = _run_sample_worker(None)
+    assert result is None
+    assert "deadlock" in error
@@ -9,6 +9,7 @@ from mocasin.design_centering.volume import *
 import mocasin.design_centering.sample as sample
 
 import mocasin.util.random_distributions.discrete_random as rd
+import mocasin.util.random_distributions.lp as lp
 
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
@@ -241,6 +242,62 @@ def test_all_infeasible(lp_vol, num_samples, mocker):
     assert np.alltrue(center == lp_vol.center)
 
 
+def test_gen_samples_in_ball(vol_mu, representation, num_procs, seed):
+    np.random.seed(seed)
+    sg = sample.MetricSpaceSampleGen(representation)
+    samples = sg.gen_samples_in_ball(vol_mu, "uniform", nsamples=2000)
+    assert len(samples) == 2000
+    vectors = np.array([s.sample2tuple() for s in samples])
+    assert np.all((0 <= vectors) & (vectors < num_procs))
+    offsets = vectors - vol_mu.center
+    assert np.all(lp.p_norm(offsets, vol_mu.norm_p) <= vol_mu.radius + 1)
+    assert np.allclose(np.mean(offsets, axis=0), 0, atol=0.5)
+
+
+def test_transformation_update(vol_mu, num_procs, Q, r, seed):
+    np.random.seed(seed)
+    dim = len(vol_mu.center)
+    sample_set = random_s_set_gen(dim, num_procs, vol_mu.center, Q, r, 100)
+    old_center = vol_mu.center
+    vol_mu.adapt_center(sample_set)
+    assert not np.array_equal(old_center, vol_mu.center)
+    vol_mu.adapt_transformation(sample_set)
+    # the transformation stays a symmetric positive definite matrix
+    transformation = vol_mu.transformation
+    assert np.allclose(transformation, transformation.T)
+    assert np.all(np.linalg.eigvalsh(transformation) > 0)
+
+
+def test_transformation_update_hand_computed(vol_mu):
+    vol_mu.dim = vol_mu.true_dim = 2
+    vol_mu.old_center = np.array([0.0, 0.0])
+    vol_mu.center = np.array([1.0, 0.0])
+    vol_mu.rk1_vec = np.zeros(2)
+    vol_mu.rk1_learning_constant = 0.5
+    vol_mu.covariance = np.identity(2)
+    vol_mu.transformation = np.identity(2)
+    sample_set = sample.SampleSet()
+    for vec in [[1, 0], [0, 2]]:
+        s = sample.Sample(sample=vec)
+        s.setFeasibility(True)
+        sample_set.add_sample(s)
+    vol_mu.adapt_transformation(sample_set)
+
+    # evolution path: sqrt(0.5 * 1.5) * [1, 0]
+    rank_one = np.array([[0.75, 0.0], [0.0, 0.0]])
+    # offsets [1, 0] and [0, 2], inverse norms 1 and 0.5 (median 0.75),
+    # alpha = sqrt(2) * min(0.75, 2 / norm) = sqrt(2) * 0.75 for both
+    rank_mu = 0.5 * np.sqrt(2) * 0.75 * np.array([[1.0, 0.0], [0.0, 4.0]])
+    rk_1_weight = 0.6 / (3.3**2 + 2)
+    rk_mu_weight = 0.04 * 0.5 / (16 + 0.4)
+    expected = (
+        (1 - rk_1_weight - rk_mu_weight) * np.identity(2)
+        + rk_1_weight * rank_one
+        + rk_mu_weight * rank_mu
+    )
+    assert np.allclose(vol_mu.transformation, expected)
+
+
 def visualize_s_sets(points, num_procs):
     ns = [num_procs, num_procs]
     fig, ax = plt.subplots()
@@ -157,9 +157,10 @@ class LPVolume(Volume):
 
     def adapt_center(self, s_set):
         # all feas. samples in s_set
-        fs_set = list(map(lambda s: s.sample, s_set.get_feasible()))
-        if fs_set == []:
+        feasible = s_set.get_feasible()
+        if not feasible:
             return self.center
+        fs_set = np.array([s.sample for s in feasible], dtype=float)
         # take mean of feasible points to add weighted to the old center
         num_feasible = len(fs_set)  # mu
         if self.adaptable_center_weights:
@@ -175,10 +176,8 @@ class LPVolume(Volume):
         new_center_vec = (
             1 - self.weight_center
         ) * self.center + self.weight_center * np.array(mean_center_approx)
-        vector_of_distances = [
-            lp.p_norm(self.center - v, self.norm_p) for v in fs_set
-        ]
-        if min(vector_of_distances) <= 0:
+        vector_of_distances = lp.p_norm(self.center - fs_set, self.norm_p)
+        if np.min(vector_of_distances) <= 0:
             log.warning("DC points did not move.")
         # approximate center
         new_center = self.representation.approximate(new_center_vec)
@@ -251,32 +250,24 @@ class LPVolume(Volume):
         if np.dot(centers, centers.transpose()) != 0:
             centers_alpha = 1 / np.sqrt(np.dot(centers, centers))
             self.rk1_vec += centers_factor * centers_alpha * centers
-        rank_one_update = np.array(self.rk1_vec).transpose() @ np.array(
-            self.rk1_vec
-        )
+        rank_one_update = np.outer(self.rk1_vec, self.rk1_vec)
 
-        rank_mu_update = np.zeros([self.dim, self.dim])
         try:
             Qinv = np.linalg.inv(self.covariance)
         except np.linalg.LinAlgError:
             Qinv = np.identity(self.dim)
-        arnorm = dict()
-        for j, X in enumerate(feasible):
-            V = Qinv @ (np.array(X.sample2tuple()) - self.old_center)
-            # TODO: look up the alphas in original implementation, as not described in paper
-            arnorm[j] = np.sqrt(np.dot(V, V))
-            if arnorm[j] != 0:
-                arnorm[j] = 1 / arnorm[j]
-            else:
-                arnorm[j] = 0
-
-        for j, X in enumerate(feasible):
-            alphai = np.sqrt(self.dim) * min(
-                np.median(np.array(list(arnorm.values()))), 2.0 * arnorm[j]
-            )
-
-            rank_1_matrix = np.array(V).transpose() @ np.array(V)
-            rank_mu_update += 1 / num_feasible * alphai * rank_1_matrix
+        # transformed offsets of all feasible samples (one per row)
+        samples = np.array([X.sample2tuple() for X in feasible], dtype=float)
+        V = (samples - self.old_center) @ Qinv.T
+        # TODO: look up the alphas in original implementation, as not
+        # described in paper
+        norms = np.sqrt(np.einsum("ij,ij->i", V, V))
+        arnorm = np.divide(
+            1, norms, out=np.zeros(num_feasible), where=norms != 0
+        )
+        alphas = np.sqrt(self.dim) * np.minimum(np.median(arnorm), 2.0 * arnorm)
+        # weighted sum of the rank one matrices of all samples
+        rank_mu_update = (alphas[:, None] * V).T @ V / num_feasible
 
         rk_1_weight = 0.6 / ((self.true_dim + 1.3) ** 2 + num_feasible)
         rk_mu_weight = (
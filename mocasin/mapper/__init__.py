@@ -118,11 +118,11 @@ class BaseMapper:
             return pareto
 
         # obtain simulation values
-        simulation_manager = SimulationManager(
+        with SimulationManager(
             self.platform,
             SimulationManagerConfig(jobs=None, parallel=True),
-        )
-        simulation_manager.simulate(graph, trace, representation, pareto)
+        ) as simulation_manager:
+            simulation_manager.simulate(graph, trace, representation, pareto)
         filtered = filter_pareto_front(pareto)
 
         return filtered
@@ -0,0 +1,366 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+"""Persistent storage of simulation results.
+
+The simulation manager keeps all results in memory, which means that they are
+lost at the end of a run. This module provides a persistent cache that stores
+simulation results in an SQLite database. Each entry is keyed by a content
+hash of the simulated context (dataflow graph, platform, trace and mapping
+representation) and by the mapping tuple. This allows multiple runs, also
+concurrent ones, to share simulation results.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from mocasin.common.trace import SegmentType
+from mocasin.simulate import SimulationResult
+from mocasin.util import logging
+
+log = logging.getLogger(__name__)
+
+
+def _digest(items):
+    """Calculate a sha256 hex digest of an iterable of values."""
+    h = hashlib.sha256()
+    for item in items:
+        h.update(repr(item).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def graph_digest(graph):
+    """Calculate a content hash of a dataflow graph.
+
+    Args:
+        graph (DataflowGraph): a dataflow graph
+
+    Returns:
+        str: a hex digest describing the graph structure
+    """
+
+    def items():
+        yield graph.name
+        for process in sorted(graph.processes(), key=lambda p: p.name):
+            yield ("process", process.name)
+        for channel in sorted(graph.channels(), key=lambda c: c.name):
+            source = channel.source.name if channel.source else None
+            sinks = sorted(s.name for s in channel.sinks)
+            yield ("channel", channel.name, channel.token_size, source, sinks)
+
+    return _digest(items())
+
+
+def platform_digest(platform):
+    """Calculate a content hash of a platform.
+
+    The hash considers processors, schedulers, communication resources and
+    communication primitives, including all parameters that influence the
+    simulation.
+
+    Args:
+        platform (Platform): a platform
+
+    Returns:
+        str: a hex digest describing the platform
+    """
+
+    def phases(phase_list):
+        return [
+            (
+                ph.name,
+                ph.direction,
+                ph.ignore_latency,
+                ph.size,
+                [r.name for r in ph.resources],
+            )
+            for ph in phase_list
+        ]
+
+    def items():
+        yield platform.name
+        yield platform.peripheral_static_power
+        for pe in sorted(platform.processors(), key=lambda p: p.name):
+            yield (
+                "processor",
+                pe.name,
+                pe.type,
+                pe.frequency_domain.name,
+                pe.frequency,
+                pe.context_load_cycles,
+                pe.context_store_cycles,
+                pe.n_threads,
+                pe.static_power(),
+                pe.dynamic_power(),
+            )
+        for sched in sorted(platform.schedulers(), key=lambda s: s.name):
+            policy = sched.policy
+            yield (
+                "scheduler",
+                sched.name,
+                [pe.name for pe in sched.processors],
+                getattr(policy, "name", None),
+                getattr(policy, "scheduling_cycles", None),
+                getattr(policy, "time_slice", None),
+            )
+        resources = sorted(
+            platform.communication_resources(), key=lambda r: r.name
+        )
+        for r in resources:
+            yield (
+                "resource",
+                r.name,
+                r.resource_type(),
+                r._frequency_domain.name,
+                r._frequency_domain.frequency,
+                r._read_latency,
+                r._write_latency,
+                r._read_throughput,
+                r._write_throughput,
+                r.exclusive,
+                r.is_storage,
+            )
+        for prim in sorted(platform.primitives(), key=lambda p: p.name):
+            yield ("primitive", prim.name)
+            for name in sorted(prim.produce_phases):
+                yield ("produce", name, phases(prim.produce_phases[name]))
+            for name in sorted(prim.consume_phases):
+                yield ("consume", name, phases(prim.consume_phases[name]))
+
+    return _digest(items())
+
+
+def trace_digest(trace, graph):
+    """Calculate a content hash of an application trace.
+
+    The hash is calculated by iterating over the complete trace of every
+    process in `graph`. Thus, it reflects the actual trace content and not
+    only the configuration of the trace generator.
+
+    Args:
+        trace (DataflowTrace): a trace generator
+        graph (DataflowGraph): the dataflow graph described by the trace
+
+    Returns:
+        str: a hex digest describing the trace
+    """
+
+    def items():
+        yield type(trace).__qualname__
+        for process in sorted(p.name for p in graph.processes()):
+            yield ("process", process)
+            for segment in trace.get_trace(process):
+                if segment.segment_type == SegmentType.COMPUTE:
+                    yield sorted(segment.processor_cycles.items())
+                else:
+                    yield (
+                        segment.segment_type.value,
+                        segment.channel,
+                        segment.num_tokens,
+                    )
+
+    return _digest(items())
+
+
+def representation_digest(representation):
+    """Calculate a hash of the configuration of a mapping representation.
+
+    The meaning of a mapping tuple depends on the type of the representation
+    and on the parameters it was created with. For representations that embed
+    the platform into a vector space, it also depends on the embedding, which
+    is generated randomly.
+
+    Args:
+        representation (MappingRepresentation): a mapping representation
+
+    Returns:
+        str: a hex digest describing the representation
+    """
+
+    def items():
+        yield type(representation).__qualname__
+        args, kwargs = getattr(representation, "init_parameters", ((), {}))
+        yield args
+        yield sorted(kwargs.items())
+        embedding = getattr(representation, "emb", representation)
+        iota = getattr(embedding, "iota", None)
+        if iota is not None:
+            yield [np.asarray(iota[i]).tolist() for i in sorted(iota)]
+
+    return _digest(items())
+
+
+def context_digest(graph, platform, trace, representation):
+    """Calculate the key of a simulation context.
+
+    Args:
+        graph (DataflowGraph): a dataflow graph
+        platform (Platform): a platform
+        trace (DataflowTrace): a trace generator
+        representation (MappingRepresentation): a mapping representation. Its
+            configuration is part of the key as the meaning of a mapping tuple
+            depends on the representation (see
+            :func:`representation_digest`).
+
+    Returns:
+        str: a hex digest identifying the simulation context
+    """
+    return _digest(
+        [
+            graph_digest(graph),
+            platform_digest(platform),
+            trace_digest(trace, graph),
+            representation_digest(representation),
+        ]
+    )
+
+
+def _mapping_key(mapping):
+    """Serialize a mapping tuple to a string key."""
+    return json.dumps(np.asarray(mapping).tolist())
+
+
+def _result_from_row(row):
+    """Create a `SimulationResult` from a row of the results table."""
+    exec_time, static_energy, dynamic_energy, censored = row
+    return SimulationResult(
+        exec_time, static_energy, dynamic_energy, censored=bool(censored)
+    )
+
+
+class SimulationResultCache:
+    """Persistent cache of simulation results backed by SQLite.
+
+    The cache may be shared between concurrent processes. Writes are
+    committed in batches and SQLite's write-ahead logging allows concurrent
+    readers while another process writes.
+
+    Each process opens its own database connection. The connection is not
+    pickled, which allows to pass the cache object to other processes.
+
+    Args:
+        path (str): path to the database file. The file is created if it
+            does not exist.
+        timeout (float, optional): time in seconds to wait for a lock held by
+            another process. Defaults to 60.
+    """
+
+    def __init__(self, path, timeout=60.0):
+        self.path = os.path.abspath(path)
+        self.timeout = timeout
+        self._connection = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        return state
+
+    def _connect(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "context TEXT NOT NULL, "
+                "mapping TEXT NOT NULL, "
+                "exec_time REAL, "
+                "static_energy REAL, "
+                "dynamic_energy REAL, "
+                "censored INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (context, mapping))"
+            )
+            connection.commit()
+            self._connection = connection
+            log.debug(f"Opened simulation result cache {self.path}")
+        return self._connection
+
+    def close(self):
+        """Close the database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def lookup(self, context, mappings):
+        """Look up the results of multiple mappings.
+
+        Args:
+            context (str): a context key (see :func:`context_digest`)
+            mappings (:obj:`list` of :obj:`tuple`): mapping tuples
+
+        Returns:
+            :obj:`list`: a list containing a `SimulationResult` for each
+            mapping found in the cache and None for all other mappings.
+        """
+        connection = self._connect()
+        results = []
+        for mapping in mappings:
+            row = connection.execute(
+                "SELECT exec_time, static_energy, dynamic_energy, censored "
+                "FROM results WHERE context = ? AND mapping = ?",
+                (context, _mapping_key(mapping)),
+            ).fetchone()
+            results.append(_result_from_row(row) if row else None)
+        return results
+
+    def store(self, context, entries):
+        """Store simulation results.
+
+        A stored result is only replaced if it is censored. Thus, a lower
+        bound stored by a concurrent process never overwrites a complete
+        result.
+
+        Args:
+            context (str): a context key (see :func:`context_digest`)
+            entries (:obj:`list` of :obj:`tuple`): pairs of a mapping tuple and
+                the corresponding `SimulationResult`
+        """
+        rows = [
+            (
+                context,
+                _mapping_key(mapping),
+                res.exec_time,
+                res.static_energy,
+                res.dynamic_energy,
+                int(res.censored),
+            )
+            for mapping, res in entries
+        ]
+        if not rows:
+            return
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT INTO results "
+                "(context, mapping, exec_time, static_energy, dynamic_energy, "
+                "censored) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(context, mapping) DO UPDATE SET "
+                "exec_time = excluded.exec_time, "
+                "static_energy = excluded.static_energy, "
+                "dynamic_energy = excluded.dynamic_energy, "
+                "censored = excluded.censored "
+                "WHERE results.censored",
+                rows,
+            )
+
+    def entries(self, context):
+        """Iterate over all stored results of a context.
+
+        Args:
+            context (str): a context key (see :func:`context_digest`)
+
+        Yields:
+            tuple: a pair of the mapping tuple and its `SimulationResult`
+        """
+        connection = self._connect()
+        rows = connection.execute(
+            "SELECT mapping, exec_time, static_energy, dynamic_energy, "
+            "censored FROM results WHERE context = ? ORDER BY rowid",
+            (context,),
+        ).fetchall()
+        for mapping, *res in rows:
+            yield tuple(json.loads(mapping)), _result_from_row(res)
@@ -97,14 +97,11 @@ class DefaultFullMapper(BaseMapper):
         channels = partial_mapping.get_unmapped_channels()
         for c in channels:
             capacity = 4  # fixed channel bound this may cause problems
-            suitable_primitives = []
-            for p in partial_mapping.platform.primitives():
-                src = partial_mapping.process_info(c.source).affinity
-                sinks = [
-                    partial_mapping.process_info(s).affinity for s in c.sinks
-                ]
-                if p.is_suitable(src, sinks):
-                    suitable_primitives.append(p)
+            src = partial_mapping.process_info(c.source).affinity
+            sinks = [partial_mapping.process_info(s).affinity for s in c.sinks]
+            suitable_primitives = partial_mapping.platform.suitable_primitives(
+                src, sinks
+            )
             if len(suitable_primitives) == 0:
                 raise RuntimeError(
                     "default_map: Mapping failed! No suitable primitive for "
@@ -3,19 +3,27 @@
 #
 # Authors: Andrés Goens, Robert Khasanov
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import enum
+import multiprocessing as mp
 import pickle
+import queue
 import random
+import traceback
 
 import deap
 from deap import algorithms, base, creator, tools  # noqa
 import numpy as np
 
 from mocasin.mapper import BaseMapper
-from mocasin.mapper.pareto import filter_pareto_front
+from mocasin.mapper.pareto import ParetoArchive
 from mocasin.mapper.random import RandomPartialMapper
-from mocasin.mapper.utils import SimulationManager, SimulationManagerConfig
+from mocasin.mapper.surrogate import SurrogateScreening
+from mocasin.mapper.utils import (
+    SimulationManagerConfig,
+    closes_simulation_manager,
+    create_simulation_manager,
+)
 from mocasin.util import logging
 
 log = logging.getLogger(__name__)
@@ -62,6 +70,56 @@ class _GeneticMapperConfig:
     crossover_rate: int
     radius: float
     progress: bool
+    surrogate: bool = False
+    surrogate_keep: float = 0.5
+    surrogate_exploration: float = 0.1
+    surrogate_min_samples: int = 20
+    islands: int = 1
+    migration_interval: int = 5
+    migration_size: int = 2
+
+
+@dataclass
+class _IslandResult:
+    """Class for keeping the results of an island."""
+
+    index: int
+    vectors: list = None
+    fitnesses: list = None
+    sim_results: list = None
+    logbook: deap.tools.Logbook = None
+    statistics: object = None
+    error: str = None
+
+
+class _ScreenedParetoFront(deap.tools.ParetoFront):
+    """A Pareto front that only admits simulated individuals.
+
+    Before the front is updated, the individuals with an estimated fitness
+    that are not dominated by the current front are simulated. Estimated
+    individuals that are dominated by the front could not enter it anyway.
+
+    Args:
+        simulate_estimated (callable): replaces the estimated fitness of the
+            given individuals by their simulated fitness
+    """
+
+    def __init__(self, simulate_estimated):
+        super().__init__()
+        self.simulate_estimated = simulate_estimated
+
+    def update(self, population):
+        self.simulate_estimated(
+            [
+                ind
+                for ind in population
+                if getattr(ind, "estimate", None) is not None
+                and not any(
+                    hofer.fitness.dominates(ind.fitness) for hofer in self
+                )
+            ]
+        )
+        super().update(population)
 
 
 class _GeneticMapperEngine:
@@ -90,6 +148,15 @@ class _GeneticMapperEngine:
         self.simulation_manager = simulation_manager
         self.config = config
 
+        self.surrogate = None
+        if self.config.surrogate:
+            self.surrogate = SurrogateScreening(
+                simulation_manager,
+                keep=self.config.surrogate_keep,
+                exploration=self.config.surrogate_exploration,
+                min_samples=self.config.surrogate_min_samples,
+            )
+
         self.random_mapper = RandomPartialMapper(
             self.platform,
             resources_first=Objectives.RESOURCES in self.config.objectives,
@@ -128,13 +195,22 @@ class _GeneticMapperEngine:
         toolbox.register("mate", self._mapping_crossover)
         toolbox.register("mutate", self._mapping_mutation)
         toolbox.register("evaluate", self._evaluate_mapping)
-        toolbox.register(
-            "select", deap.tools.selTournament, tournsize=self.config.tournsize
-        )
+        toolbox.register("map", self._map)
+        if self.surrogate is not None:
+            toolbox.register("select", self._select)
+        else:
+            toolbox.register(
+                "select",
+                deap.tools.selTournament,
+                tournsize=self.config.tournsize,
+            )
         self.evolutionary_toolbox = toolbox
 
         # todo: we could add symmetry comparison (or other similarity) here
-        self.hof = deap.tools.ParetoFront()
+        if self.surrogate is not None:
+            self.hof = _ScreenedParetoFront(self._simulate_estimated)
+        else:
+            self.hof = deap.tools.ParetoFront()
 
         stats = deap.tools.Statistics(lambda ind: ind.fitness.values)
         stats.register("avg", np.mean)
@@ -152,10 +228,99 @@ class _GeneticMapperEngine:
         pass
 
     def _evaluate_mapping(self, mapping):
-        result = []
+        return self._evaluate_mappings([mapping])[0]
+
+    def _evaluate_mappings(self, mappings):
+        """Evaluate multiple mappings at once.
+
+        All mappings are passed to the simulation manager as a single batch,
+        which allows to simulate them in parallel. If the surrogate model is
+        enabled, only the most promising mappings of the batch are simulated
+        and the fitness of the others is estimated by the model. The
+        predicted execution time of such individuals is kept in their
+        `estimate` attribute (None for simulated individuals), such that
+        they can be simulated before they enter the hall of fame or survive
+        the selection.
+        """
+        if not mappings:
+            return []
+        vectors = [list(m) for m in mappings]
+        if self.surrogate is not None:
+            simres, simulated = self.surrogate.simulate(
+                self.graph, self.trace, self.representation, vectors
+            )
+            for mapping, res, sim in zip(mappings, simres, simulated):
+                if isinstance(mapping, deap.creator.Individual):
+                    mapping.estimate = None if sim else res.exec_time
+        else:
+            simres = self.simulation_manager.simulate(
+                self.graph, self.trace, self.representation, vectors
+            )
+        return [self._fitness(m, r) for m, r in zip(mappings, simres)]
+
+    def _simulate_estimated(self, individuals):
+        """Replace the estimated fitness of individuals by simulated fitness.
+
+        Individuals without an estimated fitness are ignored.
+        """
+        estimated = {
+            id(ind): ind
+            for ind in individuals
+            if getattr(ind, "estimate", None) is not None
+        }
+        estimated = list(estimated.values())
+        if not estimated:
+            return
+        vectors = [list(ind) for ind in estimated]
+        cached = self.surrogate.lookup(
+            self.graph, self.trace, self.representation, vectors
+        )
         simres = self.simulation_manager.simulate(
-            self.graph, self.trace, self.representation, [list(mapping)]
-        )[0]
+            self.graph, self.trace, self.representation, vectors
+        )
+        late = [
+            (ind.estimate, res)
+            for ind, res, hit in zip(estimated, simres, cached)
+            if hit is None
+        ]
+        self.surrogate.record_late(
+            [pred for pred, _ in late], [res for _, res in late]
+        )
+        for ind, res in zip(estimated, simres):
+            ind.fitness.values = self._fitness(ind, res)
+            ind.estimate = None
+
+    def _select(self, individuals, k):
+        """Tournament selection that only selects simulated individuals.
+
+        This is registered in the DEAP toolbox if the surrogate model is
+        enabled. Whenever the selection contains individuals with an
+        estimated fitness, these are simulated and the selection is repeated
+        with their simulated fitness.
+        """
+        while True:
+            chosen = deap.tools.selTournament(
+                individuals, k, tournsize=self.config.tournsize
+            )
+            if all(getattr(ind, "estimate", None) is None for ind in chosen):
+                return chosen
+            self._simulate_estimated(chosen)
+
+    def _map(self, func, iterable):
+        """Batched replacement of `map` registered in the DEAP toolbox.
+
+        DEAP algorithms evaluate the individuals with invalid fitness
+        (the initial population and the offspring of each generation) by
+        calling ``toolbox.map(toolbox.evaluate, invalid_ind)``. Instead of
+        evaluating the individuals one by one, this collects them and
+        evaluates the whole generation as a single batch.
+        """
+        if func is self.evolutionary_toolbox.evaluate:
+            return self._evaluate_mappings(list(iterable))
+        return list(map(func, iterable))
+
+    def _fitness(self, mapping, simres):
+        result = []
         if Objectives.EXEC_TIME in self.config.objectives:
             result.append(simres.exec_time)
         if Objectives.ENERGY in self.config.objectives:
@@ -204,7 +369,32 @@ class _GeneticMapperEngine:
                 log.error("Could not mutate mapping")
                 raise RuntimeError("Could not mutate mapping")
 
-    def run(self):
+    def immigrate(self, population, immigrants):
+        """Replace the worst individuals of a population by immigrants.
+
+        Args:
+            population (list): the population
+            immigrants (list): pairs of mapping vectors and fitness values
+                that were evaluated on another island
+        """
+        worst = deap.tools.selWorst(population, len(immigrants))
+        worst_ids = set(id(ind) for ind in worst)
+        population = [ind for ind in population if id(ind) not in worst_ids]
+        for vector, fitness in immigrants:
+            individual = deap.creator.Individual(vector)
+            individual.fitness.values = fitness
+            population.append(individual)
+        return population
+
+    def run(self, migrate=None):
+        """Run the genetic algorithm.
+
+        Args:
+            migrate (callable, optional): a function that is called with the
+                population every `migration_interval` generations and
+                returns the population after exchanging individuals with
+                other islands. If None, the population evolves in isolation.
+        """
         if self.config.crossover_rate > len(self.graph.processes()):
             log.error(
                 "Crossover rate cannot be higher than number of processes "
@@ -222,18 +412,38 @@ class _GeneticMapperEngine:
         else:
             ea_algo = deap.algorithms.eaMuCommaLambda
 
-        population, logbook = ea_algo(
-            self.population,
-            toolbox,
-            mu=pop_size,
-            lambda_=3 * pop_size,
-            cxpb=self.config.cxpb,
-            mutpb=self.config.mutpb,
-            ngen=self.config.num_gens,
-            stats=stats,
-            halloffame=hof,
-            verbose=self.config.progress,
-        )
+        num_gens = self.config.num_gens
+        epoch_length = num_gens
+        if migrate is not None:
+            epoch_length = self.config.migration_interval
+
+        population = self.population
+        logbook = deap.tools.Logbook()
+        gen = 0
+        while True:
+            ngen = min(epoch_length, num_gens - gen)
+            population, epoch_logbook = ea_algo(
+                population,
+                toolbox,
+                mu=pop_size,
+                lambda_=3 * pop_size,
+                cxpb=self.config.cxpb,
+                mutpb=self.config.mutpb,
+                ngen=ngen,
+                stats=stats,
+                halloffame=hof,
+                verbose=self.config.progress,
+            )
+            logbook.header = epoch_logbook.header
+            for record in epoch_logbook:
+                # the first record of later epochs repeats the last one
+                if gen > 0 and record["gen"] == 0:
+                    continue
+                logbook.record(**dict(record, gen=record["gen"] + gen))
+            gen += ngen
+            if gen >= num_gens:
+                break
+            population = migrate(population)
         log.info(logbook.stream)
 
         return population, logbook, hof
@@ -248,6 +458,7 @@ class _GeneticMapperEngine:
         toolbox.unregister("mate")
         toolbox.unregister("mutate")
         toolbox.unregister("evaluate")
+        toolbox.unregister("map")
         toolbox.unregister("select")
         stats = self.evolutionary_stats
         self.evolutionary_stats = None
@@ -256,6 +467,70 @@ class _GeneticMapperEngine:
         del deap.creator.Individual
 
 
+def _run_island(
+    index, mapper, graph, trace, representation, inbox, outbox, results
+):
+    """Evolve one island of the island-model genetic algorithm.
+
+    This function runs in a worker process. Every `migration_interval`
+    generations, the best individuals are sent to the next island and the
+    immigrants from the previous island replace the worst individuals. The
+    hall of fame of the island is put into the `results` queue.
+    """
+    config = mapper._mapper_config
+    simulation_manager = None
+    engine = None
+    upstream_alive = True
+
+    def migrate(population):
+        nonlocal upstream_alive
+        elite = deap.tools.selBest(population, config.migration_size)
+        outbox.put([(list(ind), ind.fitness.values) for ind in elite])
+        if not upstream_alive:
+            return population
+        immigrants = inbox.get()
+        if immigrants is None:  # the previous island failed
+            upstream_alive = False
+            return population
+        return engine.immigrate(population, immigrants)
+
+    try:
+        random.seed(mapper._random_seed + index)
+        np.random.seed(mapper._random_seed + index)
+        simulation_manager = mapper._island_simulation_manager()
+        engine = _GeneticMapperEngine(
+            mapper.platform,
+            graph,
+            trace,
+            representation,
+            simulation_manager,
+            config,
+        )
+        _, logbook, hof = engine.run(migrate)
+        vectors = [list(ind) for ind in hof]
+        sim_results = simulation_manager.simulate(
+            graph, trace, representation, vectors
+        )
+        results.put(
+            _IslandResult(
+                index,
+                vectors,
+                [ind.fitness.values for ind in hof],
+                sim_results,
+                logbook,
+                simulation_manager.statistics,
+            )
+        )
+    except Exception:
+        outbox.put(None)
+        results.put(_IslandResult(index, error=traceback.format_exc()))
+    finally:
+        if simulation_manager is not None:
+            simulation_manager.close()
+        if engine is not None:
+            engine.cleanup()
+
+
 class GeneticMapper(BaseMapper):
     """Generates a full mapping by using genetic algorithms.
 
@@ -289,6 +564,31 @@ class GeneticMapper(BaseMapper):
             Defaults to True.
         jobs (int, optional): Number of jobs for parallel simulation.
             Defaults to 4.
+        cache_file (str, optional): Path to a persistent simulation cache
+            shared among runs. Defaults to None (no persistent cache).
+        surrogate (bool, optional): Pre-screen the offspring with a surrogate
+            model and only simulate the most promising ones? Defaults to
+            False.
+        surrogate_keep (float, optional): Share of the offspring that is
+            simulated if the surrogate model is enabled. Defaults to 0.5.
+        surrogate_exploration (float, optional): Share of the simulated
+            offspring that is chosen randomly instead of by the surrogate
+            model. Defaults to 0.1.
+        surrogate_min_samples (int, optional): Number of simulation results
+            required before the surrogate model is used. Defaults to 20.
+        islands (int, optional): Number of islands. If larger than 1, each
+            island evolves its own population of `pop_size` individuals in a
+            separate worker process with its own (sequential) simulation
+            manager. Defaults to 1.
+        migration_interval (int, optional): Number of generations between two
+            migrations among the islands. Defaults to 5.
+        migration_size (int, optional): Number of individuals that migrate
+            from each island to the next one. Defaults to 2.
+        simulation_manager (str, optional): How mappings are evaluated,
+            "simulation" simulates them and "analytic" estimates them
+            analytically (see
+            :class:`~mocasin.mapper.utils.AnalyticSimulationManager`).
+            Defaults to "simulation".
     """
 
     def __init__(
@@ -311,10 +611,28 @@ class GeneticMapper(BaseMapper):
         progress=False,
         parallel=True,
         jobs=4,
+        cache_file=None,
+        surrogate=False,
+        surrogate_keep=0.5,
+        surrogate_exploration=0.1,
+        surrogate_min_samples=20,
+        islands=1,
+        migration_interval=5,
+        migration_size=2,
+        simulation_manager="simulation",
     ):
         super().__init__(platform, full_mapper=True)
         random.seed(random_seed)
         np.random.seed(random_seed)
+        self._random_seed = random_seed
+
+        if islands < 1:
+            raise RuntimeError(f"Invalid number of islands: {islands}")
+        if islands > 1 and not 0 < migration_size < pop_size:
+            raise RuntimeError(
+                "The migration size must be positive and smaller than the "
+                "population size"
+            )
 
         self._dump_cache = dump_cache
 
@@ -345,21 +663,130 @@ class GeneticMapper(BaseMapper):
             crossover_rate,
             radius,
             progress,
+            surrogate,
+            surrogate_keep,
+            surrogate_exploration,
+            surrogate_min_samples,
+            islands,
+            migration_interval,
+            migration_size,
         )
         simulation_config = SimulationManagerConfig(
             jobs=jobs,
             parallel=parallel,
             progress=progress,
             chunk_size=chunk_size,
+            cache_file=cache_file,
         )
-        self._simulation_manager = SimulationManager(
-            self.platform, simulation_config
+        self._simulation_manager = create_simulation_manager(
+            simulation_manager, self.platform, simulation_config
         )
         self._record_statistics = record_statistics
 
     def _init_deap_engine(self):
         pass
 
+    def _island_simulation_manager(self):
+        """Create the simulation manager of an island.
+
+        The islands already run in parallel, hence each island simulates its
+        mappings sequentially. The island uses the same kind of simulation
+        manager as the mapper.
+        """
+        config = replace(
+            self._simulation_manager.config, parallel=False, jobs=1
+        )
+        return type(self._simulation_manager)(self.platform, config)
+
+    def _run_islands(self, graph, trace, representation):
+        """Evolve the islands in worker processes and merge their results.
+
+        The islands form a ring, in which each island sends its emigrants to
+        the next one. The statistics and the simulation results of the
+        islands are merged into the simulation manager of the mapper.
+
+        Returns:
+            tuple: the merged logbook and the mapping vectors of the merged
+                hall of fame, ordered from the best to the worst fitness
+        """
+        num = self._mapper_config.islands
+        queues = [mp.Queue() for _ in range(num)]
+        results = mp.Queue()
+        workers = [
+            mp.Process(
+                target=_run_island,
+                args=(
+                    i,
+                    self,
+                    graph,
+                    trace,
+                    representation,
+                    queues[i],
+                    queues[(i + 1) % num],
+                    results,
+                ),
+            )
+            for i in range(num)
+        ]
+        for worker in workers:
+            worker.start()
+
+        island_results = []
+        while len(island_results) < num:
+            try:
+                island_results.append(results.get(timeout=1))
+            except queue.Empty:
+                if any(w.exitcode not in (None, 0) for w in workers):
+                    for worker in workers:
+                        worker.terminate()
+                    raise RuntimeError("An island worker process crashed")
+        for worker in workers:
+            worker.join()
+
+        logbook = deap.tools.Logbook()
+        hall_of_fame = {}
+        for island in sorted(island_results, key=lambda r: r.index):
+            if island.error is not None:
+                log.error(f"Island {island.index} failed:\n{island.error}")
+                raise RuntimeError(f"Island {island.index} failed")
+            logbook.header = ["island"] + island.logbook.header
+            for record in island.logbook:
+                logbook.record(island=island.index, **record)
+            self._simulation_manager.statistics.merge(island.statistics)
+            self._simulation_manager.add_results(
+                graph, representation, island.vectors, island.sim_results
+            )
+            for vector, fitness in zip(island.vectors, island.fitnesses):
+                hall_of_fame.setdefault(tuple(vector), fitness)
+
+        # all objectives are minimized
+        ranked = sorted(hall_of_fame.items(), key=lambda entry: entry[1])
+        return logbook, [list(vector) for vector, _ in ranked]
+
+    def _evolve(self, graph, trace, representation):
+        """Run the genetic algorithm on one or multiple islands.
+
+        Returns:
+            tuple: the logbook and the mapping vectors of the hall of fame,
+                ordered from the best to the worst fitness
+        """
+        if self._mapper_config.islands > 1:
+            return self._run_islands(graph, trace, representation)
+        engine = _GeneticMapperEngine(
+            self.platform,
+            graph,
+            trace,
+            representation,
+            self._simulation_manager,
+            self._mapper_config,
+        )
+        try:
+            _, logbook, hof = engine.run()
+        finally:
+            engine.cleanup()
+        return logbook, [list(ind) for ind in hof]
+
+    @closes_simulation_manager
     def generate_mapping(
         self,
         graph,
@@ -383,16 +810,7 @@ class GeneticMapper(BaseMapper):
             Mapping: the generated mapping.
         """
         self._simulation_manager.reset_statistics()
-        engine = _GeneticMapperEngine(
-            self.platform,
-            graph,
-            trace,
-            representation,
-            self._simulation_manager,
-            self._mapper_config,
-        )
-
-        _, logbook, hof = engine.run()
+        logbook, hof = self._evolve(graph, trace, representation)
         mapping = hof[0]
         self._simulation_manager.statistics.log_statistics()
         with open("evolutionary_logbook.txt", "w") as f:
@@ -402,9 +820,9 @@ class GeneticMapper(BaseMapper):
             self._simulation_manager.statistics.to_file()
         if self._dump_cache:
             self._simulation_manager.dump("mapping_cache.csv")
-        engine.cleanup()
         return result
 
+    @closes_simulation_manager
     def generate_pareto_front(
         self, graph, trace=None, representation=None, **kwargs
     ):
@@ -423,16 +841,7 @@ class GeneticMapper(BaseMapper):
            :obj:`lst` of :obj:`Mapping`: the list of generated mappings
         """
         self._simulation_manager.reset_statistics()
-        engine = _GeneticMapperEngine(
-            self.platform,
-            graph,
-            trace,
-            representation,
-            self._simulation_manager,
-            self._mapper_config,
-        )
-
-        _, logbook, hof = engine.run()
+        logbook, hof = self._evolve(graph, trace, representation)
 
         results = []
         self._simulation_manager.statistics.log_statistics()
@@ -445,10 +854,12 @@ class GeneticMapper(BaseMapper):
             results.append(mapping_object)
         self._simulation_manager.simulate(graph, trace, representation, results)
 
-        pareto = filter_pareto_front(results)
+        archive = ParetoArchive()
+        for mapping_object in results:
+            archive.add_mapping(mapping_object)
+        pareto = archive.items
         if self._record_statistics:
             self._simulation_manager.statistics.to_file()
         if self._dump_cache:
             self._simulation_manager.dump("mapping_cache.csv")
-        engine.cleanup()
         return pareto
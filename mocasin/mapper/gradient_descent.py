@@ -13,7 +13,11 @@ import tqdm
 
 from mocasin.mapper import BaseMapper
 from mocasin.mapper.random import RandomPartialMapper
-from mocasin.mapper.utils import SimulationManager, SimulationManagerConfig
+from mocasin.mapper.utils import (
+    SimulationManagerConfig,
+    closes_simulation_manager,
+    create_simulation_manager,
+)
 from mocasin.util import logging
 
 log = logging.getLogger(__name__)
@@ -78,6 +82,17 @@ class GradientDescentMapper(BaseMapper):
             Defaults to 2.
         momentum_decay (float, optional): To be described. Defaults to 0.5.
         parallel_points (int, optional): To be described. Defaults to 5.
+        cache_file (str, optional): Path to a persistent simulation cache
+            shared among runs. Defaults to None (no persistent cache).
+        gradient_samples (int, optional): Number of randomly chosen
+            coordinates along which the gradient is estimated in each
+            iteration. The other components of the gradient are set to zero.
+            If None, the full gradient is estimated. Defaults to None.
+        simulation_manager (str, optional): How mappings are evaluated,
+            "simulation" simulates them and "analytic" estimates them
+            analytically (see
+            :class:`~mocasin.mapper.utils.AnalyticSimulationManager`).
+            Defaults to "simulation".
     """
 
     def __init__(
@@ -94,6 +109,9 @@ class GradientDescentMapper(BaseMapper):
         jobs=2,
         momentum_decay=0.5,
         parallel_points=5,
+        cache_file=None,
+        gradient_samples=None,
+        simulation_manager="simulation",
     ):
         super().__init__(platform, full_mapper=True)
         random.seed(random_seed)
@@ -104,6 +122,7 @@ class GradientDescentMapper(BaseMapper):
         self.stepsize = stepsize
         self.momentum_decay = momentum_decay
         self.parallel_points = parallel_points
+        self.gradient_samples = gradient_samples
         self.dump_cache = dump_cache
         self.progress = progress
 
@@ -113,12 +132,14 @@ class GradientDescentMapper(BaseMapper):
             parallel=parallel,
             progress=progress,
             chunk_size=chunk_size,
+            cache_file=cache_file,
         )
-        self._simulation_manager = SimulationManager(
-            self.platform, config=simulation_config
+        self._simulation_manager = create_simulation_manager(
+            simulation_manager, self.platform, simulation_config
         )
         self._record_statistics = record_statistics
 
+    @closes_simulation_manager
     def generate_mapping(
         self,
         graph,
@@ -160,14 +181,14 @@ class GradientDescentMapper(BaseMapper):
             mappings.append(m)
 
         self.dim = len(mappings[0])
-        cur_sim_results = self._simulation_manager.simulate(
-            graph, trace, representation, mappings
+        active_points = list(range(self.parallel_points))
+        probed = active_points if self.gd_iterations > 0 else []
+        cur_exec_times, new_grads = self._evaluate(
+            graph, trace, representation, mappings, probed
         )
-        cur_exec_times = [x.exec_time for x in cur_sim_results]
         idx = np.argmin(cur_exec_times)
         self.best_mapping = mappings[idx]
         self.best_exec_time = cur_exec_times[idx]
-        active_points = list(range(self.parallel_points))
         if self.progress:
             iterations_range = tqdm.tqdm(range(self.gd_iterations))
         else:
@@ -183,14 +204,10 @@ class GradientDescentMapper(BaseMapper):
         )
 
         # main loop
-        for _ in iterations_range:
+        for iteration in iterations_range:
             old_grads = copy.copy(grads)
             for i in active_points:
-                grads[i] = self.momentum_decay * old_grads[
-                    i
-                ] + self.calculate_gradient(
-                    graph, trace, representation, mappings[i], cur_exec_times[i]
-                )
+                grads[i] = self.momentum_decay * old_grads[i] + new_grads[i]
                 log.debug(f"gradient (point {i}): {grads[i]}")
 
             before_last_mappings = copy.copy(last_mappings)
@@ -215,25 +232,14 @@ class GradientDescentMapper(BaseMapper):
                 mappings[i] = representation.approximate(np.array(mappings[i]))
                 log.debug(f"approximating to: {mappings[i]}")
 
-            cur_sim_results = self._simulation_manager.simulate(
-                graph, trace, representation, mappings
-            )
-            cur_exec_times = [x.exec_time for x in cur_sim_results]
-            idx = np.argmin(cur_exec_times)
-            log.info(f"{idx} best mapping in batch: {cur_exec_times[idx]}")
-            if cur_exec_times[idx] < self.best_exec_time:
-                log.info(
-                    f"better than old best time ({self.best_exec_time})."
-                    " Replacing"
-                )
-                self.best_exec_time = cur_exec_times[idx]
-                self.best_mapping = mappings[idx]
-
             # remove points on (local) minima or stuck on a loop
             finished_points = []
             for i in active_points:
-                # found local minimum
-                if np.allclose(grads[i], np.zeros(self.dim)):
+                # found local minimum. With a subsampled gradient, a zero
+                # gradient does not indicate a minimum.
+                if self._full_gradient() and np.allclose(
+                    grads[i], np.zeros(self.dim)
+                ):
                     log.info(f"Found local minimum in {i}. Removing point.")
                     finished_points.append(i)
 
@@ -252,6 +258,24 @@ class GradientDescentMapper(BaseMapper):
             for i in finished_points:
                 if i in active_points:
                     active_points.remove(i)
+
+            # the gradients for the next iteration are simulated in the same
+            # batch as the new mappings
+            last_iteration = iteration == self.gd_iterations - 1
+            probed = [] if last_iteration else active_points
+            cur_exec_times, new_grads = self._evaluate(
+                graph, trace, representation, mappings, probed
+            )
+            idx = np.argmin(cur_exec_times)
+            log.info(f"{idx} best mapping in batch: {cur_exec_times[idx]}")
+            if cur_exec_times[idx] < self.best_exec_time:
+                log.info(
+                    f"better than old best time ({self.best_exec_time})."
+                    " Replacing"
+                )
+                self.best_exec_time = cur_exec_times[idx]
+                self.best_mapping = mappings[idx]
+
             if len(active_points) == 0:
                 break
 
@@ -266,26 +290,94 @@ class GradientDescentMapper(BaseMapper):
 
         return representation.fromRepresentation(self.best_mapping)
 
-    def calculate_gradient(
-        self, graph, trace, representation, mapping, cur_exec_time
-    ):
-        grad = np.zeros(self.dim)
-        m_plus = []
-        m_minus = []
-        for i in range(self.dim):
-            evec = np.zeros(self.dim)
-            evec[i] = 1
-            m_plus.append(mapping + evec)
-            m_minus.append(mapping - evec)
+    def _full_gradient(self):
+        return (
+            self.gradient_samples is None or self.gradient_samples >= self.dim
+        )
 
-        sim_results = self._simulation_manager.simulate(
-            graph, trace, representation, m_plus + m_minus
+    def _gradient_coordinates(self):
+        """Choose the coordinates along which the gradient is estimated."""
+        if self._full_gradient():
+            return np.arange(self.dim)
+        coordinates = np.random.choice(
+            self.dim, self.gradient_samples, replace=False
         )
-        exec_times = [x.exec_time for x in sim_results]
+        return np.sort(coordinates)
+
+    def _probes(self, mapping, coordinates):
+        """The points of the central difference quotients at `mapping`."""
+        evecs = np.eye(self.dim)[coordinates]
+        mapping = np.asarray(mapping, dtype=float)
+        return list(mapping + evecs) + list(mapping - evecs)
 
-        for i in range(self.dim):
+    def _gradient(self, coordinates, exec_times, cur_exec_time):
+        """Calculate a gradient from the execution times of its probes."""
+        grad = np.zeros(self.dim)
+        num = len(coordinates)
+        for i, coordinate in enumerate(coordinates):
             diff_plus = exec_times[i] - cur_exec_time
             #  because of the -h in the denominator of the difference quotient
-            diff_minus = cur_exec_time - exec_times[i + self.dim]
-            grad[i] = (diff_plus + diff_minus) / 2
+            diff_minus = cur_exec_time - exec_times[i + num]
+            grad[coordinate] = (diff_plus + diff_minus) / 2
         return grad
+
+    def _simulate_points(self, graph, trace, representation, points):
+        """Simulate a batch of points and return their execution times.
+
+        The points are approximated first and each distinct mapping is only
+        simulated once.
+        """
+        points = np.array([np.asarray(p, dtype=float) for p in points])
+        if hasattr(representation, "approximateBatch"):
+            approximated = np.asarray(representation.approximateBatch(points))
+        else:
+            approximated = np.array(
+                [representation.approximate(p) for p in points]
+            )
+        unique, inverse = np.unique(approximated, axis=0, return_inverse=True)
+        sim_results = self._simulation_manager.simulate(
+            graph, trace, representation, list(unique)
+        )
+        exec_times = np.array([x.exec_time for x in sim_results])
+        return exec_times[inverse.reshape(-1)]
+
+    def _evaluate(self, graph, trace, representation, mappings, probed):
+        """Simulate mappings and the gradient probes around some of them.
+
+        All mappings and probes are simulated as a single batch.
+
+        Args:
+            mappings (list): the mappings
+            probed (list of int): the indices of the mappings at which the
+                gradient is calculated
+
+        Returns:
+            tuple: the execution times of `mappings` and a dictionary that
+                maps the indices in `probed` to the gradients
+        """
+        coordinates = {i: self._gradient_coordinates() for i in probed}
+        points = list(mappings)
+        for i in probed:
+            points.extend(self._probes(mappings[i], coordinates[i]))
+        exec_times = self._simulate_points(graph, trace, representation, points)
+        cur_exec_times = list(exec_times[: len(mappings)])
+        grads = {}
+        offset = len(mappings)
+        for i in probed:
+            num = 2 * len(coordinates[i])
+            grads[i] = self._gradient(
+                coordinates[i],
+                exec_times[offset : offset + num],
+                cur_exec_times[i],
+            )
+            offset += num
+        return cur_exec_times, grads
+
+    def calculate_gradient(
+        self, graph, trace, representation, mapping, cur_exec_time
+    ):
+        coordinates = self._gradient_coordinates()
+        exec_times = self._simulate_points(
+            graph, trace, representation, self._probes(mapping, coordinates)
+        )
+        return self._gradient(coordinates, exec_times, cur_exec_time)
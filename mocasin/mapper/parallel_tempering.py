@@ -0,0 +1,283 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+import math
+import os
+import random
+
+import numpy as np
+import tqdm
+
+from mocasin.mapper.simulated_annealing import SimulatedAnnealingMapper
+from mocasin.mapper.utils import closes_simulation_manager
+from mocasin.util import logging
+
+log = logging.getLogger(__name__)
+
+
+class ParallelTemperingMapper(SimulatedAnnealingMapper):
+    """Generates a full mapping by using parallel tempering.
+
+    Parallel tempering (replica exchange) runs multiple simulated annealing
+    chains at fixed temperatures that are geometrically spaced between the
+    initial and the final temperature. In each iteration, every chain
+    proposes a move and the moves of all chains are simulated together as a
+    single batch, which allows to simulate them in parallel. Periodically,
+    chains at neighbouring temperatures exchange their mappings following the
+    Metropolis criterion, such that good mappings found at high temperatures
+    migrate to the cold chains.
+
+    The search terminates once the coldest chain rejected `L` moves in a row,
+    where `L` is the same rejection limit as in the
+    :class:`SimulatedAnnealingMapper`, or after `max_iterations` iterations.
+
+    Args:
+        platform (Platform): A platform
+        random_seed (int, optional): A random seed for the RNG. Defautls to 42.
+        record_statistics (bool, optional): Record statistics on mappings
+            evaluated? Defautls to False.
+        num_chains (int, optional): Number of chains. Defaults to 4.
+        initial_temperature (float, optional): Temperature of the hottest
+            chain. Defaults to 1.0.
+        final_temperature (float, optional): Temperature of the coldest
+            chain. Defaults to 0.1.
+        exchange_interval (int, optional): Number of iterations between two
+            replica exchanges. Defaults to 5.
+        max_iterations (int, optional): Maximal number of iterations.
+            Defaults to 1000.
+        radius (float, optional): The radius for searching when moving.
+            Defaults to 3.0.
+        dump_cache (bool, optional): Dump the mapping cache? Defaults to False.
+        chunk_size (int, optional): Size of chunks for parallel simulation.
+            Defaults to None, which distributes the moves of one iteration
+            evenly among the jobs.
+        progress (bool, optional): Display simulation progress visually?
+            Defaults to False.
+        parallel (bool, optional): Execute simulations in parallel?
+            Defaults to True.
+        jobs (int, optional): Number of jobs for parallel simulation.
+            Defaults to 4.
+        cache_file (str, optional): Path to a persistent simulation cache
+            shared among runs. Defaults to None (no persistent cache).
+        bounded_simulation (bool, optional): Abort the simulation of the moves
+            as soon as they exceed the acceptance thresholds of all chains?
+            The random numbers of the acceptance checks are drawn for all
+            moves before the simulation, whether this option is set or not.
+            Hence, seeded runs take the same decisions with and without it.
+            Defaults to False.
+        simulation_manager (str, optional): How mappings are evaluated,
+            "simulation" simulates them and "analytic" estimates them
+            analytically (see
+            :class:`~mocasin.mapper.utils.AnalyticSimulationManager`).
+            Defaults to "simulation".
+    """
+
+    def __init__(
+        self,
+        platform,
+        random_seed=42,
+        record_statistics=False,
+        num_chains=4,
+        initial_temperature=1.0,
+        final_temperature=0.1,
+        exchange_interval=5,
+        max_iterations=1000,
+        radius=3.0,
+        dump_cache=False,
+        chunk_size=None,
+        progress=False,
+        parallel=True,
+        jobs=4,
+        cache_file=None,
+        bounded_simulation=False,
+        simulation_manager="simulation",
+    ):
+        if num_chains < 1:
+            raise ValueError(f"Invalid number of chains: {num_chains}")
+        if chunk_size is None:
+            # A batch only holds one move per chain. It is only simulated in
+            # parallel if it is larger than the chunk size.
+            chunk_size = max(1, num_chains // (jobs or os.cpu_count()))
+        super().__init__(
+            platform,
+            random_seed=random_seed,
+            record_statistics=record_statistics,
+            initial_temperature=initial_temperature,
+            final_temperature=final_temperature,
+            radius=radius,
+            dump_cache=dump_cache,
+            chunk_size=chunk_size,
+            progress=progress,
+            parallel=parallel,
+            jobs=jobs,
+            cache_file=cache_file,
+            bounded_simulation=bounded_simulation,
+            simulation_manager=simulation_manager,
+        )
+        if not initial_temperature >= final_temperature > 0:
+            raise ValueError(
+                "The initial temperature must be larger than the final "
+                "temperature, which must be positive"
+            )
+        self.num_chains = num_chains
+        self.exchange_interval = exchange_interval
+        self.max_iterations = max_iterations
+        self.temperatures = self.chain_temperatures()
+
+    def chain_temperatures(self):
+        """The temperatures of the chains, from the hottest to the coldest"""
+        if self.num_chains == 1:
+            return [self.final_temperature]
+        ratio = self.final_temperature / self.initial_temperature
+        return [
+            self.initial_temperature * ratio ** (k / (self.num_chains - 1))
+            for k in range(self.num_chains)
+        ]
+
+    def exchange_probability(self, exec_times, k):
+        """Probability to exchange the mappings of the chains `k` and `k+1`
+
+        Uses the same scaling of the execution time as
+        :meth:`SimulatedAnnealingMapper.query_accept`.
+        """
+        beta_k = 1 / (0.5 * self.temperatures[k] * self.initial_cost)
+        beta_l = 1 / (0.5 * self.temperatures[k + 1] * self.initial_cost)
+        exponent = (beta_k - beta_l) * (exec_times[k] - exec_times[k + 1])
+        if exponent >= 0:
+            return 1.0
+        return math.exp(exponent)
+
+    def exchange(self, mappings, exec_times, iteration):
+        """Exchange the mappings of neighbouring chains.
+
+        Alternates between the pairs starting at even and odd chains, such
+        that every pair is considered every other exchange.
+        """
+        start = (iteration // self.exchange_interval) % 2
+        for k in range(start, self.num_chains - 1, 2):
+            if self.exchange_probability(exec_times, k) > random.random():
+                mappings[k], mappings[k + 1] = mappings[k + 1], mappings[k]
+                exec_times[k], exec_times[k + 1] = (
+                    exec_times[k + 1],
+                    exec_times[k],
+                )
+
+    @closes_simulation_manager
+    def generate_mapping(
+        self,
+        graph,
+        trace=None,
+        representation=None,
+        processors=None,
+        partial_mapping=None,
+    ):
+        """Generate a full mapping using parallel tempering.
+
+        Args:
+            graph (DataflowGraph): a dataflow graph
+            trace (TraceGenerator, optional): a trace generator
+            representation (MappingRepresentation, optional): a mapping
+                representation object
+            processors (:obj:`list` of :obj:`Processor`, optional): a list of
+                processors to map to.
+            partial_mapping (Mapping, optional): a partial mapping to complete
+
+        Returns:
+            Mapping: the generated mapping.
+        """
+        self._simulation_manager.reset_statistics()
+        max_rejections = len(graph.processes()) * (
+            len(self.platform.processors()) - 1
+        )
+
+        if (
+            hasattr(representation, "canonical_operations")
+            and not representation.canonical_operations
+        ):
+            to_representation_fun = representation.toRepresentationNoncanonical
+        else:
+            to_representation_fun = representation.toRepresentation
+        mappings = [
+            to_representation_fun(
+                self.random_mapper.generate_mapping(
+                    graph, trace=trace, representation=representation
+                )
+            )
+            for _ in range(self.num_chains)
+        ]
+        exec_times = [
+            r.exec_time
+            for r in self._simulation_manager.simulate(
+                graph, trace, representation, mappings
+            )
+        ]
+        self.initial_cost = float(np.mean(exec_times))
+        best = int(np.argmin(exec_times))
+        best_mapping = mappings[best]
+        best_exec_time = exec_times[best]
+        rejections = 0
+
+        iteration = 0
+        if self.progress:
+            pbar = tqdm.tqdm(total=self.max_iterations)
+
+        while rejections < max_rejections and iteration < self.max_iterations:
+            moves = [
+                self.move(representation, mapping, temperature)
+                for mapping, temperature in zip(mappings, self.temperatures)
+            ]
+            rands = [random.random() for _ in moves]
+            time_budget = None
+            if self.bounded_simulation:
+                # a move is only accepted below the threshold of its chain
+                threshold = max(
+                    self.acceptance_threshold(exec_times[k], temperature, rand)
+                    for k, (temperature, rand) in enumerate(
+                        zip(self.temperatures, rands)
+                    )
+                )
+                if math.isfinite(threshold):
+                    time_budget = threshold
+            sim_results = self._simulation_manager.simulate(
+                graph, trace, representation, moves, time_budget=time_budget
+            )
+            for k, (move, simres) in enumerate(zip(moves, sim_results)):
+                cur_exec_time = simres.exec_time
+                faster = cur_exec_time < exec_times[k]
+                if simres.censored:
+                    # slower than any acceptance threshold
+                    faster = accept_randomly = False
+                elif not faster and cur_exec_time != exec_times[k]:
+                    prob = self.query_accept(
+                        cur_exec_time - exec_times[k], self.temperatures[k]
+                    )
+                    accept_randomly = prob > rands[k]
+                else:
+                    accept_randomly = False  # don't accept if no movement.
+                accepted = faster or accept_randomly
+                if accepted:
+                    mappings[k] = move
+                    exec_times[k] = cur_exec_time
+                    if cur_exec_time < best_exec_time:
+                        best_exec_time = cur_exec_time
+                        best_mapping = move
+                if k == self.num_chains - 1:
+                    rejections = 0 if accepted else rejections + 1
+
+            iteration += 1
+            if iteration % self.exchange_interval == 0:
+                self.exchange(mappings, exec_times, iteration)
+            if self.progress:
+                pbar.update(1)
+        if self.progress:
+            pbar.update(self.max_iterations - iteration)
+            pbar.close()
+        log.info(f"Parallel tempering finished after {iteration} iterations")
+
+        self._simulation_manager.statistics.log_statistics()
+        if self._record_statistics:
+            self._simulation_manager.statistics.to_file()
+        if self.dump_cache:
+            self._simulation_manager.dump("mapping_cache.csv")
+
+        return representation.fromRepresentation(best_mapping)
@@ -3,12 +3,63 @@
 #
 # Authors: Robert Khasanov
 
+import bisect
+
 import numpy as np
 
+# The maximal number of elements of the temporary arrays in the pairwise
+# comparison of costs.
+MAX_CHUNK_ELEMENTS = 2**22
+
+
+def _dominated_by(points, front):
+    """Check which points are weakly dominated by a point of a front."""
+    dominated = np.zeros(points.shape[0], dtype=bool)
+    chunk_size = max(1, MAX_CHUNK_ELEMENTS // max(1, points.size))
+    for start in range(0, front.shape[0], chunk_size):
+        chunk = front[start : start + chunk_size]
+        dominated |= np.any(
+            np.all(chunk[None, :, :] <= points[:, None, :], axis=2), axis=1
+        )
+    return dominated
+
+
+def _non_dominated(costs, block_size=256):
+    """Find the rows of a cost array that are not dominated by another row.
+
+    The rows are processed in blocks. Since the rows are sorted, a row can
+    only be dominated by a preceding row. Thus, the rows of a block are
+    compared to the front of the preceding blocks and to each other.
+
+    Args:
+        costs: An (n_points, n_costs) array of distinct rows, sorted
+            lexicographically
+
+    Returns:
+        A (n_points, ) boolean array
+    """
+    efficient = np.zeros(costs.shape[0], dtype=bool)
+    front = np.empty((0, costs.shape[1]))
+    for start in range(0, costs.shape[0], block_size):
+        block = costs[start : start + block_size]
+        candidates = np.flatnonzero(~_dominated_by(block, front))
+        points = block[candidates]
+        # dominates[j, i] is True, if point i weakly dominates point j
+        dominates = np.all(points[None, :, :] <= points[:, None, :], axis=2)
+        np.fill_diagonal(dominates, False)
+        candidates = candidates[~dominates.any(axis=1)]
+        efficient[start + candidates] = True
+        front = np.vstack([front, block[candidates]])
+    return efficient
+
 
 def _is_pareto_efficient(costs):
     """Find the Pareto-efficient points.
 
+    A point is Pareto-efficient, if no other point is at least as good in all
+    costs and better in one of them. Of multiple points with the same costs,
+    only the first one is considered Pareto-efficient.
+
     Args:
         costs: An (n_points, n_costs) array
 
@@ -16,18 +67,57 @@ def _is_pareto_efficient(costs):
         A (n_points, ) boolean array, indicating whether each point is Pareto
             efficient
     """
-    # Taken from
-    # https://stackoverflow.com/questions/32791911/fast-calculation-of-pareto-front-in-python # noqa
-    is_efficient = np.ones(costs.shape[0], dtype=bool)
-    for i, c in enumerate(costs):
-        if is_efficient[i]:
-            # Keep any point with a lower cost
-            is_efficient[is_efficient] = np.any(costs[is_efficient] < c, axis=1)
-            # And keep self
-            is_efficient[i] = True
+    costs = np.asarray(costs, dtype=float)
+    is_efficient = np.zeros(costs.shape[0], dtype=bool)
+    if costs.shape[0] == 0:
+        return is_efficient
+    # the unique rows are sorted lexicographically
+    unique, first = np.unique(costs, axis=0, return_index=True)
+    if unique.shape[1] == 1:
+        efficient = np.zeros(unique.shape[0], dtype=bool)
+        efficient[0] = True
+    elif unique.shape[1] == 2:
+        # sort and sweep: a point is efficient, if its second cost is lower
+        # than the second cost of all points with a lower first cost
+        best_before = np.minimum.accumulate(unique[:, 1])
+        efficient = np.empty(unique.shape[0], dtype=bool)
+        efficient[0] = True
+        efficient[1:] = unique[1:, 1] < best_before[:-1]
+    else:
+        efficient = _non_dominated(unique)
+    is_efficient[first[efficient]] = True
     return is_efficient
 
 
+def mapping_costs(mapping, processors=None, energy=None):
+    """Get the costs of a mapping.
+
+    The costs consist of a 0-1 value for each processor, indicating whether
+    the processor is used, the execution time and, optionally, the energy
+    consumption from the mapping metadata.
+
+    Args:
+        mapping (Mapping): a mapping
+        processors (list of Processor, optional): the processors of the
+            platform. Defaults to the processors of the mapping platform.
+        energy (bool, optional): whether to include the energy consumption.
+            Defaults to whether the mapping metadata contains an energy value.
+
+    Returns:
+        list: the costs
+    """
+    if processors is None:
+        processors = mapping.platform.processors()
+    if energy is None:
+        energy = bool(mapping.metadata.energy)
+    used = mapping.get_used_processors()
+    costs = [1 if p in used else 0 for p in processors]
+    costs.append(mapping.metadata.exec_time)
+    if energy:
+        costs.append(mapping.metadata.energy)
+    return costs
+
+
 def mark_pareto_front(mappings):
     """Find Pareto-efficient mappings.
 
@@ -48,24 +138,161 @@ def mark_pareto_front(mappings):
         return []
 
     processors = mappings[0].platform.processors()
-    num_costs = len(processors) + 1
-    if mappings[0].metadata.energy:
-        num_costs += 1
-    costs = np.empty((0, num_costs), float)
-    for m in mappings:
-        lm = [0] * len(processors)
-        procs = m.get_used_processors()
-        for i, p in enumerate(processors):
-            if p in procs:
-                lm[i] = 1
-        lm.append(m.metadata.exec_time)
-        if m.metadata.energy:
-            lm.append(m.metadata.energy)
-        costs = np.append(costs, [lm], axis=0)
+    energy = bool(mappings[0].metadata.energy)
+    costs = np.array(
+        [mapping_costs(m, processors, energy) for m in mappings], dtype=float
+    )
     flags = _is_pareto_efficient(costs)
     return list(flags)
 
 
+class ParetoArchive:
+    """An incrementally maintained Pareto front.
+
+    The archive keeps the Pareto-efficient entries among all entries added so
+    far. A new entry is rejected if an entry in the archive is at least as
+    good in all costs. Otherwise, it is added and all entries it dominates are
+    removed. Thus, the archive always holds the same entries as
+    :func:`filter_pareto_front` applied to all added entries, in the order in
+    which they were added.
+
+    With two costs, the front is kept sorted by the first cost, such that
+    adding an entry only requires a binary search (plus the removal of the
+    entries it dominates). Otherwise, a new entry is compared to the whole
+    front at once with vectorized operations.
+
+    Args:
+        num_costs (int, optional): the number of costs of each entry.
+            Defaults to the number of costs of the first entry.
+    """
+
+    def __init__(self, num_costs=None):
+        self.num_costs = num_costs
+        self._energy = None
+        self._counter = 0
+        # entries of the front
+        self._costs = None
+        self._items = []
+        self._order = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    @property
+    def items(self):
+        """The entries of the front in the order in which they were added."""
+        if self.num_costs == 2:
+            order = np.argsort(self._order, kind="stable")
+            return [self._items[i] for i in order]
+        return list(self._items)
+
+    @property
+    def costs(self):
+        """The costs of the front as an (n_entries, n_costs) array, in the
+        same order as :attr:`items`."""
+        if self._costs is None:
+            return np.empty((0, self.num_costs or 0))
+        if self.num_costs == 2:
+            order = np.argsort(self._order, kind="stable")
+            return np.array(self._costs, dtype=float).T[order].reshape(-1, 2)
+        return self._costs[: len(self._items)].copy()
+
+    def add(self, costs, item=None):
+        """Add an entry to the archive.
+
+        Args:
+            costs: the costs of the entry
+            item (optional): the object that is stored for the entry.
+                Defaults to the costs.
+
+        Returns:
+            bool: True if the entry was added to the front
+        """
+        costs = np.asarray(costs, dtype=float)
+        if self.num_costs is None:
+            self.num_costs = costs.shape[0]
+        elif costs.shape[0] != self.num_costs:
+            raise ValueError(
+                f"Expected {self.num_costs} costs, got {costs.shape[0]}"
+            )
+        if item is None:
+            item = tuple(costs)
+        self._counter += 1
+        if self.num_costs == 2:
+            return self._add_2d(costs, item)
+        return self._add(costs, item)
+
+    def update(self, entries):
+        """Add multiple entries given as pairs of costs and items.
+
+        Returns:
+            int: the number of entries that were added to the front
+        """
+        return sum(self.add(costs, item) for costs, item in entries)
+
+    def add_mapping(self, mapping):
+        """Add a mapping with the costs given by :func:`mapping_costs`.
+
+        Whether the energy consumption is part of the costs is determined by
+        the first mapping added to the archive.
+
+        Returns:
+            bool: True if the mapping was added to the front
+        """
+        if self._energy is None:
+            self._energy = bool(mapping.metadata.energy)
+        costs = mapping_costs(mapping, energy=self._energy)
+        return self.add(costs, mapping)
+
+    def _add_2d(self, costs, item):
+        if self._costs is None:
+            self._costs = ([], [])
+        first, second = self._costs
+        a, b = costs
+        pos = bisect.bisect_right(first, a)
+        # the entries up to pos have a lower or the same first cost, the
+        # last of them has the lowest second cost
+        if pos > 0 and second[pos - 1] <= b:
+            return False
+        # remove the dominated entries, which follow the insertion point
+        start = bisect.bisect_left(first, a)
+        end = start
+        while end < len(first) and second[end] >= b:
+            end += 1
+        del first[start:end]
+        del second[start:end]
+        del self._items[start:end]
+        del self._order[start:end]
+        first.insert(start, a)
+        second.insert(start, b)
+        self._items.insert(start, item)
+        self._order.insert(start, self._counter)
+        return True
+
+    def _add(self, costs, item):
+        size = len(self._items)
+        if self._costs is None:
+            self._costs = np.empty((16, self.num_costs))
+        front = self._costs[:size]
+        if np.any(np.all(front <= costs, axis=1)):
+            return False
+        keep = ~np.all(costs <= front, axis=1)
+        if not np.all(keep):
+            self._items = [i for i, k in zip(self._items, keep) if k]
+            size = len(self._items)
+            self._costs[:size] = front[keep]
+        if size == self._costs.shape[0]:
+            grown = np.empty((2 * size, self.num_costs))
+            grown[:size] = self._costs[:size]
+            self._costs = grown
+        self._costs[size] = costs
+        self._items.append(item)
+        return True
+
+
 def filter_pareto_front(mappings):
     """Filter Pareto-efficient mappings.
 
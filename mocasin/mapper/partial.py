@@ -108,12 +108,12 @@ class ComPartialMapper(BaseMapper):
         channels = partial_mapping.get_unmapped_channels()
         for c in channels:
             capacity = 16  # fixed channel bound this may cause problems
-            suitable_primitives = []
             src = partial_mapping.process_info(c.source).affinity
             sinks = [partial_mapping.process_info(s).affinity for s in c.sinks]
-            for p in partial_mapping.platform.primitives():
-                if p.is_suitable(src, sinks):
-                    suitable_primitives.append(p)
+            # the suitable primitives are sorted by their static costs
+            suitable_primitives = partial_mapping.platform.suitable_primitives(
+                src, sinks, c.token_size
+            )
             if len(suitable_primitives) == 0:
                 raise RuntimeError(
                     "com_map: Mapping failed! No suitable primitive for "
@@ -121,9 +121,7 @@ class ComPartialMapper(BaseMapper):
                     % (src.name, str(sinks))
                 )
 
-            primitive = ComPartialMapper._get_minimal_costs(
-                suitable_primitives, c, src, sinks
-            )
+            primitive = suitable_primitives[0]
             info = ChannelMappingInfo(primitive, capacity)
             partial_mapping.add_channel_info(c, info)
             log.debug(
@@ -132,28 +130,6 @@ class ComPartialMapper(BaseMapper):
             )
         return partial_mapping
 
-    @staticmethod
-    def _get_minimal_costs(primitives, channel, src, sinks):
-        """Returns the primitive with the minimum of static costs.
-        For channels with multiple sinks, the average cost is minimized.
-        """
-        costs = []
-        if len(sinks) == 1:
-            for p in primitives:
-                costs.append(p.static_costs(src, sinks[0], channel.token_size))
-            return primitives[costs.index(min(costs))]
-
-        if len(sinks) > 1:
-            avr_costs = []
-            for p in primitives:
-                for s in sinks:
-                    costs.append(p.static_costs(src, s, channel.token_size))
-                avr_costs.append(sum(costs))
-            return primitives[avr_costs.index(min(avr_costs))]
-        else:
-            # should never happen
-            return None
-
 
 class ProcPartialMapper(object):
     """Generates a partial mapping derived from a vector(tuple).
@@ -189,6 +165,11 @@ class ProcPartialMapper(object):
         self.vec_cp_mapping = dict(
             [(self.cp_vec_mapping[key], key) for key in self.cp_vec_mapping]
         )
+        # processes and channels in the order of the vector components
+        self._processes = sorted(graph.processes(), key=(lambda pr: pr.name))
+        self._channels = sorted(graph.channels(), key=(lambda ch: ch.name))
+        # the scheduler of each PE, filled on demand
+        self._schedulers = {}
 
     def get_pe_name_mapping(self):
         """Return the used mapping of PE names to integers"""
@@ -206,18 +187,43 @@ class ProcPartialMapper(object):
 
     @staticmethod
     def generate_pe_mapping_from_simple_vector(
-        vec, graph, platform, vec_pe_mapping, vec_cp_mapping
+        vec,
+        graph,
+        platform,
+        vec_pe_mapping,
+        vec_cp_mapping,
+        processes=None,
+        channels=None,
+        schedulers=None,
     ):
+        """Generate a mapping from a simple vector.
+
+        The optional arguments allow to reuse data that only depends on the
+        graph and the platform among multiple calls.
+
+        Args:
+            processes (list, optional): the processes of `graph` sorted by name
+            channels (list, optional): the channels of `graph` sorted by name
+            schedulers (dict, optional): a cache of the scheduler of each PE,
+                which is updated by this function
+        """
         mapping = Mapping(graph, platform)
+        if processes is None:
+            processes = sorted(graph.processes(), key=(lambda pr: pr.name))
+        if channels is None:
+            channels = sorted(graph.channels(), key=(lambda ch: ch.name))
+        if schedulers is None:
+            schedulers = {}
 
         # map processes to scheduler and processor
-        for i, p in enumerate(
-            sorted(graph.processes(), key=(lambda pr: pr.name))
-        ):
+        for i, p in enumerate(processes):
             # choose the desired processor from list
             pe = vec_pe_mapping[vec[i]]
             # choose the first scheduler from list
-            scheduler = platform.find_scheduler_for_processor(pe)
+            scheduler = schedulers.get(pe)
+            if scheduler is None:
+                scheduler = platform.find_scheduler_for_processor(pe)
+                schedulers[pe] = scheduler
             # set the affinity of the scheduler to the choosen PE
             affinity = pe
             # always set priority to 0
@@ -225,19 +231,17 @@ class ProcPartialMapper(object):
             info = ProcessMappingInfo(scheduler, affinity, priority)
             # configure mapping
             mapping.add_process_info(p, info)
-        if len(vec) > len(graph.processes()):
-            if len(vec) != (len(graph.processes()) + len(graph.channels())):
+        if len(vec) > len(processes):
+            if len(vec) != (len(processes) + len(channels)):
                 log.error(
                     f"Invalid mapping vector size. "
-                    f"Should be {len(graph.processes())}"
-                    f" or {len(graph.processes()) + len(graph.channels())}"
+                    f"Should be {len(processes)}"
+                    f" or {len(processes) + len(channels)}"
                 )
                 raise RuntimeError
 
-            n = len(graph.processes())
-            for j, c in enumerate(
-                sorted(graph.channels(), key=(lambda ch: ch.name))
-            ):
+            n = len(processes)
+            for j, c in enumerate(channels):
                 i = j + n
                 primitive = vec_cp_mapping[vec[i]]
                 capacity = 16  # fixed channel bound this may cause problems
@@ -289,6 +293,9 @@ class ProcPartialMapper(object):
             self.platform,
             self.vec_pe_mapping,
             self.vec_cp_mapping,
+            processes=self._processes,
+            channels=self._channels,
+            schedulers=self._schedulers,
         )
 
         # RK: Since the returned mapping object is created in the above call,
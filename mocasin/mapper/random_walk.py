@@ -11,7 +11,11 @@ import tqdm
 
 from mocasin.mapper import BaseMapper
 from mocasin.mapper.random import RandomMapper
-from mocasin.mapper.utils import SimulationManager, SimulationManagerConfig
+from mocasin.mapper.utils import (
+    SimulationManagerConfig,
+    closes_simulation_manager,
+    create_simulation_manager,
+)
 from mocasin.util import logging
 
 log = logging.getLogger(__name__)
@@ -45,6 +49,13 @@ class RandomWalkMapper(BaseMapper):
             Defaults to 10.
         jobs (int, optional): Number of jobs for parallel simulation.
             Defaults to 1.
+        cache_file (str, optional): Path to a persistent simulation cache
+            shared among runs. Defaults to None (no persistent cache).
+        simulation_manager (str, optional): How mappings are evaluated,
+            "simulation" simulates them and "analytic" estimates them
+            analytically (see
+            :class:`~mocasin.mapper.utils.AnalyticSimulationManager`).
+            Defaults to "simulation".
     """
 
     def __init__(
@@ -59,6 +70,8 @@ class RandomWalkMapper(BaseMapper):
         dump_cache=False,
         chunk_size=10,
         jobs=1,
+        cache_file=None,
+        simulation_manager="simulation",
     ):
         super().__init__(platform, full_mapper=True)
         self.random_mapper = RandomMapper(
@@ -81,13 +94,15 @@ class RandomWalkMapper(BaseMapper):
             parallel=parallel,
             progress=progress,
             chunk_size=chunk_size,
+            cache_file=cache_file,
         )
-        self._simulation_manager = SimulationManager(
-            self.platform, config=simulation_config
+        self._simulation_manager = create_simulation_manager(
+            simulation_manager, self.platform, simulation_config
         )
 
         self._record_statistics = record_statistics
 
+    @closes_simulation_manager
     def generate_mapping(
         self,
         graph,
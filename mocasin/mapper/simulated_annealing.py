@@ -3,6 +3,7 @@
 #
 # Authors: Andrés Goens, Robert Khasanov
 
+import math
 import random
 
 import numpy as np
@@ -10,7 +11,12 @@ import tqdm
 
 from mocasin.mapper import BaseMapper
 from mocasin.mapper.random import RandomPartialMapper
-from mocasin.mapper.utils import SimulationManager, SimulationManagerConfig
+from mocasin.mapper.surrogate import SurrogateScreening
+from mocasin.mapper.utils import (
+    SimulationManagerConfig,
+    closes_simulation_manager,
+    create_simulation_manager,
+)
 from mocasin.util import logging
 
 log = logging.getLogger(__name__)
@@ -44,6 +50,29 @@ class SimulatedAnnealingMapper(BaseMapper):
             Defaults to False.
         jobs (int, optional): Number of jobs for parallel simulation.
             Defaults to 1.
+        cache_file (str, optional): Path to a persistent simulation cache
+            shared among runs. Defaults to None (no persistent cache).
+        surrogate (bool, optional): Predict the execution time of moves with
+            a surrogate model and reject moves that would most likely be
+            rejected without simulating them? Defaults to False.
+        surrogate_exploration (float, optional): Probability of simulating a
+            move although the surrogate model predicts its rejection.
+            Defaults to 0.1.
+        surrogate_min_samples (int, optional): Number of simulation results
+            required before the surrogate model is used. Defaults to 20.
+        bounded_simulation (bool, optional): Abort the simulation of a move
+            as soon as it is certain that the move will be rejected? The
+            random number of the acceptance check is drawn before the
+            simulation, so the decision for a given random number is the same
+            as with a full simulation. However, the random number is then
+            drawn for every move, not only for slower ones. This shifts the
+            random number stream, so seeded runs take different paths than
+            with this option disabled. Defaults to False.
+        simulation_manager (str, optional): How mappings are evaluated,
+            "simulation" simulates them and "analytic" estimates them
+            analytically (see
+            :class:`~mocasin.mapper.utils.AnalyticSimulationManager`).
+            Defaults to "simulation".
     """
 
     def __init__(
@@ -60,6 +89,12 @@ class SimulatedAnnealingMapper(BaseMapper):
         progress=False,
         parallel=False,
         jobs=1,
+        cache_file=None,
+        surrogate=False,
+        surrogate_exploration=0.1,
+        surrogate_min_samples=20,
+        bounded_simulation=False,
+        simulation_manager="simulation",
     ):
         super().__init__(platform, full_mapper=True)
         random.seed(random_seed)
@@ -71,6 +106,10 @@ class SimulatedAnnealingMapper(BaseMapper):
         self.radius = radius
         self.progress = progress
         self.dump_cache = dump_cache
+        self.surrogate = surrogate
+        self.surrogate_exploration = surrogate_exploration
+        self.surrogate_min_samples = surrogate_min_samples
+        self.bounded_simulation = bounded_simulation
 
         if not (1 > self.p > 0):
             log.error(
@@ -85,9 +124,10 @@ class SimulatedAnnealingMapper(BaseMapper):
             parallel=parallel,
             progress=progress,
             chunk_size=chunk_size,
+            cache_file=cache_file,
         )
-        self._simulation_manager = SimulationManager(
-            self.platform, config=simulation_config
+        self._simulation_manager = create_simulation_manager(
+            simulation_manager, self.platform, simulation_config
         )
         self._record_statistics = record_statistics
 
@@ -107,6 +147,65 @@ class SimulatedAnnealingMapper(BaseMapper):
 
         return normalized_probability
 
+    def acceptance_threshold(self, exec_time, temperature, rand):
+        """The execution time up to which a move is accepted.
+
+        A move from a mapping with `exec_time` is accepted if
+        :meth:`query_accept` for its slowdown exceeds `rand`, which is the
+        case if and only if its execution time is below the returned
+        threshold. Hence, the simulation of the move can be aborted once it
+        exceeds the threshold.
+
+        Returns:
+            float: the threshold (infinite if any execution time would be
+                accepted)
+        """
+        if rand <= 0:
+            return math.inf
+        return exec_time - 0.5 * temperature * self.initial_cost * math.log(
+            rand
+        )
+
+    def _predicted_rejection(
+        self,
+        screening,
+        graph,
+        trace,
+        representation,
+        mapping,
+        last_exec_time,
+        temperature,
+    ):
+        """Check whether a move would most likely be rejected.
+
+        Moves with a cached simulation result are never rejected by the
+        surrogate, since their exact result is available for free. Otherwise,
+        the execution time of the move is predicted by the surrogate model.
+        A move is predicted to be rejected, if it is predicted to be slower
+        than the current mapping and the random acceptance check fails for
+        the predicted execution time. With the exploration probability of the
+        surrogate, the move is simulated anyway. The accuracy of the
+        prediction is recorded if the move is simulated.
+
+        Returns:
+            tuple: whether the move is rejected and the predicted execution
+                time (None if the move is cached or the surrogate model is not
+                trained yet)
+        """
+        if screening.lookup(graph, trace, representation, [mapping])[0]:
+            return False, None
+        prediction = screening.predict(graph, [mapping])
+        if prediction is None:
+            return False, None
+        predicted = prediction[0][0]
+        if predicted < last_exec_time or screening.explore():
+            return False, predicted
+        prob = self.query_accept(predicted - last_exec_time, temperature)
+        if prob > random.random():
+            return False, predicted
+        screening.skip()
+        return True, predicted
+
     def move(self, representation, mapping, temperature):
         radius = self.radius
         while 1:
@@ -119,6 +218,7 @@ class SimulatedAnnealingMapper(BaseMapper):
                 log.error("Could not mutate mapping")
                 raise RuntimeError("Could not mutate mapping")
 
+    @closes_simulation_manager
     def generate_mapping(
         self,
         graph,
@@ -142,6 +242,13 @@ class SimulatedAnnealingMapper(BaseMapper):
             Mapping: the generated mapping.
         """
         self._simulation_manager.reset_statistics()
+        screening = None
+        if self.surrogate:
+            screening = SurrogateScreening(
+                self._simulation_manager,
+                exploration=self.surrogate_exploration,
+                min_samples=self.surrogate_min_samples,
+            )
         # R_max = L
         max_rejections = len(graph.processes()) * (
             len(self.platform.processors()) - 1
@@ -180,19 +287,52 @@ class SimulatedAnnealingMapper(BaseMapper):
             )
             log.info(f"Current temperature {temperature}")
             mapping = self.move(representation, last_mapping, temperature)
-            cur_simres = self._simulation_manager.simulate(
-                graph, trace, representation, [mapping]
-            )[0]
-            cur_exec_time = cur_simres.exec_time
-            faster = cur_exec_time < last_exec_time
-            if not faster and cur_exec_time != last_exec_time:
-                prob = self.query_accept(
-                    cur_exec_time - last_exec_time, temperature
+            rejected, predicted = False, None
+            if screening is not None:
+                rejected, predicted = self._predicted_rejection(
+                    screening,
+                    graph,
+                    trace,
+                    representation,
+                    mapping,
+                    last_exec_time,
+                    temperature,
                 )
-                rand = random.random()
-                accept_randomly = prob > rand
+            if rejected:
+                faster = accept_randomly = False
             else:
-                accept_randomly = False  # don't accept if no movement.
+                rand = None
+                time_budget = None
+                if self.bounded_simulation:
+                    rand = random.random()
+                    threshold = self.acceptance_threshold(
+                        last_exec_time, temperature, rand
+                    )
+                    if math.isfinite(threshold):
+                        time_budget = threshold
+                cur_simres = self._simulation_manager.simulate(
+                    graph,
+                    trace,
+                    representation,
+                    [mapping],
+                    time_budget=time_budget,
+                )[0]
+                if predicted is not None:
+                    screening.record([predicted], [cur_simres])
+                cur_exec_time = cur_simres.exec_time
+                faster = cur_exec_time < last_exec_time
+                if cur_simres.censored:
+                    # slower than the acceptance threshold
+                    faster = accept_randomly = False
+                elif not faster and cur_exec_time != last_exec_time:
+                    prob = self.query_accept(
+                        cur_exec_time - last_exec_time, temperature
+                    )
+                    if rand is None:
+                        rand = random.random()
+                    accept_randomly = prob > rand
+                else:
+                    accept_randomly = False  # don't accept if no movement.
             if faster or accept_randomly:
                 # accept
                 if cur_exec_time < best_exec_time:
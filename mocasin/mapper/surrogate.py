@@ -0,0 +1,384 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+"""Surrogate models for pre-screening candidate mappings.
+
+Search-based mappers generate many candidate mappings, but only few of them
+turn out to be good. A surrogate model that is trained online from the
+results in the cache of the simulation manager predicts the execution time
+of candidates before they are simulated. Candidates that are predicted to be
+bad are not simulated, except for a configurable exploration share that
+keeps the model from reinforcing its own errors.
+"""
+
+import itertools
+import math
+import random
+
+import numpy as np
+
+from mocasin.simulate import SimulationResult
+from mocasin.util import logging
+
+log = logging.getLogger(__name__)
+
+# marks cache entries that were not scanned yet
+_UNSEEN = object()
+
+
+class SurrogateModel:
+    """A ridge regression model of the execution time and energy of mappings
+
+    The model is trained on mapping vectors of a representation. If all
+    components of the training vectors are integers (as in the simple vector
+    and symmetry representations), the features are a one-hot encoding of
+    each component and the number of components with each value (i.e., the
+    number of processes mapped to each PE). Otherwise, the features are the
+    components and their squares. The model predicts the logarithm of the
+    execution time, such that the predictions are always positive.
+
+    Samples may be censored, i.e., their execution time is only a lower
+    bound (see :class:`~mocasin.simulate.SimulationResult`). For training,
+    the execution time of a censored sample is replaced by the prediction if
+    the prediction exceeds the bound, and the model is fitted again.
+
+    Args:
+        regularization (float): the weight of the L2 regularization
+        max_samples (int): the maximum number of samples used for training.
+            If more samples are added, the oldest ones are discarded.
+    """
+
+    def __init__(self, regularization=1.0, max_samples=5000):
+        self.regularization = regularization
+        self.max_samples = max_samples
+        # the execution time, energy and censoring of each mapping vector
+        self._samples = {}
+        self._weights = None
+        self._energy_weights = None
+        self._categorical = None
+        self._num_values = 0
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, vector, exec_time, energy=None, censored=False):
+        """Add a training sample
+
+        A previous sample of the same vector is replaced.
+
+        Args:
+            vector: the mapping vector
+            exec_time (float): the simulated execution time
+            energy (float, optional): the simulated dynamic energy
+            censored (bool, optional): whether `exec_time` is only a lower
+                bound of the execution time. The energy of censored samples
+                is ignored.
+        """
+        vector = tuple(vector)
+        if energy is None or censored:
+            energy = np.nan
+        self._samples.pop(vector, None)
+        self._samples[vector] = (exec_time, energy, censored)
+        if len(self._samples) > self.max_samples:
+            del self._samples[next(iter(self._samples))]
+        self._weights = None
+
+    def _features(self, vectors):
+        vectors = np.asarray(vectors, dtype=float)
+        num = vectors.shape[0]
+        ones = np.ones((num, 1))
+        if not self._categorical:
+            return np.hstack([ones, vectors, vectors**2])
+        values = np.rint(vectors).astype(int)
+        one_hot = values[:, :, None] == np.arange(self._num_values)
+        counts = one_hot.sum(axis=1)
+        return np.hstack([ones, one_hot.reshape(num, -1), counts])
+
+    def _solve(self, features, targets):
+        gram = features.T @ features
+        gram += self.regularization * np.eye(gram.shape[0])
+        # do not penalize the bias
+        gram[0, 0] -= self.regularization
+        return np.linalg.lstsq(gram, features.T @ targets, rcond=None)[0]
+
+    def fit(self):
+        """Train the model on all samples"""
+        vectors = np.array(list(self._samples), dtype=float)
+        exec_times, energies, censored = (
+            np.array(values) for values in zip(*self._samples.values())
+        )
+        self._categorical = bool(np.all(vectors == np.rint(vectors)))
+        if self._categorical:
+            self._num_values = int(vectors.max()) + 1
+        features = self._features(vectors)
+        targets = np.log(exec_times)
+        self._weights = self._solve(features, targets)
+        if np.any(censored):
+            bounds = targets[censored]
+            for _ in range(3):
+                targets[censored] = np.maximum(
+                    bounds, features[censored] @ self._weights
+                )
+                self._weights = self._solve(features, targets)
+        complete = ~censored
+        if np.any(complete) and np.all(np.isfinite(energies[complete])):
+            self._energy_weights = self._solve(
+                features[complete], energies[complete]
+            )
+        else:
+            self._energy_weights = None
+
+    def predict(self, vectors):
+        """Predict the execution time and energy of mappings
+
+        Args:
+            vectors: a list or 2-dimensional array of mapping vectors
+
+        Returns:
+            tuple: the predicted execution times and dynamic energies as
+                arrays. The energies are None if the training samples have no
+                energy.
+        """
+        if self._weights is None:
+            self.fit()
+        features = self._features(vectors)
+        exec_times = np.exp(features @ self._weights)
+        energies = None
+        if self._energy_weights is not None:
+            energies = features @ self._energy_weights
+        return exec_times, energies
+
+
+class SurrogateScreening:
+    """Pre-screen candidate mappings with a surrogate model
+
+    The surrogate model is trained from the cache of the simulation manager.
+    Censored results are used as lower bounds of the execution time, and they
+    are updated once a complete result replaces them in the cache. Screening
+    starts once the cache holds at least `min_samples` results.
+    Skipped simulations and the accuracy of the predictions are recorded in
+    the statistics of the simulation manager.
+
+    Args:
+        simulation_manager (SimulationManager): the simulation manager whose
+            cache is used for training and which simulates the selected
+            candidates
+        keep (float): the share of the candidates in a batch that is
+            simulated
+        exploration (float): the share of the simulated candidates that is
+            chosen randomly instead of by the prediction. For single
+            candidates, this is the probability that a candidate is simulated
+            although it is predicted to be bad.
+        min_samples (int): the number of simulation results required before
+            candidates are screened
+        model (SurrogateModel, optional): the surrogate model
+    """
+
+    def __init__(
+        self,
+        simulation_manager,
+        keep=0.5,
+        exploration=0.1,
+        min_samples=20,
+        model=None,
+    ):
+        if not 0 < keep <= 1:
+            raise ValueError(f"Invalid share of kept candidates: {keep}")
+        if not 0 <= exploration <= 1:
+            raise ValueError(f"Invalid exploration share: {exploration}")
+        self.simulation_manager = simulation_manager
+        self.keep = keep
+        self.exploration = exploration
+        self.min_samples = min_samples
+        self.model = model or SurrogateModel()
+        self._graph = None
+        self._num_cached = 0
+        # the cached vectors without a complete result, and the result that
+        # was last seen for each of them
+        self._incomplete = {}
+
+    @property
+    def statistics(self):
+        return self.simulation_manager.statistics
+
+    def _update(self, graph):
+        """Add the new results in the simulation cache to the model"""
+        if graph is not self._graph:
+            self._graph = graph
+            self._num_cached = 0
+            self._incomplete = {}
+        cache = self.simulation_manager.cache_entries(graph)
+        # results are replaced in place, hence the incomplete entries are
+        # scanned again
+        for vector in itertools.islice(cache, self._num_cached, None):
+            self._incomplete[vector] = _UNSEEN
+        self._num_cached = len(cache)
+        for vector, seen in list(self._incomplete.items()):
+            result = cache[vector]
+            if result is seen:
+                continue
+            if result is None or result.censored:
+                self._incomplete[vector] = result
+            else:
+                del self._incomplete[vector]
+            if result is None:
+                continue
+            if not (math.isfinite(result.exec_time) and result.exec_time > 0):
+                continue
+            self.model.add(
+                vector,
+                result.exec_time,
+                result.dynamic_energy,
+                censored=result.censored,
+            )
+
+    def predict(self, graph, vectors):
+        """Predict the execution time and energy of candidate mappings
+
+        Returns:
+            tuple: the predicted execution times and energies (see
+                :meth:`SurrogateModel.predict`) or None if the model has not
+                seen enough samples yet
+        """
+        self._update(graph)
+        if len(self.model) < self.min_samples:
+            return None
+        return self.model.predict(vectors)
+
+    def lookup(self, graph, trace, representation, vectors):
+        """Look up the candidates in the cache of the simulation manager
+
+        Returns:
+            list: the cached simulation result of each candidate, or None if
+                the candidate has no complete result in the cache
+        """
+        return self.simulation_manager.lookup_results(
+            graph, trace, representation, vectors
+        )
+
+    def explore(self):
+        """Decide whether a candidate that is predicted to be bad is
+        simulated anyway"""
+        return random.random() < self.exploration
+
+    def skip(self, num=1):
+        """Record that the simulation of `num` candidates was skipped"""
+        self.statistics.surrogate_skipped(num)
+
+    def record(self, predicted, simulated):
+        """Record the accuracy of predicted execution times"""
+        for pred, result in zip(predicted, simulated):
+            if result.censored or not math.isfinite(result.exec_time):
+                continue
+            self.statistics.surrogate_prediction(pred, result.exec_time)
+
+    def record_late(self, predicted, simulated):
+        """Record that skipped candidates were simulated after all
+
+        Args:
+            predicted (list of float): the execution times that were
+                predicted when the candidates were skipped
+            simulated (list of SimulationResult): the simulation results
+        """
+        self.skip(-len(simulated))
+        self.record(predicted, simulated)
+
+    def select(self, graph, trace, representation, vectors, num=None):
+        """Select the candidates that should be simulated
+
+        Candidates with a result in the cache of the simulation manager are
+        always selected, since they do not need to be simulated. The
+        remaining selection consists of the uncached candidates with the
+        lowest predicted execution time and a random exploration share of
+        the other uncached ones.
+
+        Args:
+            vectors: the candidate mapping vectors
+            num (int, optional): the total number of candidates to select,
+                including the cached ones. Defaults to the `keep` share of the
+                candidates.
+
+        Returns:
+            tuple: the indices of the selected candidates, the cached results
+                (None for uncached candidates) and the predicted execution
+                times and energies of all candidates. For cached candidates,
+                the predictions are the cached results. The prediction is None
+                if the model is not trained yet, in which case all candidates
+                are selected.
+        """
+        cached = self.lookup(graph, trace, representation, vectors)
+        uncached = [i for i, res in enumerate(cached) if res is None]
+        prediction = None
+        if uncached:
+            prediction = self.predict(graph, [vectors[i] for i in uncached])
+        if prediction is None:
+            return list(range(len(vectors))), cached, None
+
+        exec_times = np.empty(len(vectors))
+        energies = None if prediction[1] is None else np.empty(len(vectors))
+        for i, res in enumerate(cached):
+            if res is not None:
+                exec_times[i] = res.exec_time
+                if energies is not None:
+                    energy = res.dynamic_energy
+                    energies[i] = np.nan if energy is None else energy
+        exec_times[uncached] = prediction[0]
+        if energies is not None:
+            energies[uncached] = prediction[1]
+
+        if num is None:
+            num = max(1, int(math.ceil(self.keep * len(vectors))))
+        num = min(max(num - (len(vectors) - len(uncached)), 0), len(uncached))
+        num_explore = int(round(self.exploration * num))
+        order = [uncached[i] for i in np.argsort(prediction[0], kind="stable")]
+        selected = order[: num - num_explore]
+        remaining = order[num - num_explore :]
+        selected += random.sample(remaining, num_explore)
+        selected += [i for i, res in enumerate(cached) if res is not None]
+        return sorted(int(i) for i in selected), cached, (exec_times, energies)
+
+    def simulate(self, graph, trace, representation, vectors):
+        """Simulate the promising candidates and predict the others
+
+        Cached candidates are never predicted, their cached results are
+        returned instead.
+
+        Returns:
+            tuple: a list of simulation results in the order of `vectors`
+                and a list of booleans that indicates which results were
+                simulated. The results of candidates that were not simulated
+                are the predictions of the model.
+        """
+        selected, cached, prediction = self.select(
+            graph, trace, representation, vectors
+        )
+        results = self.simulation_manager.simulate(
+            graph, trace, representation, [vectors[i] for i in selected]
+        )
+        if prediction is None:
+            return results, [True] * len(vectors)
+        exec_times, energies = prediction
+        new = [k for k, i in enumerate(selected) if cached[i] is None]
+        self.record(
+            [exec_times[selected[k]] for k in new], [results[k] for k in new]
+        )
+        self.skip(len(vectors) - len(selected))
+        all_results = []
+        simulated = []
+        results = iter(results)
+        selected = set(selected)
+        for i in range(len(vectors)):
+            if i in selected:
+                all_results.append(next(results))
+                simulated.append(True)
+            else:
+                energy = None if energies is None else float(energies[i])
+                all_results.append(
+                    SimulationResult(
+                        exec_time=float(exec_times[i]),
+                        static_energy=None,
+                        dynamic_energy=energy,
+                    )
+                )
+                simulated.append(False)
+        return all_results, simulated
@@ -3,6 +3,7 @@
 #
 # Authors: Andrés Goens, Robert Khasanov
 
+import math
 import random
 
 import numpy as np
@@ -10,7 +11,12 @@ import tqdm
 
 from mocasin.mapper import BaseMapper
 from mocasin.mapper.random import RandomPartialMapper
-from mocasin.mapper.utils import SimulationManager, SimulationManagerConfig
+from mocasin.mapper.surrogate import SurrogateScreening
+from mocasin.mapper.utils import (
+    SimulationManagerConfig,
+    closes_simulation_manager,
+    create_simulation_manager,
+)
 from mocasin.util import logging
 
 log = logging.getLogger(__name__)
@@ -43,6 +49,29 @@ class TabuSearchMapper(BaseMapper):
             Defaults to False.
         jobs (int, optional): Number of jobs for parallel simulation.
             Defaults to 1.
+        cache_file (str, optional): Path to a persistent simulation cache
+            shared among runs. Defaults to None (no persistent cache).
+        surrogate (bool, optional): Generate more candidate moves than
+            `move_set_size` and only simulate the most promising ones
+            according to a surrogate model? Defaults to False.
+        surrogate_keep (float, optional): Share of the generated candidate
+            moves that is simulated if the surrogate model is enabled.
+            Defaults to 0.5.
+        surrogate_exploration (float, optional): Share of the simulated
+            moves that is chosen randomly instead of by the surrogate model.
+            Defaults to 0.1.
+        surrogate_min_samples (int, optional): Number of simulation results
+            required before the surrogate model is used. Defaults to 20.
+        reuse_neighbours (bool, optional): Reuse the candidates of the
+            previous iteration that are within the radius of the current
+            mapping as candidate moves? Up to half of the move set is reused,
+            only the remaining candidates are newly generated and simulated.
+            Defaults to False.
+        simulation_manager (str, optional): How mappings are evaluated,
+            "simulation" simulates them and "analytic" estimates them
+            analytically (see
+            :class:`~mocasin.mapper.utils.AnalyticSimulationManager`).
+            Defaults to "simulation".
     """
 
     def __init__(
@@ -60,6 +89,13 @@ class TabuSearchMapper(BaseMapper):
         progress=False,
         parallel=False,
         jobs=1,
+        cache_file=None,
+        surrogate=False,
+        surrogate_keep=0.5,
+        surrogate_exploration=0.1,
+        surrogate_min_samples=20,
+        reuse_neighbours=False,
+        simulation_manager="simulation",
     ):
         super().__init__(platform, full_mapper=True)
         random.seed(random_seed)
@@ -73,6 +109,13 @@ class TabuSearchMapper(BaseMapper):
         self.radius = radius
         self.progress = progress
         self.tabu_moves = dict()
+        self.surrogate = surrogate
+        self.surrogate_keep = surrogate_keep
+        self.surrogate_exploration = surrogate_exploration
+        self.surrogate_min_samples = surrogate_min_samples
+        self._screening = None
+        self.reuse_neighbours = reuse_neighbours
+        self._neighbours = {}
 
         # save parameters to simulation manager
         simulation_config = SimulationManagerConfig(
@@ -80,22 +123,89 @@ class TabuSearchMapper(BaseMapper):
             parallel=parallel,
             progress=progress,
             chunk_size=chunk_size,
+            cache_file=cache_file,
         )
-        self._simulation_manager = SimulationManager(
-            self.platform, config=simulation_config
+        self._simulation_manager = create_simulation_manager(
+            simulation_manager, self.platform, simulation_config
         )
         self._record_statistics = record_statistics
 
-    def update_candidate_moves(self, graph, trace, representation, mapping):
+    def _reused_moves(self, mapping):
+        """Select candidate moves from the candidates of the previous
+        iteration.
+
+        Candidates whose distance to `mapping` is positive and at most the
+        radius are reused with their simulated execution time. At most half
+        of the move set is reused, such that the search keeps exploring.
+        """
+        mapping = np.array(mapping)
+        moves = []
+        for vector, exec_time in self._neighbours.items():
+            move = np.array(vector) - mapping
+            if 0 < np.linalg.norm(move) <= self.radius:
+                moves.append((tuple(move), exec_time))
+        num = min(len(moves), self.move_set_size // 2)
+        return set(random.sample(moves, num))
+
+    def _screen_candidates(self, graph, trace, representation, mapping, num):
+        """Generate and simulate `num` candidate mappings of an iteration.
+
+        If the surrogate model is enabled and trained, more candidates are
+        generated. Candidates with a cached simulation result are always
+        kept, and of the remaining ones only the most promising (and a random
+        exploration share) are simulated, such that about `num` candidates
+        are evaluated in total.
+        """
+        screening = self._screening
+        num_selected = num
+        if screening is not None:
+            num = int(math.ceil(num / screening.keep))
         new_mappings = representation._uniformFromBall(
-            mapping, self.radius, self.move_set_size
+            mapping, self.radius, num
         )
         new_mappings = list(map(np.array, new_mappings))
+        predicted = None
+        if screening is not None:
+            selected, cached, prediction = screening.select(
+                graph,
+                trace,
+                representation,
+                new_mappings,
+                num=num_selected,
+            )
+            if prediction is None and any(res is None for res in cached):
+                selected = range(min(num_selected, len(new_mappings)))
+            elif prediction is not None:
+                predicted = [
+                    (k, prediction[0][i])
+                    for k, i in enumerate(selected)
+                    if cached[i] is None
+                ]
+                screening.skip(len(new_mappings) - len(selected))
+            new_mappings = [new_mappings[i] for i in selected]
         sim_results = self._simulation_manager.simulate(
             graph, trace, representation, new_mappings
         )
+        if predicted is not None:
+            screening.record(
+                [pred for _, pred in predicted],
+                [sim_results[k] for k, _ in predicted],
+            )
+        return new_mappings, sim_results
+
+    def update_candidate_moves(self, graph, trace, representation, mapping):
+        moves = set()
+        if self.reuse_neighbours:
+            moves = self._reused_moves(mapping)
+        new_mappings, sim_results = self._screen_candidates(
+            graph,
+            trace,
+            representation,
+            mapping,
+            self.move_set_size - len(moves),
+        )
         sim_exec_times = [x.exec_time for x in sim_results]
-        moves = set(
+        moves = moves.union(
             zip(
                 [
                     tuple(new_mapping - np.array(mapping))
@@ -132,6 +242,10 @@ class TabuSearchMapper(BaseMapper):
                 "The radius might be set too small?"
             )
         self.moves = moves
+        self._neighbours = {
+            tuple(np.array(mapping) + np.array(move)): exec_time
+            for move, exec_time in moves
+        }
 
     def move(self, best):
         delete = []
@@ -182,6 +296,7 @@ class TabuSearchMapper(BaseMapper):
         )
         return sorted(moves, key=lambda x: x[1])[0]
 
+    @closes_simulation_manager
     def generate_mapping(
         self,
         graph,
@@ -205,6 +320,15 @@ class TabuSearchMapper(BaseMapper):
             Mapping: the generated mapping.
         """
         self._simulation_manager.reset_statistics()
+        self._neighbours = {}
+        self._screening = None
+        if self.surrogate:
+            self._screening = SurrogateScreening(
+                self._simulation_manager,
+                keep=self.surrogate_keep,
+                exploration=self.surrogate_exploration,
+                min_samples=self.surrogate_min_samples,
+            )
         if processors:
             raise NotImplementedError(
                 "This mapper does not support `processors` argument"
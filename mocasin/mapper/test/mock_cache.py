@@ -8,10 +8,26 @@ from mocasin.mapper.utils import Statistics
 
 class MockMappingCache:
     def __init__(self, simres_evaluation_function, mocker):
-        self.simulate = lambda g, t, r, x: list(
-            map(simres_evaluation_function, x)
-        )
+        self._evaluate = simres_evaluation_function
+        self._cache = {}
         self.statistics = Statistics(mocker.Mock())
 
+    def simulate(self, graph, trace, representation, mappings, **kwargs):
+        results = list(map(self._evaluate, mappings))
+        cache = self._cache.setdefault(graph, {})
+        for mapping, result in zip(mappings, results):
+            cache[tuple(mapping)] = result
+        return results
+
+    def cache_entries(self, graph):
+        return self._cache.get(graph, {})
+
+    def lookup_results(self, graph, trace, representation, mappings):
+        cache = self._cache.get(graph, {})
+        return [cache.get(tuple(mapping)) for mapping in mappings]
+
     def reset_statistics(self):
         pass
+
+    def close(self):
+        pass
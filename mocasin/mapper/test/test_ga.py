@@ -5,7 +5,11 @@
 
 import pytest
 
-from mocasin.mapper.genetic import GeneticMapper, Objectives
+from mocasin.mapper.genetic import (
+    GeneticMapper,
+    Objectives,
+    _GeneticMapperEngine,
+)
 from mocasin.mapper.test.mock_cache import MockMappingCache
 
 
@@ -27,6 +31,122 @@ def test_ga(mapper, graph, trace, representation):
     assert result.to_list() == [6, 6]
 
 
+def test_ga_batch_evaluation(mapper, graph, trace, representation):
+    batch_sizes = []
+    simulate = mapper._simulation_manager.simulate
+
+    def batch_simulate(g, t, r, mappings):
+        batch_sizes.append(len(mappings))
+        return simulate(g, t, r, mappings)
+
+    mapper._simulation_manager.simulate = batch_simulate
+    mapper.generate_mapping(graph, trace=trace, representation=representation)
+
+    # the initial population and each generation are evaluated in one batch
+    num_gens = mapper._mapper_config.num_gens
+    assert len(batch_sizes) == num_gens + 1
+    assert batch_sizes[0] == mapper._mapper_config.pop_size
+
+
+def test_ga_cleanup_on_error(mapper, graph, trace, representation, mocker):
+    cleanup = mocker.spy(_GeneticMapperEngine, "cleanup")
+    mapper._simulation_manager.simulate = mocker.Mock(side_effect=RuntimeError)
+    with pytest.raises(RuntimeError):
+        mapper.generate_mapping(
+            graph, trace=trace, representation=representation
+        )
+    cleanup.assert_called_once()
+
+
+def test_ga_surrogate(
+    graph, platform, trace, representation, simres_evaluation_function, mocker
+):
+    m = GeneticMapper(
+        platform, pop_size=20, surrogate=True, surrogate_min_samples=10
+    )
+    m._simulation_manager = MockMappingCache(simres_evaluation_function, mocker)
+    result = m.generate_mapping(
+        graph, trace=trace, representation=representation
+    )
+
+    assert result.to_list() == [6, 6]
+    assert m._simulation_manager.statistics._surrogate_skipped > 0
+
+
+def test_ga_surrogate_survivors(
+    graph,
+    platform,
+    trace,
+    representation,
+    simres_evaluation_function,
+    evaluation_function,
+    mocker,
+):
+    m = GeneticMapper(
+        platform, pop_size=20, surrogate=True, surrogate_min_samples=10
+    )
+    simulation_manager = MockMappingCache(simres_evaluation_function, mocker)
+    engine = _GeneticMapperEngine(
+        platform,
+        graph,
+        trace,
+        representation,
+        simulation_manager,
+        m._mapper_config,
+    )
+    population, _, hof = engine.run()
+    engine.cleanup()
+
+    assert simulation_manager.statistics._surrogate_skipped > 0
+    # estimated individuals neither enter the hall of fame nor survive
+    for ind in list(hof) + population:
+        assert getattr(ind, "estimate", None) is None
+        assert ind.fitness.values == (evaluation_function(ind),)
+
+
+@pytest.fixture
+def island_mapper(platform, simres_evaluation_function, mocker):
+    m = GeneticMapper(
+        platform, islands=3, num_gens=6, migration_interval=2, parallel=False
+    )
+    mocker.patch.object(
+        m,
+        "_island_simulation_manager",
+        lambda: MockMappingCache(simres_evaluation_function, mocker),
+    )
+    return m
+
+
+def test_ga_islands(island_mapper, graph, trace, representation):
+    result = island_mapper.generate_mapping(
+        graph, trace=trace, representation=representation
+    )
+    assert result.to_list() == [6, 6]
+
+    # the simulation results of the islands are merged
+    assert island_mapper._simulation_manager.lookup(graph, (6, 6))
+
+
+def test_ga_islands_immigrate(mapper, graph, trace, representation):
+    engine = _GeneticMapperEngine(
+        mapper.platform,
+        graph,
+        trace,
+        representation,
+        mapper._simulation_manager,
+        mapper._mapper_config,
+    )
+    population = engine.population
+    for ind, fitness in zip(population, range(len(population))):
+        ind.fitness.values = (fitness,)
+    population = engine.immigrate(population, [([6, 6], (-1,))])
+    engine.cleanup()
+
+    assert len(population) == mapper._mapper_config.pop_size
+    assert max(ind.fitness.values[0] for ind in population) == 8
+    assert [6, 6] in [list(ind) for ind in population]
+
+
 def test_objectives():
     flags = Objectives.from_string_list(["exec_time", "energy"])
 
@@ -82,3 +82,35 @@ def test_gradient(
             bad += 1
 
     assert good > bad
+
+
+def test_gd_batches(mapper, graph, trace, representation_pbc):
+    batches = []
+    simulate = mapper._simulation_manager.simulate
+
+    def batch_simulate(g, t, r, mappings):
+        batches.append([tuple(m) for m in mappings])
+        return simulate(g, t, r, mappings)
+
+    mapper._simulation_manager.simulate = batch_simulate
+    mapper.gd_iterations = 3
+    mapper.generate_mapping(
+        graph, trace=trace, representation=representation_pbc
+    )
+
+    # one batch for the start and one for each iteration
+    assert len(batches) <= mapper.gd_iterations + 1
+    # the probes of all points are simulated in the first batch
+    assert len(batches[0]) > mapper.parallel_points
+    for batch in batches:
+        assert len(batch) == len(set(batch))
+
+
+def test_gradient_samples(graph, trace, representation, mapper):
+    mapper.dim = 2
+    mapper.gradient_samples = 1
+    for x, y in product(range(1, 6), range(1, 6)):
+        grad = mapper.calculate_gradient(
+            graph, trace, representation, [x, y], 0
+        )
+        assert np.count_nonzero(grad) <= 1
@@ -3,7 +3,15 @@
 #
 # Author: Robert Khasanov
 
-from mocasin.mapper.pareto import mark_pareto_front, filter_pareto_front
+import numpy as np
+import pytest
+
+from mocasin.mapper.pareto import (
+    ParetoArchive,
+    _is_pareto_efficient,
+    filter_pareto_front,
+    mark_pareto_front,
+)
 from mocasin.mapper.partial import ComFullMapper, ProcPartialMapper
 
 
@@ -45,3 +53,68 @@ def test_filter_pareto_front(graph, platform_odroid):
             continue
         pm = next(pareto_iter)
         assert pm is m
+
+
+def _is_pareto_efficient_reference(costs):
+    is_efficient = []
+    for i, c in enumerate(costs):
+        dominated = any(
+            np.all(other <= c) and (np.any(other < c) or j < i)
+            for j, other in enumerate(costs)
+            if j != i
+        )
+        is_efficient.append(not dominated)
+    return np.array(is_efficient)
+
+
+@pytest.mark.parametrize("num_costs", [1, 2, 3, 5])
+def test_is_pareto_efficient(num_costs):
+    rng = np.random.RandomState(num_costs)
+    for _ in range(20):
+        # few distinct values to get many ties and duplicates
+        costs = rng.randint(0, 4, size=(40, num_costs)).astype(float)
+        expected = _is_pareto_efficient_reference(costs)
+        assert list(_is_pareto_efficient(costs)) == list(expected)
+
+
+@pytest.mark.parametrize("num_costs", [2, 3])
+def test_pareto_archive(num_costs):
+    rng = np.random.RandomState(42)
+    costs = rng.randint(0, 5, size=(100, num_costs)).astype(float)
+    archive = ParetoArchive()
+    added = [archive.add(c, i) for i, c in enumerate(costs)]
+    expected = np.flatnonzero(_is_pareto_efficient(costs))
+    assert archive.items == list(expected)
+    assert np.array_equal(archive.costs, costs[expected])
+    assert all(added[i] for i in expected)
+    with pytest.raises(ValueError):
+        archive.add([0.0] * (num_costs + 1))
+
+
+@pytest.mark.parametrize("num_costs", [2, 3])
+def test_pareto_archive_empty(num_costs):
+    archive = ParetoArchive(num_costs=num_costs)
+    assert len(archive) == 0
+    assert archive.items == []
+    assert archive.costs.shape == (0, num_costs)
+
+
+def test_pareto_archive_mappings(graph, platform_odroid):
+    com_mapper = ComFullMapper(platform_odroid)
+    mapper = ProcPartialMapper(graph, platform_odroid, com_mapper)
+    mappings = []
+    for vec, exec_time, energy in [
+        ([0, 0], 10.2, 21.45),
+        ([0, 0], 20, 31.45),
+        ([1, 1], 30, 50),
+        ([0, 1], 5.2, 31.15),
+    ]:
+        mapping = mapper.generate_mapping(vec)
+        mapping.metadata.exec_time = exec_time
+        mapping.metadata.energy = energy
+        mappings.append(mapping)
+
+    archive = ParetoArchive()
+    for mapping in mappings:
+        archive.add_mapping(mapping)
+    assert archive.items == filter_pareto_front(mappings)
@@ -0,0 +1,100 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+from itertools import product
+
+import pytest
+
+from mocasin.mapper.parallel_tempering import ParallelTemperingMapper
+from mocasin.mapper.test.mock_cache import MockMappingCache
+from mocasin.simulate import SimulationResult
+
+
+@pytest.fixture
+def mapper(platform, simres_evaluation_function, mocker):
+    m = ParallelTemperingMapper(
+        platform, num_chains=4, final_temperature=0.01, radius=2
+    )
+    m._simulation_manager = MockMappingCache(simres_evaluation_function, mocker)
+    return m
+
+
+def test_pt(mapper, graph, trace, representation, evaluation_function):
+    result_mapper = mapper.generate_mapping(
+        graph, trace=trace, representation=representation
+    )
+    results = [
+        (evaluation_function([x, y]), x, y)
+        for x, y in product(range(7), range(7))
+    ]
+    expected = set([(x, y) for (_, x, y) in sorted(results)[:5]])
+
+    # result is top 5 best
+    assert tuple(result_mapper.to_list()) in expected
+
+
+def test_pt_batch_evaluation(mapper, graph, trace, representation):
+    batch_sizes = []
+    simulate = mapper._simulation_manager.simulate
+
+    def batch_simulate(g, t, r, mappings, **kwargs):
+        batch_sizes.append(len(mappings))
+        return simulate(g, t, r, mappings, **kwargs)
+
+    mapper._simulation_manager.simulate = batch_simulate
+    mapper.generate_mapping(graph, trace=trace, representation=representation)
+
+    # all chains are evaluated together in each iteration
+    assert len(batch_sizes) > 1
+    assert set(batch_sizes) == {mapper.num_chains}
+
+
+def test_chain_temperatures(mapper):
+    temperatures = mapper.chain_temperatures()
+    assert len(temperatures) == 4
+    assert temperatures[0] == pytest.approx(1.0)
+    assert temperatures[-1] == pytest.approx(0.01)
+    assert temperatures == sorted(temperatures, reverse=True)
+
+
+def test_exchange(mapper):
+    mapper.initial_cost = 1.0
+    # the hotter chain found the better mapping, always exchange
+    assert mapper.exchange_probability([1.0, 2.0, 2.0, 2.0], 0) == 1.0
+
+    mapper.exchange_interval = 1
+    mappings = ["a", "b", "c", "d"]
+    exec_times = [1.0, 2.0, 1.0, 2.0]
+    mapper.exchange(mappings, exec_times, 0)
+    assert mappings == ["b", "a", "d", "c"]
+    assert exec_times == [2.0, 1.0, 2.0, 1.0]
+
+    # the colder chain is much better, exchange is very unlikely
+    assert mapper.exchange_probability([100.0, 1.0, 1.0, 1.0], 0) < 1e-9
+
+
+def test_invalid_temperatures(platform):
+    with pytest.raises(ValueError):
+        ParallelTemperingMapper(
+            platform, initial_temperature=0.1, final_temperature=1.0
+        )
+
+
+def test_pt_parallel_step(platform, graph, trace, representation, mocker):
+    mapper = ParallelTemperingMapper(platform, num_chains=4, jobs=4)
+    simulation_manager = mapper._simulation_manager
+    assert simulation_manager.config.chunk_size == 1
+
+    pool = mocker.Mock()
+    pool.imap.side_effect = lambda fun, tasks, chunksize: [
+        (SimulationResult(1.0, None, None), 0.0) for _ in tasks
+    ]
+    mocker.patch.object(simulation_manager, "_get_pool", return_value=pool)
+    mocker.patch("mocasin.mapper.utils.encode_mapping")
+
+    # the moves of all chains are distributed among the jobs
+    moves = [mocker.Mock() for _ in range(mapper.num_chains)]
+    results = simulation_manager._run_simulations(graph, trace, moves)
+    assert simulation_manager._get_pool.called
+    assert pool.imap.call_args[1]["chunksize"] == 1
+    assert len(results) == mapper.num_chains
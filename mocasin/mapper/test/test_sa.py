@@ -10,6 +10,7 @@ import numpy as np
 
 from mocasin.mapper.test.mock_cache import MockMappingCache
 from mocasin.mapper.simulated_annealing import SimulatedAnnealingMapper
+from mocasin.simulate import SimulationResult
 
 
 @pytest.fixture
@@ -58,6 +59,102 @@ def test_sa(mapper, graph, trace, representation, evaluation_function):
     assert tuple(result_mapper.to_list()) in expected
 
 
+def test_sa_closes_simulation_manager(
+    mapper, graph, trace, representation, mocker
+):
+    simulation_manager = mapper._simulation_manager
+    close = mocker.spy(simulation_manager, "close")
+    mocker.patch.object(
+        simulation_manager, "simulate", side_effect=RuntimeError
+    )
+    with pytest.raises(RuntimeError):
+        mapper.generate_mapping(
+            graph, trace=trace, representation=representation
+        )
+    close.assert_called_once()
+
+
+def test_sa_surrogate(
+    platform,
+    graph,
+    trace,
+    representation,
+    evaluation_function,
+    simres_evaluation_function,
+    mocker,
+):
+    mapper = SimulatedAnnealingMapper(
+        platform,
+        final_temperature=0.01,
+        radius=2,
+        surrogate=True,
+        surrogate_min_samples=10,
+    )
+    mapper._simulation_manager = MockMappingCache(
+        simres_evaluation_function, mocker
+    )
+    result_mapper = mapper.generate_mapping(
+        graph, trace=trace, representation=representation
+    )
+    results = [
+        (evaluation_function([x, y]), x, y)
+        for x, y in product(range(7), range(7))
+    ]
+    expected = set([(x, y) for (_, x, y) in sorted(results)[:5]])
+
+    assert tuple(result_mapper.to_list()) in expected
+    statistics = mapper._simulation_manager.statistics
+    assert statistics._surrogate_skipped > 0
+    assert statistics._surrogate_predictions > 0
+
+
+def test_sa_bounded_simulation(
+    mapper, graph, trace, representation, evaluation_function
+):
+    mapper.bounded_simulation = True
+    budgets = []
+    simulate = mapper._simulation_manager.simulate
+
+    def bounded_simulate(g, t, r, mappings, time_budget=None):
+        budgets.append(time_budget)
+        results = simulate(g, t, r, mappings)
+        if time_budget is None:
+            return results
+        return [
+            (
+                SimulationResult(time_budget, None, None, censored=True)
+                if res.exec_time > time_budget
+                else res
+            )
+            for res in results
+        ]
+
+    mapper._simulation_manager.simulate = bounded_simulate
+    result_mapper = mapper.generate_mapping(
+        graph, trace=trace, representation=representation
+    )
+    results = [
+        (evaluation_function([x, y]), x, y)
+        for x, y in product(range(7), range(7))
+    ]
+    expected = set([(x, y) for (_, x, y) in sorted(results)[:5]])
+
+    assert tuple(result_mapper.to_list()) in expected
+    assert any(budget is not None for budget in budgets)
+
+
+def test_acceptance_threshold(mapper):
+    mapper.initial_cost = 2.0
+    rng = np.random.RandomState(0)
+    for _ in range(100):
+        last, cur = rng.uniform(0, 5, size=2)
+        temperature, rand = rng.uniform(0.01, 1, size=2)
+        threshold = mapper.acceptance_threshold(last, temperature, rand)
+        accepted = mapper.query_accept(cur - last, temperature) > rand
+        assert accepted == (cur < last or cur < threshold)
+    assert mapper.acceptance_threshold(1.0, 1.0, 0.0) == float("inf")
+
+
 def test_temperature_cooling(conf, mapper):
     timeout = 10000
     max_rejections = 12
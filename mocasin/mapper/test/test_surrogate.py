@@ -0,0 +1,176 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+from itertools import product
+
+import numpy as np
+import pytest
+
+from mocasin.mapper.surrogate import SurrogateModel, SurrogateScreening
+from mocasin.mapper.test.mock_cache import MockMappingCache
+from mocasin.simulate import SimulationResult
+
+
+@pytest.fixture
+def simulation_manager(simres_evaluation_function, mocker):
+    return MockMappingCache(simres_evaluation_function, mocker)
+
+
+def test_surrogate_model_categorical():
+    # the execution time only depends on the load of PE 0
+    model = SurrogateModel(regularization=1e-6)
+    vectors = list(product(range(3), repeat=3))
+    for v in vectors:
+        model.add(v, 2.0 ** v.count(0), energy=float(sum(v)))
+    exec_times, energies = model.predict(vectors)
+    expected = [2.0 ** v.count(0) for v in vectors]
+    assert exec_times == pytest.approx(expected, rel=1e-3)
+    assert energies == pytest.approx([sum(v) for v in vectors], abs=1e-3)
+
+
+def test_surrogate_model_continuous():
+    model = SurrogateModel(regularization=1e-6)
+    vectors = np.random.RandomState(1).uniform(-1, 1, size=(50, 2))
+    for v in vectors:
+        model.add(v, np.exp(v[0] ** 2 - v[1]))
+    exec_times, energies = model.predict(vectors)
+    assert exec_times == pytest.approx(
+        np.exp(vectors[:, 0] ** 2 - vectors[:, 1])
+    )
+    assert energies is None
+
+
+def test_surrogate_model_max_samples():
+    model = SurrogateModel(max_samples=3)
+    for i in range(5):
+        model.add([i], 1.0)
+    assert len(model) == 3
+    assert next(iter(model._samples)) == (2,)
+
+
+def test_surrogate_model_censored():
+    # execution times above 2 are only known as lower bounds
+    model = SurrogateModel(regularization=1e-3)
+    vectors = list(product(range(3), repeat=3))
+    slow = [v for v in vectors if v.count(0) > 1]
+    for v in vectors:
+        if v in slow:
+            model.add(v, 2.0, energy=1.0, censored=True)
+        else:
+            model.add(v, 2.0 ** v.count(0), energy=1.0)
+    exec_times, energies = model.predict(slow)
+    assert np.all(exec_times > 2.0)
+    assert energies == pytest.approx(np.ones(len(slow)))
+
+    # a complete result replaces the censored sample
+    model.add(slow[0], 8.0)
+    assert len(model) == len(vectors)
+    exec_time, _, censored = model._samples[slow[0]]
+    assert exec_time == 8.0
+    assert not censored
+
+
+def test_screening_training(simulation_manager, graph, trace, representation):
+    screening = SurrogateScreening(simulation_manager, min_samples=10)
+    vectors = [list(v) for v in product(range(7), repeat=2)]
+    assert screening.predict(graph, vectors) is None
+
+    simulation_manager.simulate(graph, trace, representation, vectors[:10])
+    assert screening.predict(graph, vectors) is not None
+    assert len(screening.model) == 10
+
+    # samples are only added once
+    simulation_manager.simulate(graph, trace, representation, vectors[:12])
+    screening.predict(graph, vectors)
+    assert len(screening.model) == 12
+
+
+def test_screening_simulate(
+    simulation_manager, graph, trace, representation, evaluation_function
+):
+    screening = SurrogateScreening(
+        simulation_manager, keep=0.25, exploration=0.0, min_samples=10
+    )
+    vectors = [list(v) for v in product(range(7), repeat=2)]
+    simulation_manager.simulate(graph, trace, representation, vectors[20:])
+
+    candidates = vectors[:20]
+    results, simulated = screening.simulate(
+        graph, trace, representation, candidates
+    )
+    assert len(results) == len(candidates)
+    assert sum(simulated) == 5
+    for vector, result, sim in zip(candidates, results, simulated):
+        if sim:
+            assert result.exec_time == evaluation_function(vector)
+
+    # the simulated candidates are the ones with the lowest prediction
+    predicted = screening.model.predict(candidates)[0]
+    order = np.argsort(predicted, kind="stable")
+    assert [i for i, sim in enumerate(simulated) if sim] == sorted(order[:5])
+
+    statistics = simulation_manager.statistics
+    assert statistics._surrogate_skipped == 15
+    assert statistics._surrogate_predictions == 5
+    assert statistics.surrogate_mean_error() >= 0
+
+
+def test_screening_cached_candidates(
+    simulation_manager, graph, trace, representation, evaluation_function
+):
+    screening = SurrogateScreening(
+        simulation_manager, keep=0.25, exploration=0.0, min_samples=10
+    )
+    vectors = [list(v) for v in product(range(7), repeat=2)]
+    simulation_manager.simulate(graph, trace, representation, vectors[10:])
+
+    # cached candidates are always selected with their exact results
+    candidates = vectors[:20]
+    selected, cached, prediction = screening.select(
+        graph, trace, representation, candidates
+    )
+    assert all(i in selected for i in range(10, 20))
+    assert len(selected) == 10
+    for i in range(10, 20):
+        assert cached[i].exec_time == evaluation_function(candidates[i])
+        assert prediction[0][i] == evaluation_function(candidates[i])
+    assert all(res is None for res in cached[:10])
+
+    # all cached: nothing is predicted or skipped
+    candidates = vectors[10:30]
+    results, simulated = screening.simulate(
+        graph, trace, representation, candidates
+    )
+    assert all(simulated)
+    for vector, result in zip(candidates, results):
+        assert result.exec_time == evaluation_function(vector)
+    statistics = simulation_manager.statistics
+    assert statistics._surrogate_skipped == 0
+    assert statistics._surrogate_predictions == 0
+
+
+def test_screening_invalid_parameters(simulation_manager):
+    with pytest.raises(ValueError):
+        SurrogateScreening(simulation_manager, keep=0)
+    with pytest.raises(ValueError):
+        SurrogateScreening(simulation_manager, exploration=1.5)
+
+
+def test_screening_censored(simulation_manager, graph, trace, representation):
+    screening = SurrogateScreening(simulation_manager, min_samples=1)
+    vector = (1, 2)
+    cache = simulation_manager._cache.setdefault(graph, {})
+    cache[vector] = None
+    assert screening.predict(graph, [vector]) is None
+
+    # a censored result is learned as a lower bound
+    cache[vector] = SimulationResult(5.0, None, None, censored=True)
+    screening.predict(graph, [vector])
+    assert screening.model._samples[vector][2]
+
+    # and replaced by the complete result that replaces it in the cache
+    cache[vector] = SimulationResult(7.0, None, None)
+    screening.predict(graph, [vector])
+    assert len(screening.model) == 1
+    assert screening.model._samples[vector][0] == 7.0
+    assert not screening.model._samples[vector][2]
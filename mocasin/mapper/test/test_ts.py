@@ -34,6 +34,39 @@ def test_ts(mapper, graph, trace, representation, evaluation_function):
     assert tuple(result_mapper.to_list()) in expected
 
 
+def test_ts_surrogate(
+    platform,
+    graph,
+    trace,
+    representation,
+    evaluation_function,
+    simres_evaluation_function,
+    mocker,
+):
+    mapper = TabuSearchMapper(
+        platform,
+        max_iterations=20,
+        iteration_size=10,
+        tabu_tenure=10,
+        surrogate=True,
+        surrogate_min_samples=10,
+    )
+    mapper._simulation_manager = MockMappingCache(
+        simres_evaluation_function, mocker
+    )
+    result_mapper = mapper.generate_mapping(
+        graph, trace=trace, representation=representation
+    )
+    results = [
+        (evaluation_function([x, y]), x, y)
+        for x, y in product(range(7), range(7))
+    ]
+    expected = set([(x, y) for (_, x, y) in sorted(results)[:3]])
+
+    assert tuple(result_mapper.to_list()) in expected
+    assert mapper._simulation_manager.statistics._surrogate_skipped > 0
+
+
 def test_update_candidate_moves(mapper, graph, trace, representation):
     mapper.update_candidate_moves(graph, trace, representation, [3, 3])
     moves = [move for (move, _) in mapper.moves]
@@ -65,6 +98,22 @@ def test_update_candidate_moves(mapper, graph, trace, representation):
     assert set(moves).issubset(expected)
 
 
+def test_reuse_neighbours(
+    mapper, graph, trace, representation, evaluation_function, mocker
+):
+    mapper.reuse_neighbours = True
+    mapper.update_candidate_moves(graph, trace, representation, [3, 3])
+    simulate = mocker.spy(mapper._simulation_manager, "simulate")
+    mapper.update_candidate_moves(graph, trace, representation, [3, 4])
+
+    # the neighbours of [3, 3] within the radius are not simulated again
+    mappings = simulate.call_args_list[0].args[3]
+    assert len(mappings) < mapper.move_set_size
+    for move, exec_time in mapper.moves:
+        mapping = [3 + move[0], 4 + move[1]]
+        assert exec_time == evaluation_function(mapping)
+
+
 def test_move(mapper):
     mapper.moves = [((0, 1), 115), ((1, 0), 110), ((-1, 0), 90)]
     mapper.tabu_moves = {(-1, 0): 1, (1, 0): 2}
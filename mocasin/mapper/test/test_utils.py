@@ -3,11 +3,18 @@
 #
 # Author: Robert Khasanov
 
+import pickle
+
 import pytest
 
 from mocasin.mapper.partial import ComFullMapper, ProcPartialMapper
 from mocasin.mapper.test.test_fair import MockTrace
+from mocasin.mapper.cache import SimulationResultCache
 from mocasin.mapper.utils import SimulationManager, SimulationManagerConfig
+from mocasin.representations import (
+    SimpleVectorRepresentation,
+    SymmetryRepresentation,
+)
 from mocasin.simulate import SimulationResult
 
 
@@ -38,3 +45,240 @@ def test_simulation_manager_cache(
     lookup_result = simulation_manager.lookup(graph, tuple([0, 4]))
     assert isinstance(lookup_result, SimulationResult)
     assert simulation_result[0] == lookup_result
+
+
+def test_simulation_manager_persistent_cache(
+    graph, platform_odroid, representation_odroid, mapper, tmpdir
+):
+    proc_names = [proc.name for proc in graph.processes()]
+    core_types = [core.type for core in platform_odroid.processors()]
+    trace = MockTrace(proc_names, core_types, lambda _: 5, max_length=10)
+    mapping = mapper.generate_mapping([0, 4])
+    config = SimulationManagerConfig(
+        jobs=None, parallel=True, cache_file=str(tmpdir.join("cache.db"))
+    )
+    first_manager = SimulationManager(platform_odroid, config)
+    first_result = first_manager.simulate(
+        graph, trace, representation_odroid, [mapping]
+    )
+    assert first_manager.statistics._mappings_evaluated == 1
+
+    # A second manager should find the result in the persistent cache
+    second_manager = SimulationManager(platform_odroid, config)
+    second_result = second_manager.simulate(
+        graph, trace, representation_odroid, [mapping]
+    )
+    assert second_manager.statistics._mappings_evaluated == 0
+    assert second_manager.statistics._mappings_cached == 1
+    assert second_result == first_result
+
+    # A different trace should not hit the cache
+    other_trace = MockTrace(proc_names, core_types, lambda _: 7, max_length=10)
+    third_manager = SimulationManager(platform_odroid, config)
+    third_manager.simulate(graph, other_trace, representation_odroid, [mapping])
+    assert third_manager.statistics._mappings_evaluated == 1
+
+    second_manager.dump(str(tmpdir.join("mapping_cache.csv")))
+    with open(str(tmpdir.join("mapping_cache.csv"))) as f:
+        lines = f.readlines()
+    assert lines[0] == "mapping,runtime\n"
+    assert len(lines) == 2
+
+
+def test_simulation_result_cache_censored(tmpdir):
+    cache = SimulationResultCache(str(tmpdir.join("cache.db")))
+    full = SimulationResult(10.0, 1.0, 2.0)
+    censored = SimulationResult(5.0, None, None, censored=True)
+    larger_bound = SimulationResult(8.0, None, None, censored=True)
+
+    cache.store("ctx", [((0, 1), censored)])
+    assert cache.lookup("ctx", [(0, 1)]) == [censored]
+    # a censored result is replaced by a larger bound and a complete result
+    cache.store("ctx", [((0, 1), larger_bound)])
+    assert cache.lookup("ctx", [(0, 1)]) == [larger_bound]
+    cache.store("ctx", [((0, 1), full)])
+    assert cache.lookup("ctx", [(0, 1)]) == [full]
+    # a complete result is never replaced
+    cache.store("ctx", [((0, 1), censored)])
+    assert cache.lookup("ctx", [(0, 1)]) == [full]
+    cache.close()
+
+
+def test_simulation_manager_persistent_cache_representation(
+    graph, platform_odroid, mapper, tmpdir
+):
+    proc_names = [proc.name for proc in graph.processes()]
+    core_types = [core.type for core in platform_odroid.processors()]
+    trace = MockTrace(proc_names, core_types, lambda _: 5, max_length=10)
+    mapping = mapper.generate_mapping([0, 4])
+    config = SimulationManagerConfig(cache_file=str(tmpdir.join("cache.db")))
+    representation = SimpleVectorRepresentation(graph, platform_odroid)
+    first_manager = SimulationManager(platform_odroid, config)
+    first_manager.simulate(graph, trace, representation, [mapping])
+    assert first_manager.statistics._mappings_evaluated == 1
+
+    # The same configuration shares the entries
+    second_manager = SimulationManager(platform_odroid, config)
+    second_manager.simulate(
+        graph,
+        trace,
+        SimpleVectorRepresentation(graph, platform_odroid),
+        [mapping],
+    )
+    assert second_manager.statistics._mappings_evaluated == 0
+
+    # A differently configured representation of the same type does not
+    other_representation = SimpleVectorRepresentation(
+        graph, platform_odroid, periodic_boundary_conditions=True
+    )
+    third_manager = SimulationManager(platform_odroid, config)
+    third_manager.simulate(graph, trace, other_representation, [mapping])
+    assert third_manager.statistics._mappings_evaluated == 1
+
+
+def test_simulation_manager_worker_pool(
+    graph, platform_odroid, representation_odroid, mapper
+):
+    proc_names = [proc.name for proc in graph.processes()]
+    core_types = [core.type for core in platform_odroid.processors()]
+    trace = MockTrace(proc_names, core_types, lambda _: 5, max_length=10)
+    mappings = [
+        mapper.generate_mapping([i, j]) for i in range(4) for j in [4, 5]
+    ]
+
+    sequential = SimulationManager(platform_odroid, SimulationManagerConfig())
+    expected = sequential.simulate(
+        graph, trace, representation_odroid, mappings
+    )
+
+    config = SimulationManagerConfig(jobs=2, parallel=True, chunk_size=1)
+    with SimulationManager(platform_odroid, config) as simulation_manager:
+        results = simulation_manager.simulate(
+            graph, trace, representation_odroid, mappings[:4]
+        )
+        pool = simulation_manager._pool
+        assert pool is not None
+        results += simulation_manager.simulate(
+            graph, trace, representation_odroid, mappings[4:]
+        )
+        # the pool is reused among calls
+        assert simulation_manager._pool is pool
+    assert simulation_manager._pool is None
+    assert results == expected
+
+
+def test_simulation_manager_time_budget(
+    graph, platform_odroid, representation_odroid, mapper, tmpdir
+):
+    proc_names = [proc.name for proc in graph.processes()]
+    core_types = [core.type for core in platform_odroid.processors()]
+    trace = MockTrace(proc_names, core_types, lambda _: 5, max_length=10)
+    mapping = mapper.generate_mapping([0, 4])
+    config = SimulationManagerConfig(cache_file=str(tmpdir.join("cache.db")))
+
+    reference = SimulationManager(platform_odroid, SimulationManagerConfig())
+    [full] = reference.simulate(graph, trace, representation_odroid, [mapping])
+    assert not full.censored
+
+    manager = SimulationManager(platform_odroid, config)
+    budget = full.exec_time / 2
+    [censored] = manager.simulate(
+        graph, trace, representation_odroid, [mapping], time_budget=budget
+    )
+    assert censored.censored
+    assert censored.exec_time == budget
+    assert manager.statistics._mappings_evaluated == 1
+
+    # a smaller budget is answered from the cache
+    [cached] = manager.simulate(
+        graph, trace, representation_odroid, [mapping], time_budget=budget / 2
+    )
+    assert cached == censored
+    assert manager.statistics._mappings_evaluated == 1
+
+    # a censored result is also reused from the persistent cache
+    other_manager = SimulationManager(platform_odroid, config)
+    [cached] = other_manager.simulate(
+        graph, trace, representation_odroid, [mapping], time_budget=budget
+    )
+    assert cached == censored
+    assert other_manager.statistics._mappings_evaluated == 0
+
+    # a larger budget requires a new simulation
+    [result] = manager.simulate(
+        graph,
+        trace,
+        representation_odroid,
+        [mapping],
+        time_budget=full.exec_time * 2,
+    )
+    assert result == full
+    assert manager.statistics._mappings_evaluated == 2
+
+    # the complete result answers all subsequent requests
+    [result] = manager.simulate(graph, trace, representation_odroid, [mapping])
+    assert result == full
+    assert manager.statistics._mappings_evaluated == 2
+
+
+def test_simulation_manager_batch_duplicates(
+    graph, platform_odroid, representation_odroid
+):
+    proc_names = [proc.name for proc in graph.processes()]
+    core_types = [core.type for core in platform_odroid.processors()]
+    trace = MockTrace(proc_names, core_types, lambda _: 5, max_length=10)
+    # a population with clones, as it is evaluated by the genetic mapper
+    population = [[0, 4], [1, 5], [0, 4], [0, 4], [1, 5]]
+    manager = SimulationManager(platform_odroid, SimulationManagerConfig())
+    results = manager.simulate(graph, trace, representation_odroid, population)
+    assert len(results) == len(population)
+    assert results[0] is results[2] is results[3]
+    assert results[1] is results[4]
+    distinct = set(tuple(m) for m in population)
+    assert manager.statistics._mappings_evaluated == len(distinct)
+    assert manager.statistics._mappings_cached == 3
+
+
+def test_simulation_manager_canonical_cache_statistics(
+    graph, platform_odroid, mapper
+):
+    proc_names = [proc.name for proc in graph.processes()]
+    core_types = [core.type for core in platform_odroid.processors()]
+    trace = MockTrace(proc_names, core_types, lambda _: 5, max_length=10)
+    representation = SymmetryRepresentation(graph, platform_odroid)
+    representation.canonical_cache.clear()
+    # [0, 4] and [1, 5] are equivalent
+    mappings = [mapper.generate_mapping(m) for m in [[0, 4], [1, 5], [0, 4]]]
+    manager = SimulationManager(platform_odroid, SimulationManagerConfig())
+    [result] = manager.simulate(graph, trace, representation, mappings[:1])
+    results = manager.simulate(graph, trace, representation, mappings[1:])
+    assert results == [result, result]
+    assert manager.statistics._mappings_evaluated == 1
+    assert manager.statistics._mappings_cached == 2
+    assert manager.statistics.canonical_cache_misses() == 2
+    assert manager.statistics.canonical_cache_hits() == 1
+
+
+def test_simulation_manager_merge_results(
+    graph, platform_odroid, representation_odroid, mapper
+):
+    proc_names = [proc.name for proc in graph.processes()]
+    core_types = [core.type for core in platform_odroid.processors()]
+    trace = MockTrace(proc_names, core_types, lambda _: 5, max_length=10)
+    mappings = [mapper.generate_mapping(m) for m in [[0, 4], [1, 5]]]
+    worker = SimulationManager(platform_odroid, SimulationManagerConfig())
+    results = worker.simulate(graph, trace, representation_odroid, mappings)
+
+    # results and statistics are shipped from worker processes
+    statistics = pickle.loads(pickle.dumps(worker.statistics))
+    results = pickle.loads(pickle.dumps(results))
+
+    manager = SimulationManager(platform_odroid, SimulationManagerConfig())
+    manager.statistics.merge(statistics)
+    manager.add_results(graph, representation_odroid, [[0, 4], [1, 5]], results)
+    assert manager.statistics._mappings_evaluated == 2
+    assert manager.simulate(
+        graph, trace, representation_odroid, mappings
+    ) == list(results)
+    assert manager.statistics._mappings_evaluated == 2
+    assert manager.statistics._mappings_cached == 2
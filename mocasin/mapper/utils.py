@@ -5,6 +5,7 @@
 
 import csv
 from dataclasses import dataclass
+import functools
 import multiprocessing as mp
 import os
 import pickle
@@ -14,11 +15,22 @@ import cloudpickle
 import h5py
 import hydra
 from hydra.core.hydra_config import HydraConfig
+from hydra.utils import to_absolute_path
 import numpy as np
 import tqdm
 
-from mocasin.common.mapping import Mapping
-from mocasin.simulate import DataflowSimulation
+from mocasin.common.mapping import (
+    ChannelMappingInfo,
+    Mapping,
+    ProcessMappingInfo,
+)
+from mocasin.common.trace import CompiledTrace
+from mocasin.mapper.cache import (
+    SimulationResultCache,
+    context_digest,
+    representation_digest,
+)
+from mocasin.simulate import DataflowSimulation, SimulationResult
 from mocasin.util.logging import getLogger
 
 log = getLogger(__name__)
@@ -41,6 +53,35 @@ class Statistics(object):
         self._simulation_time = 0
         self._representation_time = 0
         self._representation_init_time = 0
+        self._canonical_cache = None
+        self._canonical_cache_offset = (0, 0)
+        self._surrogate_skipped = 0
+        self._surrogate_predictions = 0
+        self._surrogate_error = 0.0
+
+    def __getstate__(self):
+        # loggers and canonical form caches are not shipped to other processes
+        state = self.__dict__.copy()
+        state["_log"] = None
+        state["_canonical_cache"] = None
+        return state
+
+    def merge(self, other):
+        """Add the counters of another statistics object.
+
+        This is used to combine the statistics of simulation managers that
+        run in different processes.
+
+        Args:
+            other (Statistics): the statistics to add
+        """
+        self._mappings_cached += other._mappings_cached
+        self._mappings_evaluated += other._mappings_evaluated
+        self._simulation_time += other._simulation_time
+        self._representation_time += other._representation_time
+        self._surrogate_skipped += other._surrogate_skipped
+        self._surrogate_predictions += other._surrogate_predictions
+        self._surrogate_error += other._surrogate_error
 
     def mappings_cached(self, num=1):
         self._mappings_cached += num
@@ -58,10 +99,74 @@ class Statistics(object):
     def set_rep_init_time(self, time):
         self._representation_init_time = time
 
+    def track_canonical_cache(self, cache):
+        """Track the hits and misses of a canonical form cache.
+
+        Only lookups after the first call with a given cache are counted.
+
+        Args:
+            cache (CanonicalFormCache): the cache of a representation
+        """
+        if cache is self._canonical_cache:
+            return
+        self._canonical_cache = cache
+        self._canonical_cache_offset = (cache.hits, cache.misses)
+
+    def canonical_cache_hits(self):
+        if self._canonical_cache is None:
+            return 0
+        return self._canonical_cache.hits - self._canonical_cache_offset[0]
+
+    def canonical_cache_misses(self):
+        if self._canonical_cache is None:
+            return 0
+        return self._canonical_cache.misses - self._canonical_cache_offset[1]
+
+    def _canonical_cache_summary(self):
+        hits = self.canonical_cache_hits()
+        lookups = hits + self.canonical_cache_misses()
+        rate = hits / lookups if lookups > 0 else 0.0
+        return f"{hits}/{lookups} hits ({rate:.1%})"
+
+    def surrogate_skipped(self, num=1):
+        """Record simulations that were skipped by a surrogate model"""
+        self._surrogate_skipped += num
+
+    def surrogate_prediction(self, predicted, actual):
+        """Record the accuracy of a surrogate model prediction
+
+        Args:
+            predicted (float): the predicted execution time
+            actual (float): the simulated execution time
+        """
+        self._surrogate_predictions += 1
+        self._surrogate_error += abs(predicted - actual) / actual
+
+    def surrogate_mean_error(self):
+        """The mean relative error of the surrogate predictions"""
+        if self._surrogate_predictions == 0:
+            return 0.0
+        return self._surrogate_error / self._surrogate_predictions
+
+    def _surrogate_used(self):
+        return self._surrogate_skipped > 0 or self._surrogate_predictions > 0
+
     def log_statistics(self):
         self._log.info(f"Mappings cached: {self._mappings_cached}")
         self._log.info(f"Mappings evaluated: {self._mappings_evaluated}")
         self._log.info(f"Time spent simulating: {self._simulation_time}")
+        if self._canonical_cache is not None:
+            self._log.info(
+                f"Canonical form cache: {self._canonical_cache_summary()}"
+            )
+        if self._surrogate_used():
+            self._log.info(
+                f"Simulations saved by surrogate: {self._surrogate_skipped}"
+            )
+            self._log.info(
+                "Surrogate mean relative error: "
+                f"{self.surrogate_mean_error():.1%}"
+            )
 
     def to_file(self):
         with open("statistics.txt", "x") as file:
@@ -73,16 +178,43 @@ class Statistics(object):
                 "Representation initialization time:"
                 f" {self._representation_init_time}\n"
             )
+            if self._canonical_cache is not None:
+                file.write(
+                    "Canonical form cache: "
+                    f"{self._canonical_cache_summary()}\n"
+                )
+            if self._surrogate_used():
+                file.write(
+                    "Simulations saved by surrogate: "
+                    f"{self._surrogate_skipped}\n"
+                )
+                file.write(
+                    "Surrogate mean relative error: "
+                    f"{self.surrogate_mean_error()}\n"
+                )
 
 
 @dataclass
 class SimulationManagerConfig:
-    """A configuration for simulation manager."""
+    """A configuration for simulation manager.
+
+    If `cache_file` is set, the simulation results are additionally stored in
+    a persistent cache at the given path, which is shared among runs.
+
+    If `compile_traces` is set, the application trace is compiled into a
+    compact array-based representation once and replayed by all simulations.
+
+    If `fast_path` is set, the simulations use the low-overhead mode of the
+    runtime processes, which yields identical results.
+    """
 
     jobs: int = 1
     parallel: bool = False
     progress: bool = False
     chunk_size: int = 10
+    cache_file: str = None
+    compile_traces: bool = True
+    fast_path: bool = True
 
 
 class SimulationManager:
@@ -93,6 +225,17 @@ class SimulationManager:
         self.platform = platform
         self.statistics = Statistics(log)
         self._cache = {}
+        self._persistent_cache = None
+        if config.cache_file:
+            self._persistent_cache = SimulationResultCache(
+                to_absolute_path(config.cache_file)
+            )
+        # keys of the persistent cache for each (graph, trace, representation)
+        self._contexts = {}
+        self._pool = None
+        self._pool_context = None
+        # compiled versions of the traces used in simulations
+        self._compiled_traces = {}
 
     def lookup(self, graph, mapping):
         """Look up the results from the cache."""
@@ -105,85 +248,277 @@ class SimulationManager:
 
         return self._cache[graph][mapping]
 
+    def cache_entries(self, graph):
+        """Get the in-memory cache of the results of `graph`.
+
+        Returns:
+            dict: the results by mapping tuple in the order the mappings were
+            first looked up. The result is None while a mapping is being
+            simulated. Results may be replaced in place, e.g., if a censored
+            result is replaced by a complete one. The dictionary must not be
+            modified.
+        """
+        return self._cache.get(graph, {})
+
     def add_mapping_result(self, graph, mapping, sim_res):
         """Save the simulation results in the cache."""
         assert graph in self._cache
         self._cache[graph][mapping] = sim_res
 
+    def add_results(self, graph, representation, input_mappings, sim_results):
+        """Store simulation results that were obtained elsewhere.
+
+        This allows to reuse the results of simulation managers in other
+        processes. Results for mappings that are already cached are ignored.
+
+        Args:
+            input_mappings: the mappings, as Mapping objects or vectors of
+                `representation`
+            sim_results (list of SimulationResult): the results of the
+                mappings
+        """
+        if len(input_mappings) == 0:
+            return
+        _, tup = self._prepare_mappings_tuples(representation, input_mappings)
+        for t, sim_res in zip(tup, sim_results):
+            if not self.lookup(graph, t):
+                self.add_mapping_result(graph, t, sim_res)
+
+    def lookup_results(self, graph, trace, representation, input_mappings):
+        """Look up the complete results of multiple mappings in the cache.
+
+        In contrast to :meth:`simulate`, missing mappings are not simulated
+        and the statistics are not updated. Censored results are ignored.
+
+        Args:
+            input_mappings: the mappings, as Mapping objects or vectors of
+                `representation`
+
+        Returns:
+            list: the cached result of each mapping, or None if there is no
+            complete result for a mapping
+        """
+        if len(input_mappings) == 0:
+            return []
+        _, tup = self._prepare_mappings_tuples(representation, input_mappings)
+        cache = self._cache.setdefault(graph, {})
+        lookups = [cache.get(t) for t in tup]
+        lookups = [res if res and not res.censored else None for res in lookups]
+        if self._persistent_cache:
+            self._lookup_persistent(graph, trace, representation, tup, lookups)
+        return [res if res else None for res in lookups]
+
+    def _context(self, graph, trace, representation):
+        """Get the key of the simulation context in the persistent cache."""
+        key = (graph, trace, representation_digest(representation))
+        if key not in self._contexts:
+            self._contexts[key] = context_digest(
+                graph, self.platform, trace, representation
+            )
+        return self._contexts[key]
+
+    def _lookup_persistent(
+        self, graph, trace, representation, tup, lookups, time_budget=None
+    ):
+        """Complete the lookups with the results from the persistent cache.
+
+        The results found in the persistent cache are also added to the
+        in-memory cache. The list `lookups` is updated in place. Censored
+        results are only used if they satisfy `time_budget`.
+        """
+        missing = [i for i, res in enumerate(lookups) if not res]
+        if not missing:
+            return
+        context = self._context(graph, trace, representation)
+        found = self._persistent_cache.lookup(
+            context, [tup[i] for i in missing]
+        )
+        for i, sim_res in zip(missing, found):
+            if sim_res and _satisfies_budget(sim_res, time_budget):
+                self.add_mapping_result(graph, tup[i], sim_res)
+                lookups[i] = sim_res
+
     def reset_statistics(self):
         self.statistics.reset()
 
     def _prepare_mappings_tuples(self, representation, input_mappings):
+        """Convert the input mappings into tuples of the representation.
+
+        If the input mappings are vectors, no Mapping objects are created
+        here. The returned list of mappings contains None instead, and the
+        Mapping objects are created by :meth:`_materialize_mappings` if they
+        need to be simulated.
+        """
         if isinstance(input_mappings[0], Mapping):
-            tup = [
-                tuple(representation.toRepresentation(m))
-                for m in input_mappings
-            ]
+            if hasattr(representation, "toRepresentationBatch"):
+                batch = representation.toRepresentationBatch(input_mappings)
+                tup = [tuple(m) for m in np.asarray(batch).tolist()]
+            else:
+                tup = [
+                    tuple(representation.toRepresentation(m))
+                    for m in input_mappings
+                ]
             mappings = input_mappings
         else:  # assume mappings are list type then
             # transform into tuples
-            tup = [
-                tuple(representation.approximate(np.array(m)))
-                for m in input_mappings
-            ]
-            mappings = [representation.fromRepresentation(m) for m in tup]
+            if hasattr(representation, "approximateBatch"):
+                batch = representation.approximateBatch(
+                    np.array([np.asarray(m) for m in input_mappings])
+                )
+                tup = [tuple(m) for m in np.asarray(batch).tolist()]
+            else:
+                tup = [
+                    tuple(representation.approximate(np.array(m)))
+                    for m in input_mappings
+                ]
+            mappings = [None] * len(tup)
         return mappings, tup
 
-    def _prepare_simulations(self, graph, trace, mappings, lookups):
-        """Prepare arguments for simulations."""
-        # create a list of simulations to be run.
-        # each element is a tuple (simulation, hydra_configuration)
-        simulations = []
-        # Logging are not configured in the spawned processes on mac OS.
-        # As a workaround, suggested in
-        # https://github.com/facebookresearch/hydra/issues/1005
-        # we pass the hydra configuration to the child processes
-        cfg_pickled = None
-        if HydraConfig.initialized():
-            config = HydraConfig.get()
-            cfg_pickled = cloudpickle.dumps(config)
-        for i, mapping in enumerate(mappings):
-            # skip if this particular mapping is in the cache
-            if lookups[i]:
-                continue
+    def _materialize_mappings(self, representation, mappings, tup):
+        """Create the Mapping objects that are missing in `mappings`."""
+        missing = [i for i, m in enumerate(mappings) if m is None]
+        if not missing:
+            return mappings
+        vectors = [tup[i] for i in missing]
+        if hasattr(representation, "fromRepresentationBatch"):
+            created = representation.fromRepresentationBatch(np.array(vectors))
+        else:
+            created = [representation.fromRepresentation(v) for v in vectors]
+        mappings = list(mappings)
+        for i, mapping in zip(missing, created):
+            mappings[i] = mapping
+        return mappings
+
+    def _prepare_simulations(self, representation, mappings, tup, lookups):
+        """Collect the mappings that need to be simulated.
+
+        Mappings that occur multiple times in the batch are only simulated
+        once.
+        """
+        # skip the mappings which are in the cache and the duplicates
+        first = {}
+        for i in range(len(mappings)):
+            if not lookups[i]:
+                first.setdefault(tup[i], i)
+        to_simulate = sorted(first.values())
+        return self._materialize_mappings(
+            representation,
+            [mappings[i] for i in to_simulate],
+            [tup[i] for i in to_simulate],
+        )
+
+    def _simulation_trace(self, trace):
+        """Get the trace that is replayed by the simulations."""
+        if not self.config.compile_traces or isinstance(trace, CompiledTrace):
+            return trace
+        if trace not in self._compiled_traces:
+            self._compiled_traces[trace] = CompiledTrace(trace)
+        return self._compiled_traces[trace]
 
-            simulation = DataflowSimulation(
-                self.platform, graph, mapping, trace
+    def _get_pool(self, graph, trace):
+        """Get a worker pool prepared for simulating `graph` and `trace`.
+
+        The pool is created on first use and kept alive across calls to
+        :meth:`simulate`. The platform, graph and trace are shipped to the
+        workers only once, when the pool is initialized. If the manager is
+        used with another graph or trace, the pool is recreated.
+        """
+        if self._pool is not None and self._pool_context != (graph, trace):
+            self.close()
+        if self._pool is None:
+            # Logging are not configured in the spawned processes on mac OS.
+            # As a workaround, suggested in
+            # https://github.com/facebookresearch/hydra/issues/1005
+            # we pass the hydra configuration to the child processes
+            cfg_pickled = None
+            if HydraConfig.initialized():
+                config = HydraConfig.get()
+                cfg_pickled = cloudpickle.dumps(config)
+            self._pool = mp.Pool(
+                processes=self.config.jobs,
+                initializer=init_simulation_worker,
+                initargs=(
+                    self.platform,
+                    graph,
+                    self._simulation_trace(trace),
+                    self.config.fast_path,
+                    cfg_pickled,
+                ),
             )
+            self._pool_context = (graph, trace)
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool if it is running."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            self._pool_context = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
 
-            simulations.append((simulation, cfg_pickled))
-        return simulations
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["_pool_context"] = None
+        return state
 
-    def _run_simulations(self, simulations):
-        """Perform simulations."""
-        if self.config.parallel and len(simulations) > self.config.chunk_size:
+    def _run_simulations(
+        self, graph, trace, mappings, time_budget=None, wall_time_budget=None
+    ):
+        """Perform simulations.
+
+        Returns:
+            list of the objects of the class `SimulationResult` in the order
+            of `mappings`.
+        """
+        if self.config.parallel and len(mappings) > self.config.chunk_size:
             # since mappings are simulated in parallel, whole simulation time
             # is added later as offset
-            for _ in simulations:
+            for _ in mappings:
                 self.statistics.mapping_evaluated(0)
 
-            # run the simulations in parallel
-            with mp.Pool(processes=self.config.jobs) as pool:
-                to_simulate = pool.imap(
-                    run_simulation_logger_wrapper,
-                    simulations,
-                    chunksize=self.config.chunk_size,
+            # run the simulations in parallel. Only a compact description
+            # of each mapping is sent to the workers.
+            pool = self._get_pool(graph, trace)
+            to_simulate = pool.imap(
+                run_simulation_worker,
+                [
+                    (encode_mapping(m), time_budget, wall_time_budget)
+                    for m in mappings
+                ],
+                chunksize=self.config.chunk_size,
+            )
+            if self.config.progress:
+                to_simulate = tqdm.tqdm(
+                    to_simulate,
+                    total=len(mappings),
                 )
-                if self.config.progress:
-                    to_simulate = tqdm.tqdm(
-                        to_simulate,
-                        total=len(simulations),
-                    )
-                simulated = list(to_simulate)
-                time = sum([s[1] for s in simulated])
-                simulated = [s[0] for s in simulated]
-                self.statistics.add_offset(time)
+            simulated = list(to_simulate)
+            time = sum([s[1] for s in simulated])
+            simulated = [s[0] for s in simulated]
+            self.statistics.add_offset(time)
         else:
             simulated = []
+            trace = self._simulation_trace(trace)
             # run the simulations sequentially
-            for s in simulations:
-                s, time = run_simulation(s[0])
-                simulated.append(s)
+            for mapping in mappings:
+                simulation = DataflowSimulation(
+                    self.platform,
+                    graph,
+                    mapping,
+                    trace,
+                    fast_path=self.config.fast_path,
+                    time_budget=time_budget,
+                    wall_time_budget=wall_time_budget,
+                )
+                simulation, time = run_simulation(simulation)
+                simulated.append(simulation.result)
                 self.statistics.mapping_evaluated(time)
         return simulated
 
@@ -198,28 +533,52 @@ class SimulationManager:
         self, graph, mappings, tup, lookups, simulated, update_metadata
     ):
         sim_results = []
+        new_results = []
+        batch_results = {}
         sim_iter = iter(simulated)
         for i, mapping in enumerate(mappings):
             sim_lookup = lookups[i]
             if sim_lookup:
                 sim_res = sim_lookup
+            elif tup[i] in batch_results:
+                # a duplicate of a mapping simulated in this batch
+                sim_res = batch_results[tup[i]]
             else:
-                s = next(sim_iter)
-                sim_res = s.result
+                sim_res = next(sim_iter)
+                batch_results[tup[i]] = sim_res
                 self.add_mapping_result(graph, tup[i], sim_res)
+                new_results.append((tup[i], sim_res))
             sim_results.append(sim_res)
-            if update_metadata:
+            if update_metadata and mapping is not None:
                 self._append_mapping_metadata(mapping, sim_res)
 
-        return sim_results
+        return sim_results, new_results
 
     def simulate(
-        self, graph, trace, representation, input_mappings, update_metadata=True
+        self,
+        graph,
+        trace,
+        representation,
+        input_mappings,
+        update_metadata=True,
+        time_budget=None,
+        wall_time_budget=None,
     ):
         """Simulate multiple mappings.
 
+        If a budget is given, simulations are aborted as soon as they exceed
+        it and their results are marked as censored (see
+        :class:`~mocasin.simulate.SimulationResult`). This is useful if only
+        mappings that are faster than a threshold are of interest. A cached
+        censored result is only reused if it already exceeded the requested
+        `time_budget`. Otherwise, the mapping is simulated again.
+
         Args:
             input_mappings: input mappings
+            time_budget (float, optional): a budget on the simulated time in
+                ps
+            wall_time_budget (float, optional): a budget on the processor time
+                spent on each simulation in seconds
 
         Returns:
             list of the objects of the class `SimulationResult`. The length of
@@ -231,6 +590,9 @@ class SimulationManager:
             return []
 
         self.statistics.set_rep_init_time(representation.init_time)
+        canonical_cache = getattr(representation, "canonical_cache", None)
+        if canonical_cache is not None:
+            self.statistics.track_canonical_cache(canonical_cache)
 
         time = process_time()
         mappings, tup = self._prepare_mappings_tuples(
@@ -240,62 +602,395 @@ class SimulationManager:
 
         # first look up as many as possible:
         lookups = [self.lookup(graph, t) for t in tup]
-        num = len([m for m in lookups if m])
+        lookups = [
+            res if res and _satisfies_budget(res, time_budget) else False
+            for res in lookups
+        ]
+        if self._persistent_cache:
+            self._lookup_persistent(
+                graph, trace, representation, tup, lookups, time_budget
+            )
+        # duplicates within the batch are answered by a single simulation
+        num = len(tup) - len(set(t for t, m in zip(tup, lookups) if not m))
         log.info(f"{num} from cache.")
         self.statistics.mappings_cached(num)
 
         # if all were already cached, return them
         if num == len(tup):
             for m, sim_res in zip(mappings, lookups):
-                self._append_mapping_metadata(m, sim_res)
+                if m is not None:
+                    self._append_mapping_metadata(m, sim_res)
             return lookups
 
         # Prepare simulation arguments
-        simulations = self._prepare_simulations(graph, trace, mappings, lookups)
+        to_simulate = self._prepare_simulations(
+            representation, mappings, tup, lookups
+        )
 
         # Run simulations itself
-        simulated = self._run_simulations(simulations)
+        simulated = self._run_simulations(
+            graph, trace, to_simulate, time_budget, wall_time_budget
+        )
 
         # Collect the simulation results and store them
-        sim_results = self._store_simulation_results(
+        sim_results, new_results = self._store_simulation_results(
             graph, mappings, tup, lookups, simulated, update_metadata
         )
+        if self._persistent_cache:
+            context = self._context(graph, trace, representation)
+            self._persistent_cache.store(context, new_results)
         return sim_results
 
+    def _cached_results(self):
+        """Collect all cached simulation results.
+
+        If the persistent cache is enabled, this also includes the results
+        stored there by other runs for the contexts used by this manager.
+        Censored results are skipped.
+
+        Returns:
+            dict: a dictionary mapping the mapping tuples to the simulation
+            results
+        """
+        results = {}
+        for graph_results in self._cache.values():
+            for mapping, sim_res in graph_results.items():
+                if sim_res and not sim_res.censored:
+                    results[tuple(mapping)] = sim_res
+        if self._persistent_cache:
+            for context in self._contexts.values():
+                for mapping, sim_res in self._persistent_cache.entries(context):
+                    if not sim_res.censored:
+                        results.setdefault(mapping, sim_res)
+        return results
+
     def dump(self, filename):
         # TODO: Use MappingTableWriter
+        results = self._cached_results()
         log.info(f"dumping cache to {filename}")
         with open(filename, "x") as file:
             file.write("mapping,runtime\n")
-            for mapping in self._cache:
+            for mapping, sim_res in results.items():
                 file.write(
                     f"\"{str(mapping).replace('(','').replace(')','')}\","
-                    f"{self._cache[mapping]}\n"
+                    f"{sim_res.exec_time}\n"
                 )
         # TODO: Use a separate method to dump this data
         filename = filename.replace("csv", "h5")
         log.info(f"dumping cache to {filename}")
         f = h5py.File(filename, "w")
-        for i, mapping in enumerate(self._cache):
+        for i, (mapping, sim_res) in enumerate(results.items()):
             f.create_dataset(str(i), data=np.array(mapping), compression="gzip")
-            f[str(i)].attrs["runtime"] = self._cache[mapping]
+            f[str(i)].attrs["runtime"] = sim_res.exec_time
         f.close()
         log.info("cache dumped.")
 
 
-def run_simulation_logger_wrapper(arguments):
-    """Simulation wrapper with logger settings.
+@dataclass
+class EstimationErrorBounds:
+    """Error bounds of analytic estimates against simulation.
+
+    The bounds are given as ratios of the simulated to the estimated
+    execution time, as observed on a set of calibration mappings.
+
+    Attributes:
+        lower (float): the minimal observed ratio
+        upper (float): the maximal observed ratio
+        mean (float): the mean observed ratio
+        samples (int): the number of calibration mappings
+    """
+
+    lower: float
+    upper: float
+    mean: float
+    samples: int
+
+
+class AnalyticSimulationManager(SimulationManager):
+    """A simulation manager that estimates results analytically.
+
+    Instead of running a discrete-event simulation for each mapping, this
+    manager evaluates mappings of SDF3 applications with
+    :class:`~mocasin.sdf3.analysis.Sdf3ThroughputEstimator`. This takes
+    only a fraction of the simulation time. The results are returned as
+    `SimulationResult` objects, such that the manager can be used in place of
+    a `SimulationManager`. Deadlocking mappings are estimated with an
+    infinite execution time. For traces other than
+    :class:`~mocasin.sdf3.trace.Sdf3Trace`, the manager falls back to
+    simulation.
+
+    The estimates may deviate from the simulation results. Call
+    :meth:`calibrate` to determine the error bounds on a set of mappings. The
+    bounds are stored in `error_bounds` and can be applied to an estimate
+    with :meth:`exec_time_bounds`.
+
+    The persistent cache stores estimates separately from simulation
+    results.
+    """
+
+    def __init__(self, platform, config=None):
+        super().__init__(platform, config)
+        self._estimators = {}
+        self.error_bounds = None
+
+    def _context(self, graph, trace, representation):
+        """Get the key of the estimation context in the persistent cache."""
+        key = (graph, trace, representation_digest(representation))
+        if key not in self._contexts:
+            digest = context_digest(graph, self.platform, trace, representation)
+            self._contexts[key] = f"analytic:{digest}"
+        return self._contexts[key]
+
+    def _estimator(self, graph, trace):
+        """Get the estimator for `graph` and `trace`.
+
+        Returns None if the trace cannot be analyzed.
+        """
+        # imported here, since the sdf3 package pulls in the PyXB bindings
+        # that would otherwise slow down every import of this module
+        from mocasin.sdf3.analysis import Sdf3ThroughputEstimator
+        from mocasin.sdf3.trace import Sdf3Trace
+
+        key = (graph, trace)
+        if key not in self._estimators:
+            estimator = None
+            if isinstance(trace, Sdf3Trace):
+                estimator = Sdf3ThroughputEstimator(graph, trace, self.platform)
+            else:
+                log.warning(
+                    f"Cannot estimate {type(trace).__name__} analytically. "
+                    "Falling back to simulation."
+                )
+            self._estimators[key] = estimator
+        return self._estimators[key]
+
+    def _run_simulations(
+        self, graph, trace, mappings, time_budget=None, wall_time_budget=None
+    ):
+        """Estimate the results of all mappings.
+
+        Estimates are never censored, the budgets only apply if the manager
+        falls back to simulation.
+
+        Returns:
+            list of the objects of the class `SimulationResult` in the order
+            of `mappings`.
+        """
+        estimator = self._estimator(graph, trace)
+        if estimator is None:
+            return super()._run_simulations(
+                graph, trace, mappings, time_budget, wall_time_budget
+            )
+        results = []
+        for mapping in mappings:
+            start_time = process_time()
+            estimate = estimator.estimate(mapping)
+            self.statistics.mapping_evaluated(process_time() - start_time)
+            results.append(
+                SimulationResult(
+                    exec_time=estimate.exec_time,
+                    static_energy=estimate.static_energy,
+                    dynamic_energy=estimate.dynamic_energy,
+                )
+            )
+        return results
+
+    def calibrate(self, graph, trace, representation, input_mappings):
+        """Determine the error bounds of the estimates.
+
+        All mappings are both simulated and estimated. Mappings that deadlock
+        are ignored. The simulation results are not cached.
+
+        Args:
+            input_mappings: the calibration mappings
+
+        Returns:
+            EstimationErrorBounds: the error bounds, which are also stored in
+                `error_bounds`
+        """
+        mappings, tup = self._prepare_mappings_tuples(
+            representation, input_mappings
+        )
+        mappings = self._materialize_mappings(representation, mappings, tup)
+        estimated = self._run_simulations(graph, trace, mappings)
+        simulated = SimulationManager._run_simulations(
+            self, graph, trace, mappings
+        )
+        ratios = [
+            sim.exec_time / est.exec_time
+            for sim, est in zip(simulated, estimated)
+            if np.isfinite(est.exec_time) and est.exec_time > 0
+        ]
+        if not ratios:
+            raise RuntimeError("No mapping could be used for calibration")
+        self.error_bounds = EstimationErrorBounds(
+            lower=min(ratios),
+            upper=max(ratios),
+            mean=sum(ratios) / len(ratios),
+            samples=len(ratios),
+        )
+        log.info(
+            "Analytic estimates deviate from simulation by a factor of "
+            f"{self.error_bounds.lower:.3f} to {self.error_bounds.upper:.3f}"
+        )
+        return self.error_bounds
+
+    def exec_time_bounds(self, sim_res):
+        """Get the range of the simulated execution time of an estimate.
+
+        Args:
+            sim_res (SimulationResult): an estimate returned by
+                :meth:`simulate`
+
+        Returns:
+            tuple: the lower and upper bound of the execution time in ps
+
+        Raises:
+            RuntimeError: if the manager was not calibrated
+        """
+        if self.error_bounds is None:
+            raise RuntimeError("The manager needs to be calibrated first")
+        return (
+            sim_res.exec_time * self.error_bounds.lower,
+            sim_res.exec_time * self.error_bounds.upper,
+        )
+
+
+def create_simulation_manager(name, platform, config=None):
+    """Create the simulation manager that a mapper uses to evaluate mappings.
+
+    Args:
+        name (str): "simulation" for a :class:`SimulationManager` or
+            "analytic" for an :class:`AnalyticSimulationManager`
+        platform (Platform): the platform
+        config (SimulationManagerConfig, optional): the configuration
+
+    Raises:
+        ValueError: if `name` is unknown
+    """
+    if name == "simulation":
+        return SimulationManager(platform, config)
+    if name == "analytic":
+        return AnalyticSimulationManager(platform, config)
+    raise ValueError(f"Unknown simulation manager: {name}")
+
+
+def _satisfies_budget(sim_res, time_budget):
+    """Check whether a cached result can answer a request with `time_budget`.
+
+    A complete result answers any request. A censored result only answers
+    requests whose budget it already exceeded.
+    """
+    if not sim_res.censored:
+        return True
+    return time_budget is not None and sim_res.exec_time >= time_budget
+
+
+# The simulation context of a worker process. It is set once by
+# `init_simulation_worker` when the worker pool is created.
+_worker_context = None
+
+
+def init_simulation_worker(platform, graph, trace, fast_path, cfg_pickled):
+    """Initialize a simulation worker process.
+
+    Stores the platform, graph and trace in the worker, so that the
+    individual tasks only need to carry a compact mapping description (see
+    :func:`encode_mapping`). Use this as the initializer of a worker pool
+    whose tasks are run with :func:`run_simulation_worker`.
 
     Logging are not configured in the spawned processes on mac OS.
     As a workaround, suggested in
     https://github.com/facebookresearch/hydra/issues/1005
     we pass the hydra configuration from the main process.
     """
-    simulation, cfg_pickled = arguments
+    global _worker_context
     if cfg_pickled:
         config = pickle.loads(cfg_pickled)
         hydra.core.utils.configure_log(config.job_logging, config.verbose)
-    return run_simulation(simulation)
+    _worker_context = (platform, graph, trace, fast_path)
+
+
+def run_simulation_worker(task):
+    """Simulate a mapping inside a worker process.
+
+    The task is a tuple of an encoded mapping and the time budgets.
+    """
+    platform, graph, trace, fast_path = _worker_context
+    encoded_mapping, time_budget, wall_time_budget = task
+    mapping = decode_mapping(graph, platform, encoded_mapping)
+    simulation = DataflowSimulation(
+        platform,
+        graph,
+        mapping,
+        trace,
+        fast_path=fast_path,
+        time_budget=time_budget,
+        wall_time_budget=wall_time_budget,
+    )
+    simulation, time = run_simulation(simulation)
+    return simulation.result, time
+
+
+def encode_mapping(mapping):
+    """Encode a mapping into a compact tuple.
+
+    The tuple contains the name of the processor, the name of the scheduler
+    and the priority for each process, followed by the name of the primitive
+    and the capacity for each channel. Processes and channels are sorted by
+    their names.
+    """
+    processes = tuple(
+        (info.affinity.name, info.scheduler.name, info.priority)
+        for info in (
+            mapping.process_info(p)
+            for p in sorted(mapping.graph.processes(), key=lambda p: p.name)
+        )
+    )
+    channels = tuple(
+        (info.primitive.name, info.capacity)
+        for info in (
+            mapping.channel_info(c)
+            for c in sorted(mapping.graph.channels(), key=lambda c: c.name)
+        )
+    )
+    return processes, channels
+
+
+def decode_mapping(graph, platform, encoded_mapping):
+    """Reconstruct a mapping encoded with :func:`encode_mapping`."""
+    processes, channels = encoded_mapping
+    mapping = Mapping(graph, platform)
+    sorted_processes = sorted(graph.processes(), key=lambda p: p.name)
+    for process, (pe, scheduler, priority) in zip(sorted_processes, processes):
+        info = ProcessMappingInfo(
+            platform.find_scheduler(scheduler),
+            platform.find_processor(pe),
+            priority,
+        )
+        mapping.add_process_info(process, info)
+    sorted_channels = sorted(graph.channels(), key=lambda c: c.name)
+    for channel, (primitive, capacity) in zip(sorted_channels, channels):
+        info = ChannelMappingInfo(platform.find_primitive(primitive), capacity)
+        mapping.add_channel_info(channel, info)
+    return mapping
+
+
+def closes_simulation_manager(method):
+    """Decorate a mapper method to close the simulation manager afterwards.
+
+    The worker pool of the mapper's simulation manager is shut down when the
+    method returns or raises an exception.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._simulation_manager.close()
+
+    return wrapper
 
 
 def run_simulation(simulation):
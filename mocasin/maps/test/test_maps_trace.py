@@ -0,0 +1,89 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from mocasin.common.trace import SegmentType
+from mocasin.maps.trace import (
+    BINARY_TRACE_FILE,
+    MapsBinaryTrace,
+    MapsTrace,
+    binary_trace_is_up_to_date,
+    convert_trace,
+)
+
+TRACES = {
+    "src.ARM.cpntrace": ["m 0 10", "w c0 1 20", "w c0 1 20", "e"],
+    "src.DSP.cpntrace": ["m 0 5", "w c0 1 15", "w c0 1 15", "e"],
+    "sink.ARM.cpntrace": ["r c0 0 2 30", "m 0 40", "e"],
+    "sink.DSP.cpntrace": ["r c0 0 2 25", "m 0 45", "e"],
+}
+
+
+@pytest.fixture
+def trace_dir(tmpdir):
+    for name, lines in TRACES.items():
+        tmpdir.join(name).write("\n".join(lines) + "\n")
+    return str(tmpdir)
+
+
+def _segment_tuples(segments):
+    for s in segments:
+        if s.segment_type == SegmentType.COMPUTE:
+            yield (s.segment_type, dict(s.processor_cycles))
+        else:
+            yield (s.segment_type, s.channel, s.num_tokens)
+
+
+def test_binary_trace(trace_dir):
+    text_trace = MapsTrace(trace_dir)
+    binary_trace = MapsBinaryTrace(trace_dir)
+    assert os.path.isfile(os.path.join(trace_dir, BINARY_TRACE_FILE))
+    assert binary_trace_is_up_to_date(trace_dir)
+
+    for process in ["src", "sink"]:
+        expected = list(_segment_tuples(text_trace.get_trace(process)))
+        actual = list(_segment_tuples(binary_trace.get_trace(process)))
+        assert actual == expected
+        assert binary_trace.accumulate_processor_cycles(
+            process
+        ) == text_trace.accumulate_processor_cycles(process)
+
+    # the compiled trace is backed by the memory mapped file
+    compiled = binary_trace.get_compiled_trace("src")
+    assert isinstance(compiled.segment_types.base, np.memmap)
+
+    with pytest.raises(RuntimeError):
+        binary_trace.get_compiled_trace("foo")
+
+
+def test_binary_trace_pickle(trace_dir):
+    binary_trace = MapsBinaryTrace(trace_dir)
+    binary_trace.get_compiled_trace("sink")
+    restored = pickle.loads(pickle.dumps(binary_trace))
+    assert list(_segment_tuples(restored.get_trace("sink"))) == list(
+        _segment_tuples(binary_trace.get_trace("sink"))
+    )
+
+
+def test_binary_trace_reconvert(trace_dir, tmpdir):
+    binary_file = str(tmpdir.join("out.cpnbin"))
+    assert not binary_trace_is_up_to_date(trace_dir, binary_file)
+    convert_trace(trace_dir, binary_file)
+    assert binary_trace_is_up_to_date(trace_dir, binary_file)
+
+    # modifying a trace file invalidates the binary trace
+    with open(os.path.join(trace_dir, "sink.ARM.cpntrace"), "w") as f:
+        f.write("r c0 0 2 30\nm 0 400\ne\n")
+    assert not binary_trace_is_up_to_date(trace_dir, binary_file)
+
+    binary_trace = MapsBinaryTrace(trace_dir, binary_file)
+    assert binary_trace_is_up_to_date(trace_dir, binary_file)
+    assert binary_trace.accumulate_processor_cycles("sink") == {
+        "ARM": 430,
+        "DSP": 70,
+    }
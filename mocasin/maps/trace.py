@@ -6,12 +6,18 @@
 
 import contextlib
 import glob
+import json
 import logging
 import os
+import struct
+import tempfile
 
 from hydra.utils import to_absolute_path
+import numpy as np
 
 from mocasin.common.trace import (
+    CompiledProcessTrace,
+    CompiledTrace,
     DataflowTrace,
     ComputeSegment,
     ReadTokenSegment,
@@ -122,3 +128,246 @@ class MapsTrace(DataflowTrace):
         if len(elements) != 1:
             raise RuntimeError("The trace files do not match!")
         return elements.pop()
+
+
+# The binary trace format
+#
+# A binary trace file starts with an 8 byte magic string followed by the length
+# of a JSON header encoded as 64 bit unsigned integer (little endian). The
+# header records the source files the binary trace was created from and, for
+# each process, the metadata and the location of the arrays of a
+# CompiledProcessTrace. The arrays follow the header. Each array starts at an
+# offset (relative to the end of the header) that is a multiple of
+# _BINARY_ALIGNMENT, which allows to map the arrays directly into memory.
+
+BINARY_TRACE_FILE = "trace.cpnbin"
+_BINARY_MAGIC = b"MCSNCPN1"
+_BINARY_ALIGNMENT = 64
+_BINARY_ARRAYS = (
+    "segment_types",
+    "channels",
+    "num_tokens",
+    "cycle_rows",
+    "cycles",
+)
+
+
+def _align(offset):
+    return -(-offset // _BINARY_ALIGNMENT) * _BINARY_ALIGNMENT
+
+
+def _trace_sources(trace_dir):
+    """Get the size and modification time of all trace files in a directory"""
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(trace_dir, "*.cpntrace"))):
+        stat = os.stat(path)
+        sources[os.path.basename(path)] = [stat.st_size, stat.st_mtime_ns]
+    return sources
+
+
+def _read_binary_header(path):
+    with open(path, "rb") as f:
+        magic = f.read(len(_BINARY_MAGIC))
+        if magic != _BINARY_MAGIC:
+            raise RuntimeError(f"{path} is not a binary MAPS trace file")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length).decode())
+    header["data_offset"] = _align(len(_BINARY_MAGIC) + 8 + length)
+    return header
+
+
+def convert_trace(trace_dir, binary_file=None):
+    """Convert a MAPS trace directory to a binary trace file.
+
+    All ``*.cpntrace`` files in `trace_dir` are parsed and the trace of each
+    process is stored in a compact binary form. The resulting file can be read
+    by :class:`MapsBinaryTrace` without any text parsing.
+
+    The file is written atomically, such that concurrent readers either see
+    the old or the new version of the file.
+
+    Args:
+        trace_dir (str): path to the directory containing all trace files
+        binary_file (str, optional): path of the binary trace file to write.
+            Defaults to ``trace.cpnbin`` in `trace_dir`.
+
+    Returns:
+        str: the path of the written binary trace file
+    """
+    trace_dir = to_absolute_path(trace_dir)
+    if binary_file is None:
+        binary_file = os.path.join(trace_dir, BINARY_TRACE_FILE)
+    else:
+        binary_file = to_absolute_path(binary_file)
+
+    sources = _trace_sources(trace_dir)
+    if len(sources) == 0:
+        raise RuntimeError(f"There are no trace files in {trace_dir}!")
+
+    log.info(f"Convert the MAPS trace in {trace_dir} to {binary_file}")
+
+    trace = MapsTrace(trace_dir)
+    processes = sorted({name.split(".")[0] for name in sources})
+
+    # compile all process traces and determine the layout of the file
+    arrays = []
+    header = {"sources": sources, "processes": {}}
+    offset = 0
+    for process in processes:
+        compiled = CompiledProcessTrace.from_segments(trace.get_trace(process))
+        entry = {
+            "channel_names": list(compiled.channel_names),
+            "processor_types": list(compiled.processor_types),
+            "total_cycles": compiled.total_cycles(),
+            "arrays": {},
+        }
+        for name in _BINARY_ARRAYS:
+            array = np.ascontiguousarray(getattr(compiled, name))
+            array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+            entry["arrays"][name] = [array.dtype.str, array.shape, offset]
+            arrays.append((offset, array))
+            offset = _align(offset + array.nbytes)
+        header["processes"][process] = entry
+
+    encoded_header = json.dumps(header).encode()
+    data_offset = _align(len(_BINARY_MAGIC) + 8 + len(encoded_header))
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(binary_file), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_BINARY_MAGIC)
+            f.write(struct.pack("<Q", len(encoded_header)))
+            f.write(encoded_header)
+            for array_offset, array in arrays:
+                f.seek(data_offset + array_offset)
+                f.write(array.tobytes())
+            # make sure that the file covers the last aligned offset
+            f.truncate(data_offset + offset)
+        os.replace(tmp_path, binary_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return binary_file
+
+
+def binary_trace_is_up_to_date(trace_dir, binary_file=None):
+    """Check whether a binary trace file reflects the current trace files.
+
+    Args:
+        trace_dir (str): path to the directory containing all trace files
+        binary_file (str, optional): path of the binary trace file. Defaults
+            to ``trace.cpnbin`` in `trace_dir`.
+
+    Returns:
+        bool: True if the binary trace exists and was created from trace files
+        with the same sizes and modification times as the current ones.
+    """
+    trace_dir = to_absolute_path(trace_dir)
+    if binary_file is None:
+        binary_file = os.path.join(trace_dir, BINARY_TRACE_FILE)
+    else:
+        binary_file = to_absolute_path(binary_file)
+    try:
+        header = _read_binary_header(binary_file)
+    except (OSError, RuntimeError, ValueError, struct.error):
+        return False
+    return header["sources"] == _trace_sources(trace_dir)
+
+
+class MapsBinaryTrace(CompiledTrace):
+    """Represents the behavior of a MAPS (KPN) application
+
+    Unlike :class:`MapsTrace`, this class reads the traces from a binary trace
+    file (see :func:`convert_trace`) that is mapped into memory. Thus, no text
+    parsing is required when a trace is replayed. If the binary trace file
+    does not exist or is outdated, it is (re)created from the trace files in
+    `trace_dir` when the object is created. If the binary file cannot be
+    written, the traces are parsed and compiled in memory instead.
+
+    See `~DataflowTrace`.
+
+    Args:
+        trace_dir (str): path to the directory containing all trace files
+        binary_file (str, optional): path of the binary trace file. Defaults
+            to ``trace.cpnbin`` in `trace_dir`.
+    """
+
+    def __init__(self, trace_dir, binary_file=None):
+        super().__init__(MapsTrace(trace_dir))
+        trace_dir = to_absolute_path(trace_dir)
+        if binary_file is None:
+            binary_file = os.path.join(trace_dir, BINARY_TRACE_FILE)
+        else:
+            binary_file = to_absolute_path(binary_file)
+        self._binary_file = binary_file
+        self._header = None
+        self._data = None
+
+        if binary_trace_is_up_to_date(trace_dir, binary_file):
+            log.info(f"Reuse the binary trace {binary_file}")
+        else:
+            try:
+                convert_trace(trace_dir, binary_file)
+            except OSError as e:
+                log.warning(
+                    f"Could not write the binary trace {binary_file} ({e}). "
+                    "Parse the trace files instead."
+                )
+                self._binary_file = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The memory map is recreated lazily after unpickling
+        state["_compiled"] = {}
+        state["_header"] = None
+        state["_data"] = None
+        return state
+
+    def _map_binary_file(self):
+        if self._data is None:
+            self._header = _read_binary_header(self._binary_file)
+            self._data = np.memmap(self._binary_file, dtype=np.uint8, mode="r")
+        return self._header, self._data
+
+    def get_compiled_trace(self, process):
+        """Get the compiled trace of a process.
+
+        The arrays of the returned trace are views of the memory mapped
+        binary trace file.
+
+        Args:
+            process (str): Name of the process to get a trace for
+
+        Returns:
+            CompiledProcessTrace: the compiled trace
+        """
+        if self._binary_file is None:
+            return super().get_compiled_trace(process)
+
+        compiled = self._compiled.get(process)
+        if compiled is not None:
+            return compiled
+
+        header, data = self._map_binary_file()
+        entry = header["processes"].get(process)
+        if entry is None:
+            raise RuntimeError(
+                f"There is no trace file for the process {process}!"
+            )
+        arrays = {}
+        for name, (dtype, shape, offset) in entry["arrays"].items():
+            dtype = np.dtype(dtype)
+            start = header["data_offset"] + offset
+            end = start + dtype.itemsize * int(np.prod(shape))
+            arrays[name] = data[start:end].view(dtype).reshape(shape)
+        compiled = CompiledProcessTrace(
+            channel_names=tuple(entry["channel_names"]),
+            processor_types=tuple(entry["processor_types"]),
+            total_cycles=entry["total_cycles"],
+            **arrays,
+        )
+        self._compiled[process] = compiled
+        return compiled
@@ -15,7 +15,7 @@ from mocasin.common.platform import (
     Primitive,
     CommunicationPhase,
 )
-from mocasin.platforms.utils import simpleDijkstra, yxRouting
+from mocasin.platforms.utils import RoutingTable, yxRouting
 from mocasin.platforms.topologies import meshTopology
 from mocasin.util import logging
 import sys
@@ -193,7 +193,11 @@ class PlatformDesigner:
         if noc[noc_name][1] == meshTopology:
             routingFunction = yxRouting
         else:
-            routingFunction = simpleDijkstra
+            # compute the routes between all routers at once
+            routing = RoutingTable(adjacencyList)
+
+            def routingFunction(adjacencyList, source, target):
+                return routing.route(source, target)
 
         for router in router_list:
             # extract the associated pe for each router
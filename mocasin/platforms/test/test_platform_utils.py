@@ -3,7 +3,7 @@
 #
 # Authors: Felix Teweleit
 
-from mocasin.platforms import utils
+from mocasin.platforms import topologies, utils
 
 
 class TestUtils(object):
@@ -30,3 +30,29 @@ class TestUtils(object):
     def test_dijkstra_cyclic_3(self, cyclicGraph):
         result = utils.simpleDijkstra(cyclicGraph, 9, 4)
         assert result == [9, 8, 7, 4] or result == [9, 8, 5, 4]
+
+    def test_routing_table_DAG(self, DAG):
+        table = utils.RoutingTable(DAG)
+        for source in DAG:
+            for target in DAG:
+                assert table.route(source, target) == utils.simpleDijkstra(
+                    DAG, source, target
+                )
+
+    def test_routing_table_cyclic(self, cyclicGraph):
+        table = utils.RoutingTable(cyclicGraph, sources=[0, 3])
+        for source in cyclicGraph:
+            for target in cyclicGraph:
+                assert table.route(source, target) == utils.simpleDijkstra(
+                    cyclicGraph, source, target
+                )
+
+    def test_routing_table_torus(self):
+        nodes = [f"router_{i}" for i in range(36)]
+        torus = topologies.torusTopology(nodes)
+        table = utils.RoutingTable(torus)
+        for source in nodes:
+            for target in nodes:
+                assert table.route(source, target) == utils.simpleDijkstra(
+                    torus, source, target
+                )
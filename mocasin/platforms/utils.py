@@ -88,6 +88,81 @@ def simpleDijkstra(adjacencyList, source, target):
     return currentPath
 
 
+class RoutingTable:
+    """Shortest routes between all pairs of nodes in a graph.
+
+    The routes are computed with a breadth-first search from each source
+    node, which takes linear time per source. This is much faster than
+    calling :func:`simpleDijkstra` for each pair of nodes. The routes are
+    identical to those found by :func:`simpleDijkstra`: if there are multiple
+    shortest routes, the route via the nodes that come first in the
+    adjacency list is chosen.
+
+    Args:
+        adjacency_list (dict): the graph as an adjacency list (see
+            :func:`simpleDijkstra`)
+        sources (list, optional): the source nodes for which routes are
+            computed upfront. Defaults to all nodes. Routes from other nodes
+            are computed on demand.
+    """
+
+    def __init__(self, adjacency_list, sources=None):
+        self._nodes = list(adjacency_list)
+        self._index = {node: i for i, node in enumerate(self._nodes)}
+        self._successors = [
+            [self._index[n] for n in adjacency_list[node]]
+            for node in self._nodes
+        ]
+        # the predecessor of each node on the route from a source
+        self._predecessors = {}
+        if sources is None:
+            sources = self._nodes
+        for source in sources:
+            self._search(self._index[source])
+
+    def _search(self, source):
+        """Calculate the predecessors on all routes starting at `source`."""
+        successors = self._successors
+        predecessors = [-1] * len(self._nodes)
+        predecessors[source] = source
+        level = [source]
+        while level:
+            next_level = []
+            for node in level:
+                for successor in successors[node]:
+                    if predecessors[successor] < 0:
+                        predecessors[successor] = node
+                        next_level.append(successor)
+            # nodes with the same distance are visited in adjacency list order
+            next_level.sort()
+            level = next_level
+        self._predecessors[source] = predecessors
+        return predecessors
+
+    def route(self, source, target):
+        """Get the shortest route from `source` to `target`.
+
+        Returns:
+            list: the nodes on the route, including `source` and `target`,
+            or None if `target` is not reachable
+        """
+        src = self._index[source]
+        if not self._successors[src]:
+            return None
+        predecessors = self._predecessors.get(src)
+        if predecessors is None:
+            predecessors = self._search(src)
+        node = self._index[target]
+        if predecessors[node] < 0:
+            return None
+        route = [node]
+        while node != src:
+            node = predecessors[node]
+            route.append(node)
+        nodes = self._nodes
+        return [nodes[i] for i in reversed(route)]
+
+
 def valToXY(val, n):
     x = int(val % n)
     y = int(val / n)
@@ -8,6 +8,7 @@ from numpy.random import randint
 from copy import copy
 import random
 import timeit
+import weakref
 from os.path import exists
 
 try:
@@ -28,6 +29,7 @@ from .metric_spaces import (
     arch_to_distance_metric,
 )
 from .embeddings import MetricSpaceEmbedding
+from .cache import CanonicalFormCache
 from .automorphisms import (
     to_labeled_edge_graph,
     edge_to_node_autgrp,
@@ -52,12 +54,18 @@ class MappingRepresentation(type):
     This applies on a per graph/platform combination basis.
     It means that if you have a different combination of graph/platform,
     a new representation object will be initialized even if
-    a representation of that type already exists.
-
-    A representation has to implement a function `changed_parameters`
-    that checks if the representation-specific parameters are different
-    (takes the same parameters in the same order as the init function,
-    except for the application and platform)
+    a representation of that type already exists. Graphs and platforms are
+    identified by their structure (see :meth:`_instance_key`), i.e., two
+    objects with the same names, connections, frequencies and communication
+    costs share a representation. A new object is also initialized if the
+    representation-specific parameters (all arguments of the init function,
+    except for the application and platform) are different.
+
+    Creating a representation that already exists is cheap. The existing
+    object is copied, and the copy shares all internal data structures with
+    it, including the mapper that generates mappings from vectors. These
+    shared structures must be treated as read-only. The representation-specific
+    parameters of an object are available in its `init_parameters` attribute.
 
     In general, representations work with mapping objects
     and can return something which corresponds to the
@@ -73,36 +81,115 @@ class MappingRepresentation(type):
         platform_names = ";".join(map(lambda x: x.name, platform.processors()))
         return graph_names, platform_names
 
+    # structural keys of the graph and platform objects (see _instance_key)
+    _graph_keys = weakref.WeakKeyDictionary()
+    _platform_keys = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def _graph_key(graph):
+        return (
+            tuple(p.name for p in graph.processes()),
+            tuple(
+                (
+                    c.name,
+                    c.token_size,
+                    None if c.source is None else c.source.name,
+                    tuple(s.name for s in c.sinks),
+                )
+                for c in graph.channels()
+            ),
+        )
+
+    @staticmethod
+    def _platform_key(platform):
+        return (
+            tuple(
+                (p.name, p.type, p.base_frequency)
+                for p in platform.processors()
+            ),
+            tuple(
+                (
+                    prim.name,
+                    tuple(
+                        (src.name, prim.static_produce_costs(src))
+                        for src in prim.producers
+                    ),
+                    tuple(
+                        (sink.name, prim.static_consume_costs(sink))
+                        for sink in prim.consumers
+                    ),
+                )
+                for prim in platform.primitives()
+            ),
+        )
+
+    @staticmethod
+    def _instance_key(cls, graph, platform):
+        """A fingerprint of the graph and platform structure.
+
+        Representations precompute distances, embeddings and symmetries from
+        the communication costs of the platform. Thus, the key contains the
+        connections of the channels, the processor types and base
+        frequencies, and the static costs of every producer and consumer of
+        each primitive.
+
+        The fingerprint of a graph or platform object is computed on its
+        first use and then looked up by the object's identity. Hence, graphs
+        and platforms must not be modified after a representation was
+        created for them.
+        """
+        graph_key = MappingRepresentation._graph_keys.get(graph)
+        if graph_key is None:
+            graph_key = MappingRepresentation._graph_key(graph)
+            MappingRepresentation._graph_keys[graph] = graph_key
+        platform_key = MappingRepresentation._platform_keys.get(platform)
+        if platform_key is None:
+            platform_key = MappingRepresentation._platform_key(platform)
+            MappingRepresentation._platform_keys[platform] = platform_key
+        return cls, graph_key, platform_key
+
     def __call__(cls, *args, **kwargs):
         """Check whether a representation was created for the same application
         platform, and copy the object."""
         time = timeit.default_timer()
         graph = args[0]
         platform = args[1]
-        graph_names, platform_names = MappingRepresentation.gen_hash(
-            graph, platform
-        )
+        key = MappingRepresentation._instance_key(cls, graph, platform)
+        parameters = (args[2:], kwargs)
 
-        if (cls, graph, platform) in cls._instances:
-            different = cls._instances[
-                (cls, graph, platform)
-            ].changed_parameters(*args[2:])
-
-        if (cls, graph, platform) not in cls._instances or different:
-            # make hashables of these two
-            cls._instances[(cls, graph_names, platform_names)] = super(
-                MappingRepresentation, cls
-            ).__call__(*args, **kwargs)
+        cached = cls._instances.get(key)
+        if cached is None or cached[1] != parameters:
+            representation = super(MappingRepresentation, cls).__call__(
+                *args, **kwargs
+            )
+            list_mapper = getattr(representation, "list_mapper", None)
+            cached = [representation, parameters, list_mapper]
+            cls._instances[key] = cached
+            graph_names, platform_names = MappingRepresentation.gen_hash(
+                graph, platform
+            )
             log.debug(
                 f"Initializing representation {cls} of graph with processes: "
                 f"{graph_names} on platform with cores {platform_names}"
             )
 
-        instance = copy(cls._instances[(cls, graph_names, platform_names)])
+        instance = copy(cached[0])
+        # The list mapper refers to the graph and platform objects. It is only
+        # recreated if the representation is used for other objects than
+        # before.
+        list_mapper = cached[2]
+        if (
+            list_mapper is None
+            or list_mapper.graph is not graph
+            or list_mapper.platform is not platform
+        ):
+            com_mapper = ComFullMapper(platform)
+            list_mapper = ProcPartialMapper(graph, platform, com_mapper)
+            cached[2] = list_mapper
         instance.graph = graph
         instance.platform = platform
-        com_mapper = ComFullMapper(platform)
-        instance.list_mapper = ProcPartialMapper(graph, platform, com_mapper)
+        instance.list_mapper = list_mapper
+        instance.init_parameters = parameters
         instance.init_time = timeit.default_timer() - time
         return instance
 
@@ -147,6 +234,12 @@ class SimpleVectorRepresentation(metaclass=MappingRepresentation):
     with the representation. Its usage is discouraged for having a standard
     interface, but they are provided in case they prove useful, when you know
     what you are doing.
+
+    Methods suffixed with "Batch", like toRepresentationBatch or
+    approximateBatch, work on many mappings at once. They take and return
+    2-dimensional numpy arrays with one row per mapping. Mapping objects are
+    only created by fromRepresentationBatch, such that many points can be
+    processed without the overhead of creating Mapping objects.
     """
 
     def __init__(
@@ -223,12 +316,23 @@ class SimpleVectorRepresentation(metaclass=MappingRepresentation):
     def toRepresentation(self, mapping):
         return mapping.to_list(channels=self.channels)
 
+    def toRepresentationBatch(self, mappings):
+        return np.array(
+            [m.to_list(channels=self.channels) for m in mappings], dtype=int
+        )
+
     def fromRepresentation(self, mapping):
         if type(mapping) == np.ndarray:
             mapping = mapping.astype(int)
         mapping_obj = self.list_mapper.generate_mapping(mapping)
         return mapping_obj
 
+    def fromRepresentationBatch(self, mappings):
+        return [
+            self.list_mapper.generate_mapping(m)
+            for m in np.asarray(mappings).astype(int).tolist()
+        ]
+
     def _simpleVec2Elem(self, x):
         if not self.channels:
             return x
@@ -236,48 +340,48 @@ class SimpleVectorRepresentation(metaclass=MappingRepresentation):
             m = self.list_mapper.generate_mapping(x)
             return m.to_list(channels=True)
 
+    def _simpleVec2ElemBatch(self, xs):
+        if not self.channels:
+            return np.asarray(xs)
+        return np.array([self._simpleVec2Elem(x) for x in np.asarray(xs)])
+
     def _elem2SimpleVec(self, x):
         if self.channels:
             return x
         else:
             return x[: self.num_procs]
 
+    def _elem2SimpleVecBatch(self, xs):
+        if self.channels:
+            return np.asarray(xs)
+        return np.asarray(xs)[:, : self.num_procs]
+
     def _uniformFromBall(self, p, r, npoints=1, simple=False):
-        Procs = list(self.graph._processes.keys())
-        PEs = list(self.platform._processors.keys())
-        P = len(PEs)
-        res = []
+        num_procs = len(self.graph._processes)
+        P = len(self.platform._processors)
 
-        def _round(point):
+        def _round(points):
+            rounded = np.rint(points).astype(int)
             # perodic boundary conditions
-            rounded = int(round(point) % P)
             if self.boundary_conditions:
-                return rounded
+                return rounded % P
             else:
-                if point > P - 1:
-                    return P - 1
-                elif point < 0:
-                    return 0
-                else:
-                    return rounded
-
-        center = p[: len(Procs)]
-        for _ in range(npoints):
-            if simple:
-                radius = _round(r / 2)
-                offset = []
-                for _ in range(len(Procs)):
-                    offset.append(randint(-radius, radius))
+                return np.clip(rounded, 0, P - 1)
 
-            else:
-                offset = r * lp.uniform_from_p_ball(p=self.p, n=len(Procs))
-            real_point = (np.array(center) + np.array(offset)).tolist()
-            v = list(map(_round, real_point))
+        center = np.asarray(p[:num_procs], dtype=float)
+        if simple:
+            radius = int(_round(r / 2))
+            offsets = randint(-radius, radius, size=(npoints, num_procs))
+        else:
+            offsets = r * lp.uniform_from_p_ball_batch(
+                p=self.p, n=num_procs, num=npoints
+            )
+        points = _round(center + offsets).tolist()
 
-            if self.channels:
-                res.append(self.randomPrimitives(v))
-            else:
-                res.append(v)
+        if self.channels:
+            res = [self.randomPrimitives(v) for v in points]
+        else:
+            res = points
         log.debug(f"uniform from ball: {res}")
         return res
 
@@ -303,6 +407,14 @@ class SimpleVectorRepresentation(metaclass=MappingRepresentation):
             res = list(map(lambda t: max(0, min(t, P - 1)), approx))
         return res
 
+    def approximateBatch(self, xs):
+        approx = np.rint(np.asarray(xs)).astype(int)
+        P = len(self.platform._processors)
+        if self.boundary_conditions:
+            return approx % P
+        else:
+            return np.clip(approx, 0, P - 1)
+
     def crossover(self, m1, m2, k):
         return self._crossover(
             self.toRepresentation(m1), self.toRepresentation(m2), k
@@ -388,6 +500,12 @@ class SymmetryRepresentation(metaclass=MappingRepresentation):
     for approximating a NoC architecture as a bus. To pre-compute the symmetries
     and store them in a file, use the calculate_platform_symmetries task. This
     pre-computation only works when using mpsym.
+
+    Canonical representatives are stored in a bounded LRU cache, since mappers
+    typically revisit the same mappings many times. The canonical_cache_size
+    parameter sets the maximum number of cached mappings (0 disables caching).
+    Use _simpleVec2ElemBatch or toRepresentationBatch to convert many mappings
+    at once.
     """
 
     def __init__(
@@ -400,6 +518,7 @@ class SymmetryRepresentation(metaclass=MappingRepresentation):
         canonical_operations=True,
         disable_mpsym=False,
         disable_symmetries_test=False,
+        canonical_cache_size=65536,
     ):
         self._topologyGraph = platform.to_adjacency_dict(
             include_proc_type_labels=True
@@ -415,6 +534,7 @@ class SymmetryRepresentation(metaclass=MappingRepresentation):
         com_mapper = ComFullMapper(platform)
         self.list_mapper = ProcPartialMapper(graph, platform, com_mapper)
         self.canonical_operations = canonical_operations
+        self.canonical_cache = CanonicalFormCache(canonical_cache_size)
 
         n = len(self.platform.processors())
         correct = None
@@ -528,14 +648,30 @@ class SymmetryRepresentation(metaclass=MappingRepresentation):
             self._G = PermutationGroup(permutations)
             log.info("Initialized automorphism group with internal symmetries")
 
+    def _canonicalize(self, x_):
+        if self.sym_library:
+            return self._ag.representative(list(x_))
+        else:
+            return self._G.tuple_canonical(list(x_))
+
     def _simpleVec2Elem(self, x):
         x_ = x[: self._d]
         # keep channels if exist (they should be mapped accordingly...)
         _x = x[self._d :]
-        if self.sym_library:
-            return list(self._ag.representative(x_)) + _x
-        else:
-            return self._G.tuple_normalize(x_) + _x
+        canonical = self.canonical_cache.lookup(tuple(x_), self._canonicalize)
+        return list(canonical) + _x
+
+    def _simpleVec2ElemBatch(self, xs):
+        """Calculate the canonical vectors of multiple mapping vectors.
+
+        Each distinct vector is normalized at most once.
+        """
+        xs = np.asarray(xs, dtype=int)
+        canonicals = self.canonical_cache.lookup_many(
+            [tuple(x) for x in xs[:, : self._d].tolist()], self._canonicalize
+        )
+        canonicals = np.array(canonicals, dtype=int).reshape(len(xs), -1)
+        return np.hstack([canonicals, xs[:, self._d :]])
 
     def changed_parameters(self):
         return False
@@ -543,12 +679,14 @@ class SymmetryRepresentation(metaclass=MappingRepresentation):
     def _elem2SimpleVec(self, x):
         return x
 
+    def _elem2SimpleVecBatch(self, xs):
+        return np.asarray(xs)
+
     def _uniform(self):
         procs_only = SimpleVectorRepresentation._uniform(self)[: self._d]
-        if self.sym_library:
-            return self._ag.representative(procs_only)
-        else:
-            return self._G.tuple_normalize(procs_only)
+        return list(
+            self.canonical_cache.lookup(tuple(procs_only), self._canonicalize)
+        )
 
     def uniform(self):
         return self.fromRepresentation(self._uniform())
@@ -587,6 +725,11 @@ class SymmetryRepresentation(metaclass=MappingRepresentation):
     def toRepresentation(self, mapping):
         return self._simpleVec2Elem(mapping.to_list(channels=self.channels))
 
+    def toRepresentationBatch(self, mappings):
+        return self._simpleVec2ElemBatch(
+            [m.to_list(channels=self.channels) for m in mappings]
+        )
+
     def toRepresentationNoncanonical(self, mapping):
         return SimpleVectorRepresentation.toRepresentation(self, mapping)
 
@@ -595,6 +738,12 @@ class SymmetryRepresentation(metaclass=MappingRepresentation):
         mapping_obj = self.list_mapper.generate_mapping(mapping)
         return mapping_obj
 
+    def fromRepresentationBatch(self, mappings):
+        # Does not check if canonical. This is deliberate.
+        return SimpleVectorRepresentation.fromRepresentationBatch(
+            self, mappings
+        )
+
     def _uniformFromBall(self, p, r, npoints=1):
         return SimpleVectorRepresentation._uniformFromBall(
             self, p, r, npoints=npoints
@@ -644,6 +793,10 @@ class SymmetryRepresentation(metaclass=MappingRepresentation):
         approx = SimpleVectorRepresentation.approximate(self, x)
         return self._simpleVec2Elem(approx)
 
+    def approximateBatch(self, xs):
+        approx = SimpleVectorRepresentation.approximateBatch(self, xs)
+        return self._simpleVec2ElemBatch(approx)
+
 
 class MetricEmbeddingRepresentation(
     MetricSpaceEmbedding, metaclass=MappingRepresentation
@@ -767,9 +920,16 @@ class MetricEmbeddingRepresentation(
 
         return as_array
 
+    def _simpleVec2ElemBatch(self, xs):
+        xs = np.asarray(xs, dtype=int)[:, : self._d]
+        return self._f_iota[xs].reshape(len(xs), -1)
+
     def _elem2SimpleVec(self, x):
         return self.inv(self.approx(x[: (self._k * self._d)]).tolist())
 
+    def _elem2SimpleVecBatch(self, xs):
+        return self.approxIndices(np.asarray(xs)[:, : (self._k * self._d)])
+
     def _uniform(self):
         res = np.array(self.uniformVector()).flatten()
         return res
@@ -812,6 +972,11 @@ class MetricEmbeddingRepresentation(
     def toRepresentation(self, mapping):
         return self._simpleVec2Elem(mapping.to_list(channels=self.extra_dims))
 
+    def toRepresentationBatch(self, mappings):
+        return self._simpleVec2ElemBatch(
+            [m.to_list(channels=self.extra_dims) for m in mappings]
+        )
+
     def fromRepresentation(self, mapping):
         simple_vec = self._elem2SimpleVec(mapping)
         if self.ignore_channels:
@@ -819,6 +984,14 @@ class MetricEmbeddingRepresentation(
         mapping_obj = self.list_mapper.generate_mapping(simple_vec)
         return mapping_obj
 
+    def fromRepresentationBatch(self, mappings):
+        simple_vecs = self._elem2SimpleVecBatch(mappings)
+        if self.ignore_channels:
+            simple_vecs = simple_vecs[:, : self._split_d]
+        return [
+            self.list_mapper.generate_mapping(v) for v in simple_vecs.tolist()
+        ]
+
     def _distance(self, x, y):
         return lp.p_norm(x - y, self.p)
 
@@ -831,6 +1004,9 @@ class MetricEmbeddingRepresentation(
         res = np.array(self.approx(x[: (self._d * self._k)])).flatten()
         return res
 
+    def approximateBatch(self, xs):
+        return self._simpleVec2ElemBatch(self._elem2SimpleVecBatch(xs))
+
     def crossover(self, m1, m2, k):
         return self._crossover(
             self.toRepresentation(m1), self.toRepresentation(m2), k
@@ -875,6 +1051,7 @@ class SymmetryEmbeddingRepresentation(
         disable_mpsym=False,
         disable_symmetries_test=False,
         disable_embedding_test=False,
+        canonical_cache_size=65536,
     ):
         self.sym = SymmetryRepresentation(
             graph,
@@ -885,7 +1062,9 @@ class SymmetryEmbeddingRepresentation(
             periodic_boundary_conditions=periodic_boundary_conditions,
             canonical_operations=canonical_operations,
             disable_symmetries_test=disable_symmetries_test,
+            canonical_cache_size=canonical_cache_size,
         )
+        self.canonical_cache = self.sym.canonical_cache
         self.emb = MetricEmbeddingRepresentation(
             graph,
             platform,
@@ -909,9 +1088,16 @@ class SymmetryEmbeddingRepresentation(
         canonical = self.sym._simpleVec2Elem(x)
         return self.emb._simpleVec2Elem(canonical)
 
+    def _simpleVec2ElemBatch(self, xs):
+        canonical = self.sym._simpleVec2ElemBatch(xs)
+        return self.emb._simpleVec2ElemBatch(canonical)
+
     def _elem2SimpleVec(self, x):
         return self.emb._elem2SimpleVec(x)
 
+    def _elem2SimpleVecBatch(self, xs):
+        return self.emb._elem2SimpleVecBatch(xs)
+
     def _uniform(self):
         return self.emb._uniform()
 
@@ -930,12 +1116,19 @@ class SymmetryEmbeddingRepresentation(
         canonical = self.sym.toRepresentation(mapping)
         return self._simpleVec2Elem(canonical)
 
+    def toRepresentationBatch(self, mappings):
+        canonical = self.sym.toRepresentationBatch(mappings)
+        return self.emb._simpleVec2ElemBatch(canonical)
+
     def toRepresentationNoncanonical(self, mapping):
         return self.emb.toRepresentation(mapping)
 
     def fromRepresentation(self, mapping):
         return self.emb.fromRepresentation(mapping)
 
+    def fromRepresentationBatch(self, mappings):
+        return self.emb.fromRepresentationBatch(mappings)
+
     def _distance(self, x, y):
         return lp.p_norm(x - y, self.p)
 
@@ -949,6 +1142,10 @@ class SymmetryEmbeddingRepresentation(
         can = self.sym._simpleVec2Elem(res)
         return self.emb._simpleVec2Elem(can)
 
+    def approximateBatch(self, xs):
+        res = self.emb._elem2SimpleVecBatch(xs)
+        return self._simpleVec2ElemBatch(res)
+
     def crossover(self, m1, m2, k):
         return self.approximate(
             self.emb._crossover(
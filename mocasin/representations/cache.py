@@ -0,0 +1,88 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+from collections import OrderedDict
+
+
+class CanonicalFormCache:
+    """A bounded LRU cache of canonical forms of mapping vectors
+
+    Mappers tend to revisit the same mappings many times. Calculating the
+    canonical representative of the orbit of a mapping is expensive, so this
+    cache stores the most recently used canonical forms. It also counts hits
+    and misses, which are reported in the mapper statistics.
+
+    Args:
+        maxsize (int): maximum number of cached canonical forms. If 0, the
+            cache only counts lookups, but does not store any results.
+    """
+
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        """The ratio of lookups that were answered by the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key, canonicalize):
+        """Get the canonical form of a mapping vector
+
+        Args:
+            key (tuple): the mapping vector
+            canonicalize (callable): a function that calculates the canonical
+                form of `key` if it is not cached
+
+        Returns:
+            tuple: the canonical form of `key`
+        """
+        value = self._entries.get(key)
+        if value is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+        self.misses += 1
+        value = tuple(canonicalize(key))
+        if self.maxsize > 0:
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def lookup_many(self, keys, canonicalize):
+        """Get the canonical forms of multiple mapping vectors
+
+        Each distinct vector is looked up only once. Repeated vectors within
+        `keys` are counted as cache hits.
+
+        Args:
+            keys (list of tuple): the mapping vectors
+            canonicalize (callable): a function that calculates the canonical
+                form of a single vector if it is not cached
+
+        Returns:
+            list of tuple: the canonical forms in the order of `keys`
+        """
+        values = {}
+        result = []
+        for key in keys:
+            value = values.get(key)
+            if value is None:
+                value = values[key] = self.lookup(key, canonicalize)
+            else:
+                self.hits += 1
+            result.append(value)
+        return result
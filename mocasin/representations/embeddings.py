@@ -431,6 +431,45 @@ class MetricSpaceEmbedding(MetricSpaceEmbeddingBase):
         )
         return res
 
+    def approxIndices(self, i_vecs):
+        """Approximate multiple vectors by points of the embedding.
+
+        This is a vectorized version of :meth:`invapprox` for many vectors.
+        The nearest points are calculated in chunks of vectors, such that at
+        most :data:`~mocasin.representations.metric_spaces.MAX_CHUNK_ELEMENTS`
+        distances are held in memory at once.
+
+        Args:
+            i_vecs (numpy.ndarray): an array of shape (N, k * d) with one
+                flattened vector per row
+
+        Returns:
+            numpy.ndarray: an integer array of shape (N, d) with the indices
+                (in M) of the nearest points for each component
+        """
+        vecs = np.asarray(i_vecs, dtype=float)
+        num = vecs.shape[0]
+        vecs = vecs.reshape(num, self._d, self._k)
+        res = np.empty((num, self._d), dtype=int)
+        # processes are approximated by PEs, channels by primitives
+        parts = [
+            (0, self._split_d, 0, self._split_k),
+            (self._split_d, self._d, self._split_k, self.M.n),
+        ]
+        for start, stop, low, high in parts:
+            if start == stop:
+                continue
+            iota = self._f_iota[low:high]
+            per_vector = (stop - start) * iota.size
+            chunk = max(1, metric.MAX_CHUNK_ELEMENTS // max(1, per_vector))
+            for first in range(0, num, chunk):
+                comps = vecs[first : first + chunk, start:stop, None, :]
+                distsq = np.sum((iota - comps) ** 2, axis=-1)
+                res[first : first + chunk, start:stop] = (
+                    np.argmin(distsq, axis=-1) + low
+                )
+        return res
+
     def invapprox(self, vec):
         if type(vec) is list:
             flat_vec = [item for sublist in vec for item in sublist]
@@ -448,39 +487,48 @@ class MetricSpaceEmbedding(MetricSpaceEmbeddingBase):
 
     def uniformFromBall(self, p, r, npoints=1):
         # assumes p is flat (for optimization)
-        vecs = []
-        for _ in range(npoints):
-            v = (
-                np.array(p)
-                + np.array(
-                    r * lp.uniform_from_p_ball(p=self.p, n=self._k * self._d)
-                )
-            ).tolist()
-            vecs.append(self.approx(v))
+        offsets = r * lp.uniform_from_p_ball_batch(
+            p=self.p, n=self._k * self._d, num=npoints
+        )
+        vecs = np.asarray(p, dtype=float).flatten() + offsets
+        return list(self._f_iota[self.approxIndices(vecs)])
+
 
-        return vecs
+def isMetricSpaceMatrix(D, chunk_size=None):
+    """Check whether a matrix is the distance matrix of a metric space.
 
+    The triangle inequality requires O(n**3) comparisons. They are evaluated
+    with NumPy in chunks of intermediate points.
 
-def isMetricSpaceMatrix(D):
+    Args:
+        D (numpy.ndarray): a square matrix
+        chunk_size (int, optional): the number of intermediate points checked
+            at once. By default, the chunks are chosen such that they contain
+            at most ``MAX_CHUNK_ELEMENTS`` elements (see
+            :mod:`mocasin.representations.metric_spaces`).
+    """
     size = D.shape
     n = size[0]
     dimensions = size[0] == size[1]
+    if not dimensions:
+        return False
     # check that matrix is symmetric:
     m = D.transpose() - D
     symmetric = np.allclose(m, np.zeros((n, n)))
     # check that matrix is non-degenerate (and non-negative):
-    nondegenerate = True
-    for i in range(n):
-        for j in range(n):
-            if i == j:
-                nondegenerate = nondegenerate and (D[i, j] == 0)
-            else:
-                nondegenerate = nondegenerate and (D[i, j] > 0)
-    # triangle inequality (which is O(n**3)...)
+    off_diagonal = ~np.eye(n, dtype=bool)
+    nondegenerate = bool(
+        np.all(np.diagonal(D) == 0) and np.all(D[off_diagonal] > 0)
+    )
+    # triangle inequality: D[x, y] + D[y, z] >= D[x, z]
+    if chunk_size is None:
+        chunk_size = max(1, metric.MAX_CHUNK_ELEMENTS // max(1, n * n))
     triangle = True
-    for x in range(n):
-        for y in range(n):
-            for z in range(n):
-                triangle = triangle and (D[x, y] + D[y, z] >= D[x, z])
+    for start in range(0, n, chunk_size):
+        ys = slice(start, min(start + chunk_size, n))
+        paths = D[:, ys].T[:, :, None] + D[ys, :][:, None, :]
+        if not np.all(paths >= D[None, :, :]):
+            triangle = False
+            break
 
     return dimensions and symmetric and nondegenerate and triangle
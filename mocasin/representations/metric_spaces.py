@@ -11,6 +11,10 @@ from numpy.random import randint
 from itertools import product
 from . import permutations as perm
 
+# The maximum number of matrix elements processed at once when populating
+# distance matrices. This bounds the memory required for temporary arrays.
+MAX_CHUNK_ELEMENTS = 2**22
+
 
 class FiniteMetricSpace:
     def __init__(self, matrix):
@@ -115,17 +119,52 @@ class FiniteMetricSpaceLP(FiniteMetricSpace):
                 1 / float(self.p),
             )
 
-    def _populateD(self):
+    def _baseDistances(self):
+        """Returns the distance matrix of the base space M"""
+        if self.M.D is not None:
+            return np.asarray(self.M.D, dtype=float)
+        base = np.zeros((self.M.n, self.M.n))
+        for x, y in product(range(self.M.n), repeat=2):
+            base[x, y] = self.M.dist(x, y)
+        return base
+
+    def _populateD(self, chunk_size=None):
+        """Calculate the distance matrix of the product space
+
+        The matrix is calculated with NumPy in chunks of rows. Each chunk
+        combines the distances of all d components of the tuples at once.
+
+        Args:
+            chunk_size (int, optional): the number of rows calculated at once.
+                By default, the chunks are chosen such that they contain at
+                most :data:`MAX_CHUNK_ELEMENTS` elements.
+        """
         logging.debug("Populating D...")
         stdout.flush()
+        base = self._baseDistances()
+        if self.p <= 100:
+            base = np.power(base, self.p)
+        # digits[i, x] is the i-th component of the tuple with index x
+        points = np.arange(self.n)
+        digits = np.array(
+            [(points // self.M.n**i) % self.M.n for i in range(self.d)]
+        )
+        if chunk_size is None:
+            chunk_size = max(1, MAX_CHUNK_ELEMENTS // max(1, self.n))
         self.D = np.zeros((self.n, self.n))
-        for x, y in product(
-            product(range(self.M.n), repeat=self.d),
-            product(range(self.M.n), repeat=self.d),
-        ):
-            x_l = self.tuple2Int(x)
-            y_l = self.tuple2Int(y)
-            self.D[x_l, y_l] = self._distCalc(x, y)
+        for start in range(0, self.n, chunk_size):
+            stop = min(start + chunk_size, self.n)
+            chunk = self.D[start:stop]
+            for i in range(self.d):
+                component = base[
+                    digits[i, start:stop, None], digits[i, None, :]
+                ]
+                if self.p > 100:
+                    np.maximum(chunk, component, out=chunk)
+                else:
+                    chunk += component
+            if self.p <= 100:
+                np.power(chunk, 1 / float(self.p), out=chunk)
         logging.debug("done.")
 
     def ball(self, p, r):
@@ -26,6 +26,63 @@ def timeit(func):
     return newfunc
 
 
+def _orbit_key(elem, only_support=False):
+    """Returns a hashable key that identifies an element in an orbit"""
+    if only_support:
+        return frozenset(elem)
+    if isinstance(elem, list):
+        return tuple(elem)
+    return elem
+
+
+def _transversal(generators, point):
+    """Calculate the orbit of a point together with a transversal.
+
+    Returns:
+        dict: maps every point `x` in the orbit of `point` to a group element
+            (as a tuple) that maps `point` to `x`
+    """
+    n = len(generators[0])
+    transversal = {point: tuple(range(n))}
+    stack = [point]
+    while stack:
+        x = stack.pop()
+        u = transversal[x]
+        for gen in generators:
+            y = gen[x]
+            if y not in transversal:
+                transversal[y] = tuple(gen[i] for i in u)
+                stack.append(y)
+    return transversal
+
+
+def _sims_filter(perms):
+    """Reduce a list of permutations of n points to at most n(n-1)/2
+    generators of the same group.
+
+    Each kept generator is identified by its first moved point and the image
+    of that point. Elements that collide with a kept generator are divided by
+    it, which moves their first moved point further back.
+    """
+    table = {}
+    for g in perms:
+        n = len(g)
+        i = 0
+        while i < n:
+            if g[i] == i:
+                i += 1
+                continue
+            if (i, g[i]) not in table:
+                inverse = [0] * n
+                for x, y in enumerate(g):
+                    inverse[y] = x
+                table[(i, g[i])] = (g, inverse)
+                break
+            _, inverse = table[(i, g[i])]
+            g = tuple(inverse[y] for y in g)
+    return [g for g, _ in table.values()]
+
+
 # important! permutations start with 0
 class Permutation(list):
     @classmethod
@@ -170,24 +227,21 @@ class PermutationGroup(list):
         If `only_support` is true, then the algorithms generates only the points
         with different support, the set of used elements. Otherwise, it
         generates all points regardless the support.
+
+        The orbit is generated lazily. Visited elements are stored in a set,
+        such that each step takes constant time regardless of the orbit size.
         """
         stack = [point]
-        if only_support:
-            spoint = frozenset(point)
-        else:
-            spoint = point
-        orbit = [spoint]
+        visited = {_orbit_key(point, only_support)}
         yield point
         while stack:
             p = stack.pop()
             for perm in self:
                 im = function(perm, p)
-                sim = im
-                if only_support:
-                    sim = frozenset(im)
-                if sim not in orbit:
+                key = _orbit_key(im, only_support)
+                if key not in visited:
                     stack.append(im)
-                    orbit.append(sim)
+                    visited.add(key)
                     yield im
 
     def point_orbit(self, point):
@@ -218,25 +272,90 @@ class PermutationGroup(list):
             orbs.append(orb)
         return orbs
 
+    def iter_tuple_orbits(self, d=1):
+        """Lazily generate the orbits of the action on tuples of length d.
+
+        The tuples are visited in lexicographic order and an orbit is
+        generated when its lexicographically smallest element is visited.
+        Hence, the first element of each generated orbit is its smallest
+        element. Apart from the orbit currently being generated, no visited
+        tuples are stored.
+        """
+        for p in product(range(self.n), repeat=d):
+            if self.tuple_canonical(p) == list(p):
+                yield list(self.tuple_orbit(list(p)))
+
     def enumerate_tuple_orbits(self, d=1):
-        orbs = []
-        points = set(product(range(self.n), repeat=d))
-        while points:
-            p = points.pop()
-            orb = list(self.tuple_orbit(p))
-            points = points.difference(set(orb))
-            orbs.append(orb)
-        return orbs
+        return list(self.iter_tuple_orbits(d))
+
+    def _stabilizer(self, points):
+        """Calculate generators of the pointwise stabilizer of `points`.
+
+        The stabilizers are calculated with Schreier generators, reduced by
+        the Sims filter, and cached.
+        """
+        if not hasattr(self, "_stabilizers"):
+            self._stabilizers = {
+                frozenset(): _sims_filter([tuple(g) for g in self])
+            }
+        key = frozenset(points)
+        if key not in self._stabilizers:
+            *rest, point = points
+            generators = self._stabilizer(rest)
+            schreier = []
+            if generators:
+                transversal = _transversal(generators, point)
+                for u in transversal.values():
+                    for gen in generators:
+                        v = transversal[gen[u[point]]]
+                        inverse = [0] * len(v)
+                        for i, y in enumerate(v):
+                            inverse[y] = i
+                        schreier.append(tuple(inverse[gen[y]] for y in u))
+            self._stabilizers[key] = _sims_filter(schreier)
+        return self._stabilizers[key]
+
+    def tuple_canonical(self, tup):
+        """Calculate the lexicographically smallest element in the orbit of a
+        tuple.
+
+        In contrast to :meth:`tuple_normalize`, the result is the same for all
+        elements of an orbit. For the action on points, the smallest element
+        is determined greedily, one entry at a time: the entry is replaced by
+        the smallest point in its orbit under the stabilizer of the entries
+        before it. This does not traverse the orbit of the tuple. For other
+        actions, the orbit is traversed.
+        """
+        if self.action != 0:
+            return list(min(self.tuple_orbit(list(tup))))
+        current = list(tup)
+        fixed = []
+        for i in range(len(current)):
+            generators = self._stabilizer(fixed)
+            if not generators:
+                break
+            transversal = _transversal(generators, current[i])
+            u = transversal[min(transversal)]
+            current = [u[x] for x in current]
+            fixed.append(current[i])
+        return current
+
+    def _smaller_images(self, tuples):
+        """Returns all distinct images g(t) < t for t in `tuples`"""
+        images = {}
+        for t in tuples:
+            for g in self:
+                im = g.act(t)
+                if im < t:
+                    images.setdefault(tuple(im), im)
+        return list(images.values())
 
     @timeit
     def tuple_normalize(self, tup, verbose=False, quick=True):
         if verbose:
             log.debug(("normalizing: " + str(tup)))
-        S_x0lt = []  # { g.act(tup) for g in self if g.act(tup) < tup}
-        for g in self:
-            im = g.act(tup)
-            if im not in S_x0lt and im < tup:
-                S_x0lt.append(im)
+        # { g.act(tup) for g in self if g.act(tup) < tup}
+        S_x0lt = self._smaller_images([tup])
         if quick and S_x0lt != []:
             S_x0lt = [min(S_x0lt)]
 
@@ -245,14 +364,8 @@ class PermutationGroup(list):
         iterator = 2
         while Snext_x0lt:
             Scur_x0lt = Snext_x0lt
-            Snext_x0lt = (
-                []
-            )  # [ g.act(t) for t in Scur_x0lt for g in self if g.act(t) < t ]
-            for t in Scur_x0lt:
-                for g in self:
-                    im = g.act(t)
-                    if im not in Snext_x0lt and im < t:
-                        Snext_x0lt.append(im)
+            # [ g.act(t) for t in Scur_x0lt for g in self if g.act(t) < t ]
+            Snext_x0lt = self._smaller_images(Scur_x0lt)
             if verbose and Snext_x0lt:
                 log.debug(
                     "|(S^{"
@@ -101,3 +101,12 @@ class TestEmbeddings(object):
         vec = np.random.rand(d)
         res = _f_emb_approx(vec, d, k, split_d, split_k, iota, n)
         assert res.shape == (d, k)
+
+    def test_approx_indices(self, exampleClusterArch, dimension):
+        M = exampleClusterArch
+        Evec = MetricSpaceEmbedding(M, dimension)
+        vecs = 2 * np.random.random((20, dimension * Evec._k))
+        result = Evec.approxIndices(vecs)
+        assert result.shape == (20, dimension)
+        for vec, indices in zip(vecs, result):
+            assert list(indices) == Evec.invapprox(vec)
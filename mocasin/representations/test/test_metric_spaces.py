@@ -11,6 +11,7 @@ from mocasin.representations.metric_spaces import (
 )
 from mocasin.representations.embeddings import isMetricSpaceMatrix
 import numpy as np
+import pytest
 
 
 class TestMetricSpaces(object):
@@ -210,5 +211,34 @@ class TestMetricSpaces(object):
             expected.remove(m)
         assert len(expected) == 0
 
+    @pytest.mark.parametrize("p", [1, 2, 1000])
+    def test_finiteMetricSpaceLP_populateD(self, exampleClusterArch, p):
+        testProdSpace = FiniteMetricSpaceLP(exampleClusterArch, d=2, p=p)
+        testProdSpace._populateD()
+        D = testProdSpace.D
+        for x in range(testProdSpace.n):
+            for y in range(testProdSpace.n):
+                expected = testProdSpace._distCalc(
+                    testProdSpace.int2Tuple(x), testProdSpace.int2Tuple(y)
+                )
+                assert np.isclose(D[x, y], expected)
+        testProdSpace._populateD(chunk_size=7)
+        assert np.array_equal(testProdSpace.D, D)
+        assert isMetricSpaceMatrix(D)
+        assert isMetricSpaceMatrix(D, chunk_size=5)
+
+    def test_isMetricSpaceMatrix_violations(self):
+        D = np.array([[0, 1, 5], [1, 0, 1], [5, 1, 0]], dtype=float)
+        assert not isMetricSpaceMatrix(D)
+        assert not isMetricSpaceMatrix(D, chunk_size=1)
+        D[0, 2] = D[2, 0] = 2
+        assert isMetricSpaceMatrix(D, chunk_size=1)
+        D[1, 0] = 3
+        assert not isMetricSpaceMatrix(D)
+        D[1, 0] = 1
+        D[1, 1] = 1
+        assert not isMetricSpaceMatrix(D)
+        assert not isMetricSpaceMatrix(np.zeros((2, 3)))
+
 
 # TODO: add tests for the new metric
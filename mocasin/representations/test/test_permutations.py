@@ -3,6 +3,8 @@
 #
 # Authors: Andrés Goens, Felix Teweleit
 
+import random
+
 from mocasin.representations.permutations import (
     Permutation,
     PermutationGroup,
@@ -152,6 +154,50 @@ class TestPermutation(object):
             == 672
         )
 
+    def test_tuple_orbit_support(self):
+        group = SymmetricGroupTranspositions(4)
+        orbit = list(group.tuple_orbit([0, 0, 1], only_support=True))
+        supports = [frozenset(t) for t in orbit]
+        assert len(supports) == len(set(supports)) == 6
+
+    def test_iter_tuple_orbits(self):
+        permutation = Permutation.fromLists([[0, 1, 2], [4, 5]])
+        permutation_group = PermutationGroup([permutation])
+        orbits = list(permutation_group.iter_tuple_orbits(2))
+        points = [p for orb in orbits for p in orb]
+        assert len(points) == len(set(points)) == 36
+        for orb in orbits:
+            assert orb[0] == min(orb)
+        assert orbits == permutation_group.enumerate_tuple_orbits(2)
+
+    def test_tuple_canonical(self):
+        s4xs8 = ProductGroup(
+            [SymmetricGroupTranspositions(8), SymmetricGroupTranspositions(4)]
+        )
+        s4xs8_double = DuplicateGroup(s4xs8)
+        arch_group = ProductGroup([s4xs8_double, TrivialGroup(3)])
+        tup = [1, 10, 1, 9, 7, 1, 1, 1, 22, 25, 24]
+        canonical = arch_group.tuple_canonical(tup)
+        assert canonical == [0, 8, 0, 9, 1, 0, 0, 0, 20, 25, 24]
+        assert canonical <= arch_group.tuple_normalize(tup, quick=False)
+        for elem in list(arch_group.tuple_orbit(tup))[::50]:
+            assert arch_group.tuple_canonical(elem) == canonical
+
+    def test_tuple_canonical_random_groups(self):
+        rand = random.Random(1)
+        for _ in range(10):
+            n = rand.randint(3, 8)
+            perms = []
+            for _ in range(rand.randint(1, 3)):
+                perm = list(range(n))
+                rand.shuffle(perm)
+                perms.append(Permutation(perm))
+            group = PermutationGroup(perms)
+            for _ in range(20):
+                tup = [rand.randrange(n) for _ in range(rand.randint(1, 4))]
+                expected = list(min(group.tuple_orbit(tup)))
+                assert group.tuple_canonical(tup) == expected
+
     def test_tuple_normalize(self):
         s4xs8 = ProductGroup(
             [SymmetricGroupTranspositions(8), SymmetricGroupTranspositions(4)]
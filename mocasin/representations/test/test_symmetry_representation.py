@@ -3,13 +3,23 @@
 #
 # Author: Robert Khasanov
 
+from itertools import product
+
+import numpy as np
 import pytest
 
 from mocasin.common.graph import DataflowChannel, DataflowProcess, DataflowGraph
 from mocasin.mapper.partial import ComFullMapper, ProcPartialMapper
 from mocasin.platforms.odroid import DesignerPlatformOdroid
 from mocasin.platforms.platformDesigner import genericProcessor
-from mocasin.representations import SymmetryRepresentation
+from mocasin.representations import (
+    MappingRepresentation,
+    MetricEmbeddingRepresentation,
+    SimpleVectorRepresentation,
+    SymmetryEmbeddingRepresentation,
+    SymmetryRepresentation,
+)
+from mocasin.representations.cache import CanonicalFormCache
 
 
 @pytest.fixture
@@ -49,3 +59,171 @@ def test_allEquivalent(platform, graph):
     assert (
         len(list(representation.allEquivalent(mapping, only_support=True))) == 6
     )
+
+
+def test_canonical_fallback(platform, graph):
+    representation = SymmetryRepresentation(graph, platform)
+    fallback = SymmetryRepresentation(graph, platform, disable_mpsym=True)
+    for vec in product(range(8), repeat=2):
+        assert list(fallback._canonicalize(vec)) == list(
+            representation._canonicalize(vec)
+        )
+
+
+@pytest.mark.parametrize("disable_mpsym", [False, True])
+def test_canonical_cache(platform, graph, disable_mpsym):
+    com_mapper = ComFullMapper(platform)
+    mapper = ProcPartialMapper(graph, platform, com_mapper)
+    representation = SymmetryRepresentation(
+        graph, platform, disable_mpsym=disable_mpsym, canonical_cache_size=2
+    )
+    cache = representation.canonical_cache
+    cache.clear()
+    mappings = [mapper.generate_mapping(v) for v in [[0, 1], [2, 3], [5, 4]]]
+
+    canonical = representation.toRepresentation(mappings[0])
+    assert representation.toRepresentation(mappings[1]) == canonical
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert representation.toRepresentation(mappings[0]) == canonical
+    assert cache.hits == 1
+
+    batch = representation.toRepresentationBatch(mappings + mappings)
+    expected = [representation.toRepresentation(m) for m in mappings]
+    assert batch.tolist() == expected + expected
+    assert len(cache) == 2
+
+
+def test_canonical_cache_lru():
+    cache = CanonicalFormCache(maxsize=2)
+    calls = []
+
+    def canonicalize(key):
+        calls.append(key)
+        return sorted(key)
+
+    assert cache.lookup((2, 1), canonicalize) == (1, 2)
+    cache.lookup((3, 1), canonicalize)
+    cache.lookup((2, 1), canonicalize)
+    cache.lookup((4, 1), canonicalize)
+    # (3, 1) was least recently used and has been evicted
+    cache.lookup((3, 1), canonicalize)
+    assert calls == [(2, 1), (3, 1), (4, 1), (3, 1)]
+    assert cache.hit_rate == pytest.approx(1 / 5)
+
+    disabled = CanonicalFormCache(maxsize=0)
+    assert disabled.lookup_many([(2, 1), (2, 1)], canonicalize) == [(1, 2)] * 2
+    assert len(disabled) == 0
+    assert (disabled.hits, disabled.misses) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    "representation_type",
+    [
+        SimpleVectorRepresentation,
+        SymmetryRepresentation,
+        MetricEmbeddingRepresentation,
+        SymmetryEmbeddingRepresentation,
+    ],
+)
+def test_batch_conversion(platform, graph, representation_type):
+    com_mapper = ComFullMapper(platform)
+    mapper = ProcPartialMapper(graph, platform, com_mapper)
+    if representation_type in [
+        SimpleVectorRepresentation,
+        SymmetryRepresentation,
+    ]:
+        representation = representation_type(graph, platform)
+    else:
+        representation = representation_type(graph, platform, norm_p=2)
+    mappings = [mapper.generate_mapping([i % 8, (3 * i) % 8]) for i in range(8)]
+
+    points = representation.toRepresentationBatch(mappings)
+    assert points.shape[0] == len(mappings)
+    for point, mapping in zip(points, mappings):
+        assert np.allclose(point, representation.toRepresentation(mapping))
+
+    perturbed = points + np.random.uniform(-0.4, 0.4, points.shape)
+    approx = representation.approximateBatch(perturbed)
+    for point, approximated in zip(perturbed, approx):
+        assert np.allclose(approximated, representation.approximate(point))
+
+    for mapping, point in zip(
+        representation.fromRepresentationBatch(approx), approx
+    ):
+        expected = representation.fromRepresentation(point)
+        assert mapping.to_list() == expected.to_list()
+
+
+def test_cached_instantiation(platform, graph):
+    first = SimpleVectorRepresentation(graph, platform, norm_p=2)
+    second = SimpleVectorRepresentation(graph, platform, norm_p=2)
+    assert first is not second
+    assert first.list_mapper is second.list_mapper
+
+    representation = SymmetryRepresentation(graph, platform)
+    other = SymmetryRepresentation(graph, platform)
+    assert other._G is representation._G
+    assert other.canonical_cache is representation.canonical_cache
+    assert other.list_mapper is representation.list_mapper
+
+    # other parameters require a new instance
+    other = SymmetryRepresentation(graph, platform, canonical_cache_size=1)
+    assert other.canonical_cache is not representation.canonical_cache
+
+    # other objects with the same structure reuse the representation
+    other_platform = DesignerPlatformOdroid(
+        genericProcessor("proc_type_0"), genericProcessor("proc_type_1")
+    )
+    other = SimpleVectorRepresentation(graph, other_platform, norm_p=2)
+    assert other.platform is other_platform
+    assert other.list_mapper.platform is other_platform
+    mapping = other.fromRepresentation([0, 1])
+    assert mapping.platform is other_platform
+
+
+def test_cached_instantiation_fast_path(platform, graph, mocker):
+    representation = SymmetryRepresentation(graph, platform)
+    spy = mocker.spy(MappingRepresentation, "_platform_key")
+
+    # the fingerprints of known objects are looked up
+    other = SymmetryRepresentation(graph, platform)
+    assert other.canonical_cache is representation.canonical_cache
+    assert spy.call_count == 0
+
+    # a platform left at a scaled frequency is structurally the same
+    for processor in platform.processors():
+        processor.frequency = processor.base_frequency // 2
+    other_platform = DesignerPlatformOdroid(
+        genericProcessor("proc_type_0"), genericProcessor("proc_type_1")
+    )
+    for processor in other_platform.processors():
+        processor.frequency = processor.base_frequency // 2
+    other = SymmetryRepresentation(graph, other_platform)
+    assert spy.call_count == 1
+    assert other.canonical_cache is representation.canonical_cache
+
+
+def test_cached_instantiation_structure(platform, graph):
+    representation = SymmetryRepresentation(graph, platform)
+
+    # same names, but different frequencies
+    slow_platform = DesignerPlatformOdroid(
+        genericProcessor("proc_type_0", frequency=100),
+        genericProcessor("proc_type_1", frequency=100),
+    )
+    other = SymmetryRepresentation(graph, slow_platform)
+    assert other.canonical_cache is not representation.canonical_cache
+
+    # same names and frequencies, but different communication costs
+    other_platform = DesignerPlatformOdroid(
+        genericProcessor("proc_type_0"), genericProcessor("proc_type_1")
+    )
+    for resource in other_platform.communication_resources():
+        resource._read_latency += 1000
+    other = SymmetryRepresentation(graph, other_platform)
+    assert other.canonical_cache is not representation.canonical_cache
+    assert MappingRepresentation._instance_key(
+        SymmetryRepresentation, graph, other_platform
+    ) != MappingRepresentation._instance_key(
+        SymmetryRepresentation, graph, platform
+    )
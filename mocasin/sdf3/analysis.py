@@ -0,0 +1,353 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+"""Analytic performance estimation for SDF3 applications.
+
+The execution time of an SDF graph that is mapped to a platform can be
+estimated without a discrete-event simulation. The estimator implemented here
+abstracts each actor to a single node whose execution time is the time
+required for all firings in one graph iteration. This includes the
+computation, the costs of all read and write operations, and an estimate of
+the scheduling overhead. The throughput of the graph is then bounded by
+
+* the load of each processor (all actors mapped to a processor are
+  serialized),
+* the maximum cycle ratio of the graph, where cycles are formed by channels
+  with initial tokens and by the back pressure of channels with a limited
+  capacity.
+
+The execution time of all iterations is estimated as the makespan of the first
+iteration plus one period for each additional iteration. The estimate does
+not consider contention on communication resources or preemption. Thus, it
+may deviate from simulation results. Use
+:class:`~mocasin.mapper.utils.AnalyticSimulationManager` to quantify the
+error against simulation.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from mocasin.sdf3.trace import Sdf3Trace
+from mocasin.util import logging
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class ThroughputEstimate:
+    """The result of an analytic estimation
+
+    All times are given in simulation ticks (ps).
+
+    Attributes:
+        exec_time (float): estimated execution time of all graph iterations
+        period (float): estimated time of one graph iteration in the steady
+            state
+        latency (float): estimated makespan of the first graph iteration
+        lower_bound (float): a lower bound on the execution time, given by the
+            most loaded processor
+        static_energy (float): estimated static energy in pJ or None if the
+            platform has no power model
+        dynamic_energy (float): estimated dynamic energy in pJ or None if the
+            platform has no power model
+    """
+
+    exec_time: float
+    period: float
+    latency: float
+    lower_bound: float
+    static_energy: float = None
+    dynamic_energy: float = None
+
+
+class Sdf3ThroughputEstimator:
+    """Estimates the execution time of mapped SDF3 applications
+
+    The static structure of the graph (repetition vector, rates, initial
+    tokens) is extracted once. Each call to :meth:`estimate` only evaluates the
+    mapping dependent costs. Communication costs are cached for each
+    primitive, processor, and transfer size.
+
+    Args:
+        graph (DataflowGraph): the SDF application
+        trace (Sdf3Trace): the trace of the SDF application
+        platform (Platform): the platform the application is mapped to
+
+    Raises:
+        ValueError: if `trace` is not an :class:`~mocasin.sdf3.trace.Sdf3Trace`
+    """
+
+    def __init__(self, graph, trace, platform):
+        if not isinstance(trace, Sdf3Trace):
+            raise ValueError(
+                "The analytic estimation requires an Sdf3Trace "
+                f"(got {type(trace).__name__})"
+            )
+        self.graph = graph
+        self.platform = platform
+        self._repetitions = trace.repetitions
+
+        repetition_vector = trace.get_repetition_vector()
+        self._actors = sorted(p.name for p in graph.processes())
+        self._index = {a: i for i, a in enumerate(self._actors)}
+        self._processes = [graph.find_process(a) for a in self._actors]
+        self._firings = np.array(
+            [repetition_vector[a] for a in self._actors], dtype=float
+        )
+        self._cycles = [trace.get_processor_cycles(a) for a in self._actors]
+
+        # the channels read and written by each actor in each firing
+        self._reads = [[] for _ in self._actors]
+        self._writes = [[] for _ in self._actors]
+        self._initial_writes = [[] for _ in self._actors]
+
+        # channel properties as tuples of
+        # (channel, src index, sink index, production rate, consumption rate,
+        # initial tokens)
+        self._channels = []
+        for channel in sorted(graph.channels(), key=lambda c: c.name):
+            src = channel.source.name
+            sink = channel.sinks[0].name
+            src_rule = trace.get_firing_rule(src)
+            sink_rule = trace.get_firing_rule(sink)
+            produced = src_rule.writes[channel.name]
+            consumed = sink_rule.reads[channel.name]
+            initial = src_rule.initial_writes.get(channel.name, 0)
+            self._channels.append(
+                (
+                    channel,
+                    self._index[src],
+                    self._index[sink],
+                    produced,
+                    consumed,
+                    initial,
+                )
+            )
+            self._writes[self._index[src]].append(
+                (channel, produced * channel.token_size)
+            )
+            self._reads[self._index[sink]].append(
+                (channel, consumed * channel.token_size)
+            )
+            if initial > 0:
+                self._initial_writes[self._index[src]].append(
+                    (channel, initial * channel.token_size)
+                )
+
+        self._costs = {}
+
+    def _phase_costs(self, phases, size):
+        # the costs depend on the current frequencies of the phases' resources
+        frequencies = tuple(
+            r.frequency_domain.frequency for ph in phases for r in ph.resources
+        )
+        key = (id(phases), size, frequencies)
+        costs = self._costs.get(key)
+        if costs is None:
+            costs = sum(ph.get_costs(size) for ph in phases)
+            # keep a reference to the phases, such that the id stays valid
+            self._costs[key] = costs = (costs, phases)
+        return costs[0]
+
+    def _consume_costs(self, primitive, processor, size):
+        return self._phase_costs(primitive.consume_phases[processor.name], size)
+
+    def _produce_costs(self, primitive, processor, size):
+        return self._phase_costs(primitive.produce_phases[processor.name], size)
+
+    def estimate(self, mapping):
+        """Estimate the execution time and energy of a mapping
+
+        Args:
+            mapping (Mapping): a complete mapping of the application
+
+        Returns:
+            ThroughputEstimate: the estimate. The execution time is infinite
+                if the mapping deadlocks.
+        """
+        num_actors = len(self._actors)
+        processors = []
+        firing_times = np.zeros(num_actors)
+        setup_times = np.zeros(num_actors)
+        processes_per_processor = {}
+
+        infos = [mapping.process_info(p) for p in self._processes]
+        for i, info in enumerate(infos):
+            processors.append(info.affinity)
+            processes_per_processor.setdefault(info.affinity, []).append(i)
+
+        for i, info in enumerate(infos):
+            pe = processors[i]
+            time = pe.ticks(self._cycles[i][pe.type])
+            for channel, size in self._reads[i]:
+                primitive = mapping.primitive(channel)
+                time += self._consume_costs(primitive, pe, size)
+            for channel, size in self._writes[i]:
+                primitive = mapping.primitive(channel)
+                time += self._produce_costs(primitive, pe, size)
+            for channel, size in self._initial_writes[i]:
+                primitive = mapping.primitive(channel)
+                setup_times[i] += self._produce_costs(primitive, pe, size)
+
+            # If multiple processes share a processor, we assume a context
+            # switch for each firing.
+            if len(processes_per_processor[pe]) > 1:
+                policy = info.scheduler.policy
+                scheduling_cycles = getattr(policy, "scheduling_cycles", None)
+                time += pe.context_load_ticks() + pe.context_store_ticks()
+                if scheduling_cycles:
+                    time += pe.ticks(scheduling_cycles)
+            firing_times[i] = time
+
+        # time required for all firings of one iteration
+        iteration_times = self._firings * firing_times
+
+        busy_times = {
+            pe: float(np.sum(iteration_times[idx]))
+            for pe, idx in processes_per_processor.items()
+        }
+        max_load = max(busy_times.values())
+
+        # build the graph for the cycle ratio analysis
+        src = []
+        dst = []
+        delays = []
+        for channel, u, v, produced, consumed, initial in self._channels:
+            capacity = mapping.capacity(channel)
+            if produced > capacity or consumed > capacity or initial > capacity:
+                log.debug(
+                    f"channel {channel.name} is too small -> mapping deadlocks"
+                )
+                return self._deadlock()
+            tokens_per_iteration = produced * self._firings[u]
+            # data dependency
+            src.append(u)
+            dst.append(v)
+            delays.append(initial / tokens_per_iteration)
+            # back pressure of the limited capacity
+            src.append(v)
+            dst.append(u)
+            delays.append((capacity - initial) / tokens_per_iteration)
+        src = np.array(src, dtype=int)
+        dst = np.array(dst, dtype=int)
+        delays = np.array(delays)
+        weights = iteration_times[src]
+
+        latency = _longest_zero_delay_path(
+            num_actors, src, dst, delays, iteration_times, setup_times
+        )
+        if latency is None:
+            return self._deadlock()
+        cycle_ratio = _max_cycle_ratio(num_actors, src, dst, weights, delays)
+
+        period = max(cycle_ratio, max_load, float(np.max(iteration_times)))
+        lower_bound = self._repetitions * max_load
+        exec_time = max(latency + (self._repetitions - 1) * period, lower_bound)
+
+        static_energy = None
+        dynamic_energy = None
+        if self.platform.has_power_model():
+            static_power = sum(
+                pe.static_power() or 0 for pe in self.platform.processors()
+            )
+            static_power += self.platform.peripheral_static_power or 0
+            static_energy = static_power * exec_time
+            dynamic_energy = sum(
+                (pe.dynamic_power() or 0) * busy * self._repetitions
+                for pe, busy in busy_times.items()
+            )
+
+        return ThroughputEstimate(
+            exec_time=exec_time,
+            period=period,
+            latency=latency,
+            lower_bound=lower_bound,
+            static_energy=static_energy,
+            dynamic_energy=dynamic_energy,
+        )
+
+    def _deadlock(self):
+        inf = float("inf")
+        return ThroughputEstimate(
+            exec_time=inf, period=inf, latency=inf, lower_bound=inf
+        )
+
+
+def _longest_zero_delay_path(num_nodes, src, dst, delays, weights, offsets):
+    """Calculate the makespan of one iteration
+
+    Only edges without delay constrain the first iteration. The makespan is
+    the longest path through these edges, where each node contributes its
+    weight.
+
+    Returns:
+        float: the length of the longest path or None if the edges without
+            delay form a cycle (i.e., the graph deadlocks)
+    """
+    zero = delays == 0
+    src = src[zero]
+    dst = dst[zero]
+    in_degree = np.bincount(dst, minlength=num_nodes)
+    successors = [[] for _ in range(num_nodes)]
+    for u, v in zip(src.tolist(), dst.tolist()):
+        successors[u].append(v)
+
+    start = np.array(offsets, dtype=float)
+    finish = np.zeros(num_nodes)
+    ready = [n for n in range(num_nodes) if in_degree[n] == 0]
+    visited = 0
+    while ready:
+        u = ready.pop()
+        visited += 1
+        finish[u] = start[u] + weights[u]
+        for v in successors[u]:
+            start[v] = max(start[v], finish[u])
+            in_degree[v] -= 1
+            if in_degree[v] == 0:
+                ready.append(v)
+    if visited != num_nodes:
+        return None
+    return float(np.max(finish)) if num_nodes > 0 else 0.0
+
+
+def _has_positive_cycle(num_nodes, src, dst, values):
+    """Check for a cycle with a positive sum of edge values (Bellman-Ford)"""
+    dist = np.zeros(num_nodes)
+    for _ in range(num_nodes):
+        candidates = dist[src] + values
+        new_dist = dist.copy()
+        np.maximum.at(new_dist, dst, candidates)
+        if np.all(new_dist <= dist + 1e-9 * np.maximum(1.0, np.abs(dist))):
+            return False
+        dist = new_dist
+    return True
+
+
+def _max_cycle_ratio(num_nodes, src, dst, weights, delays, rtol=1e-6):
+    """Calculate the maximum ratio of weights to delays over all cycles
+
+    The ratio is determined by bisection. For a given ratio `r`, there is a
+    cycle with a larger ratio if and only if the graph with the edge values
+    ``weights - r * delays`` contains a positive cycle.
+
+    Note that cycles without any delay are not considered. These need to be
+    detected separately.
+
+    Returns:
+        float: the maximum cycle ratio
+    """
+    if len(src) == 0:
+        return 0.0
+    positive_delays = delays[delays > 0]
+    if len(positive_delays) == 0:
+        return 0.0
+    high = np.sum(weights) / np.min(positive_delays)
+    low = 0.0
+    while high - low > rtol * high:
+        mid = (low + high) / 2
+        if _has_positive_cycle(num_nodes, src, dst, weights - mid * delays):
+            low = mid
+        else:
+            high = mid
+    return high
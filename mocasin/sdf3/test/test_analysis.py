@@ -0,0 +1,152 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+import math
+
+import pytest
+
+from mocasin.mapper.genetic import GeneticMapper
+from mocasin.mapper.random import RandomPartialMapper
+from mocasin.mapper.utils import (
+    AnalyticSimulationManager,
+    SimulationManager,
+    create_simulation_manager,
+)
+from mocasin.platforms.odroid import DesignerPlatformOdroid
+from mocasin.platforms.platformDesigner import genericProcessor
+from mocasin.representations import SimpleVectorRepresentation
+from mocasin.sdf3.analysis import Sdf3ThroughputEstimator
+from mocasin.sdf3.app import Sdf3Graph
+from mocasin.sdf3.trace import Sdf3Trace
+
+PROCESSOR_TYPES = {
+    "ARM_CORTEX_A7": {
+        "sdf3_type": "proc_0",
+        "frequency": "1400 MHz",
+        "scale": "2.0 us",
+    },
+    "ARM_CORTEX_A15": {
+        "sdf3_type": "proc_0",
+        "frequency": "2000 MHz",
+        "scale": "1.0 us",
+    },
+}
+
+
+@pytest.fixture(params=["small_cyclic", "small_acyclic"])
+def sdf3_file(request):
+    return f"examples/sdf3/{request.param}.xml"
+
+
+@pytest.fixture
+def graph(sdf3_file):
+    return Sdf3Graph(sdf3_file)
+
+
+@pytest.fixture
+def trace(sdf3_file):
+    return Sdf3Trace(sdf3_file, PROCESSOR_TYPES, repetitions=5)
+
+
+@pytest.fixture
+def platform():
+    pe_little = genericProcessor("ARM_CORTEX_A7")
+    pe_big = genericProcessor("ARM_CORTEX_A15")
+    return DesignerPlatformOdroid(pe_little, pe_big)
+
+
+@pytest.fixture
+def mappings(graph, platform):
+    mapper = RandomPartialMapper(platform, seed=42)
+    return [mapper.generate_mapping(graph) for _ in range(10)]
+
+
+def test_repetition_vector(graph, trace):
+    repetition_vector = trace.get_repetition_vector()
+    assert set(repetition_vector) == set(p.name for p in graph.processes())
+    for channel in graph.channels():
+        src = channel.source.name
+        sink = channel.sinks[0].name
+        produced = trace.get_firing_rule(src).writes[channel.name]
+        consumed = trace.get_firing_rule(sink).reads[channel.name]
+        assert (
+            repetition_vector[src] * produced
+            == repetition_vector[sink] * consumed
+        )
+
+
+def test_estimate_bounds(graph, trace, platform, mappings):
+    estimator = Sdf3ThroughputEstimator(graph, trace, platform)
+    for mapping in mappings:
+        estimate = estimator.estimate(mapping)
+        assert estimate.exec_time >= estimate.lower_bound > 0
+        assert estimate.exec_time >= estimate.latency
+        assert estimate.period > 0
+
+
+def test_estimate_frequency_change(graph, trace, platform, mappings):
+    estimator = Sdf3ThroughputEstimator(graph, trace, platform)
+    for mapping in mappings:
+        estimator.estimate(mapping)
+    for resource in platform.communication_resources():
+        domain = resource.frequency_domain
+        domain.frequency = domain.base_frequency // 2
+    # the cached communication costs are not reused at other frequencies
+    fresh_estimator = Sdf3ThroughputEstimator(graph, trace, platform)
+    for mapping in mappings:
+        assert (
+            estimator.estimate(mapping).exec_time
+            == fresh_estimator.estimate(mapping).exec_time
+        )
+
+
+def test_estimate_deadlock(graph, trace, platform, mappings):
+    estimator = Sdf3ThroughputEstimator(graph, trace, platform)
+    mapping = mappings[0]
+    for channel in graph.channels():
+        mapping.channel_info(channel).capacity = 0
+    assert math.isinf(estimator.estimate(mapping).exec_time)
+
+
+def test_estimator_requires_sdf3_trace(graph, platform):
+    with pytest.raises(ValueError):
+        Sdf3ThroughputEstimator(graph, object(), platform)
+
+
+def test_analytic_simulation_manager(graph, trace, platform, mappings):
+    representation = SimpleVectorRepresentation(graph, platform)
+    manager = AnalyticSimulationManager(platform)
+    estimates = manager.simulate(graph, trace, representation, mappings)
+    simulated = SimulationManager(platform).simulate(
+        graph, trace, representation, mappings
+    )
+    for est, sim in zip(estimates, simulated):
+        assert est.exec_time == pytest.approx(sim.exec_time, rel=0.5)
+    assert manager.statistics._mappings_evaluated == len(
+        set(tuple(representation.toRepresentation(m)) for m in mappings)
+    )
+
+    with pytest.raises(RuntimeError):
+        manager.exec_time_bounds(estimates[0])
+    bounds = manager.calibrate(graph, trace, representation, mappings)
+    assert bounds.lower <= bounds.mean <= bounds.upper
+    assert bounds.samples == len(mappings)
+    for est, sim in zip(estimates, simulated):
+        low, high = manager.exec_time_bounds(est)
+        assert low <= sim.exec_time * (1 + 1e-9)
+        assert high >= sim.exec_time * (1 - 1e-9)
+
+
+def test_analytic_mapper(graph, trace, platform):
+    representation = SimpleVectorRepresentation(graph, platform)
+    mapper = GeneticMapper(
+        platform, parallel=False, simulation_manager="analytic"
+    )
+    assert isinstance(mapper._simulation_manager, AnalyticSimulationManager)
+    mapping = mapper.generate_mapping(
+        graph, trace=trace, representation=representation
+    )
+    assert mapping.get_numProcs() > 0
+
+    with pytest.raises(ValueError):
+        create_simulation_manager("unknown", platform)
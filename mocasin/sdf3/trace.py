@@ -278,6 +278,45 @@ class Sdf3Trace(DataflowTrace):
                 )
             self._actor_processor_cycles[actor.name] = proc_cycles
 
+    @property
+    def repetitions(self):
+        """int: how many times the entire SDF graph is executed"""
+        return self._repetitions
+
+    def get_repetition_vector(self):
+        """Get the repetition vector of the SDF graph
+
+        Returns:
+            dict(str, int): number of firings of each actor in one iteration
+                of the graph
+        """
+        return dict(self._repetition_vector)
+
+    def get_firing_rule(self, process):
+        """Get the firing rule of an actor
+
+        Args:
+            process (str): Name of the actor
+
+        Returns:
+            _SdfFiringRule: an object with the attributes `reads`, `writes`,
+                and `initial_writes`, each mapping channel names to token
+                counts
+        """
+        return self._firing_rules[process]
+
+    def get_processor_cycles(self, process):
+        """Get the cycles of a single firing of an actor
+
+        Args:
+            process (str): Name of the actor
+
+        Returns:
+            dict(str, int): A mapping of processor types to the respective
+                number of computation cycles
+        """
+        return self._actor_processor_cycles[process]
+
     def get_trace(self, process):
         """Get the trace for a specific actor in the SDF3 application
 
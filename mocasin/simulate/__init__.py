@@ -4,6 +4,7 @@
 # Authors: Christian Menard
 
 from dataclasses import dataclass
+from time import process_time
 
 import hydra
 import simpy
@@ -20,11 +21,15 @@ class SimulationResult:
         exec_time (float): total simulated time in ps.
         static_energy (float): static energy consumption in pJ.
         dynamic_energy (float): dynamic energy consumption in pJ.
+        censored (bool): True if the simulation was aborted because it
+            exceeded its budget. In this case, ``exec_time`` and the energy
+            values are only lower bounds of the actual values.
     """
 
     exec_time: float
     static_energy: float
     dynamic_energy: float
+    censored: bool = False
 
     @property
     def total_energy(self) -> float:
@@ -144,8 +149,21 @@ class DataflowSimulation(BaseSimulation):
         wait_for_initial_tokens (bool): If true, the application's processes
             only start if initial tokens (first reads in the trace) are
             available. Otherwise, they would start and immediately block.
+        fast_path (bool): If true, the runtime processes use a low-overhead
+            implementation of their state machine (see
+            :class:`~mocasin.simulate.process.RuntimeProcess`). The
+            simulation results are identical in both modes.
+        time_budget (float): If set, the simulation is aborted as soon as the
+            simulated time exceeds this budget (in ps). The result of an
+            aborted simulation is marked as censored.
+        wall_time_budget (float): If set, the simulation is aborted after the
+            given amount of processor time (in seconds). The result of an
+            aborted simulation is marked as censored.
     """
 
+    # number of simulation steps between two checks of the wall time budget
+    _WALL_TIME_CHECK_INTERVAL = 1000
+
     def __init__(
         self,
         platform,
@@ -153,6 +171,9 @@ class DataflowSimulation(BaseSimulation):
         mapping,
         app_trace,
         wait_for_initial_tokens=False,
+        fast_path=False,
+        time_budget=None,
+        wall_time_budget=None,
     ):
         super().__init__(platform)
         self.graph = graph
@@ -160,6 +181,9 @@ class DataflowSimulation(BaseSimulation):
         self.app_trace = app_trace
         self.app = None
         self._wait_for_initial_tokens = wait_for_initial_tokens
+        self._fast_path = fast_path
+        self.time_budget = time_budget
+        self.wall_time_budget = wall_time_budget
 
     def __enter__(self):
         """Setup the simulation
@@ -168,6 +192,7 @@ class DataflowSimulation(BaseSimulation):
         ``app``
         """
         super().__enter__()
+        self.system.fast_path = self._fast_path
         self.app = RuntimeDataflowApplication(
             name=self.graph.name,
             graph=self.graph,
@@ -197,13 +222,25 @@ class DataflowSimulation(BaseSimulation):
         self.system.start_schedulers()
         # start the application
         finished = self.env.process(self.app.run(self.mapping))
-        # run the actual simulation until the application finishes
-        self.env.run(finished)
+        # run the actual simulation until the application finishes or the
+        # budget is exceeded
+        stop = finished
+        if self.time_budget is not None:
+            stop = finished | self.env.timeout(self.time_budget)
+        if self.wall_time_budget is None:
+            self.env.run(stop)
+        else:
+            self._run_with_wall_time_budget(stop)
+        censored = not finished.triggered
         # check if all graph processes finished execution
-        self.system.check_errors()
+        if not censored:
+            self.system.check_errors()
         # save the execution time
         self.result = SimulationResult(
-            exec_time=self.env.now, static_energy=None, dynamic_energy=None
+            exec_time=self.env.now,
+            static_energy=None,
+            dynamic_energy=None,
+            censored=censored,
         )
 
         energy = self.system.calculate_energy()
@@ -213,6 +250,23 @@ class DataflowSimulation(BaseSimulation):
             self.result.static_energy = static_energy
             self.result.dynamic_energy = dynamic_energy
 
+    def _run_with_wall_time_budget(self, stop):
+        """Run the simulation until `stop` triggers or the budget is spent."""
+        deadline = process_time() + self.wall_time_budget
+        env = self.env
+        steps = 0
+        while not stop.triggered:
+            if env.peek() == simpy.core.Infinity:
+                raise RuntimeError(
+                    "No scheduled events left but the application did not "
+                    "finish"
+                )
+            env.step()
+            steps += 1
+            if steps % self._WALL_TIME_CHECK_INTERVAL == 0:
+                if process_time() > deadline:
+                    break
+
     @staticmethod
     def from_hydra(cfg, wait_for_initial_tokens):
         """Factory method.
@@ -16,6 +16,56 @@ from mocasin.simulate.process import ProcessState
 log = logging.getLogger(__name__)
 
 
+class _CostSchedule:
+    """The communication costs of a list of communication phases.
+
+    Stores the phases of a primitive for a single producer or consumer
+    together with the resources that need to be acquired in each phase. The
+    costs of a phase are calculated once for each number of tokens
+    transferred and each combination of frequencies of the phase's resources,
+    and then looked up.
+
+    Args:
+        phases (list[CommunicationPhase]): the communication phases
+        token_size (int): size of one data token in bytes
+    """
+
+    __slots__ = ("phases", "_token_size", "_domains", "_ticks")
+
+    def __init__(self, phases, token_size):
+        # pairs of a phase and the resources that need to be requested
+        self.phases = [
+            (
+                phase,
+                [r for r in phase.resources if hasattr(r, "simpy_resource")],
+            )
+            for phase in phases
+        ]
+        self._token_size = token_size
+        # the frequency domains the costs of each phase depend on
+        self._domains = [
+            [r.frequency_domain for r in phase.resources] for phase in phases
+        ]
+        self._ticks = [{} for _ in phases]
+
+    def ticks(self, index, num):
+        """Get the costs of a phase when transferring `num` tokens.
+
+        Args:
+            index (int): the index of the phase in :attr:`phases`
+            num (int): number of tokens to be transferred
+        Returns:
+            int: the costs of the phase in ticks at the current frequencies
+        """
+        key = (num, tuple(d.frequency for d in self._domains[index]))
+        ticks = self._ticks[index].get(key)
+        if ticks is None:
+            phase = self.phases[index][0]
+            ticks = phase.get_costs(num * self._token_size)
+            self._ticks[index][key] = ticks
+        return ticks
+
+
 class RuntimeChannel(object):
     """Represents the runtime instance of a dataflow channel.
 
@@ -40,6 +90,12 @@ class RuntimeChannel(object):
         _capacity (int): maximum number of tokens that can be stored in a FIFO
         _primitive (Primitive): The communication primitive this channel is
             mmapped to
+        _consume_costs (dict[str, _CostSchedule]): cost schedules for
+            consuming tokens with :attr:`_primitive` on the processor of the
+            given name
+        _produce_costs (dict[str, _CostSchedule]): cost schedules for
+            producing tokens with :attr:`_primitive` on the processor of the
+            given name
 
     Args:
         name (str): the channel name
@@ -62,6 +118,8 @@ class RuntimeChannel(object):
         self._capacity = None
         self._primitive = None
         self._token_size = token_size
+        self._consume_costs = {}
+        self._produce_costs = {}
 
         self.tokens_produced = self.env.event()
         self.tokens_consumed = self.env.event()
@@ -251,6 +309,8 @@ class RuntimeChannel(object):
         Models the consume operation according to the associated primitive
         (:attr:`_primitive`). It iterates over all communication phases and
         pays for the communication costs as calculated by the phase object.
+        The costs are calculated only once for each sink processor and number
+        of tokens and then looked up.
         For each phase, it also iterates over all resources and checks for the
         ``simpy_resource`` attribute. If present, the resource is requested at
         the start of the phase and released at its end.
@@ -290,31 +350,31 @@ class RuntimeChannel(object):
                 % (sink.name, prim.name)
             )
 
-        for phase in prim.consume_phases[sink.name]:
+        schedule = self._consume_costs.get(sink.name)
+        if schedule is None:
+            schedule = _CostSchedule(
+                prim.consume_phases[sink.name], self._token_size
+            )
+            self._consume_costs[sink.name] = schedule
+
+        for i, (phase, resources) in enumerate(schedule.phases):
             log.debug('start communication phase "%s"', phase.name)
 
             # 1. request all resouces
             requests = []
-            for r in phase.resources:
-                log.debug("via resource: %s", r.name)
-                if hasattr(r, "simpy_resource"):
-                    req = r.simpy_resource.request()
-                    requests.append(req)
-                    log.debug("request resource %s", r.name)
-                    yield req
-                else:
-                    requests.append(None)
+            for r in resources:
+                req = r.simpy_resource.request()
+                requests.append(req)
+                log.debug("request resource %s", r.name)
+                yield req
 
             # pay for the delay
-            size = num * self._token_size
-            ticks = phase.get_costs(size)
-            yield self.env.timeout(ticks)
+            yield self.env.timeout(schedule.ticks(i, num))
 
             # release all resources that we requested before
-            for res, req in zip(phase.resources, requests):
-                if req is not None:
-                    log.debug("release resource %s", r.name)
-                    res.simpy_resource.release(req)
+            for r, req in zip(resources, requests):
+                log.debug("release resource %s", r.name)
+                r.simpy_resource.release(req)
 
             log.debug("communication phase completed")
 
@@ -343,6 +403,8 @@ class RuntimeChannel(object):
         Models the produce operation according to the associated primitive
         (:attr:`_primitive`). It iterates over all communication phases and
         pays for the communication costs as calculated by the phase object.
+        The costs are calculated only once for each source processor and
+        number of tokens and then looked up.
         For each phase, it also iterates over all resources and checks for the
         ``simpy_resource`` attribute. If present, the resource is requested at
         the start of the phase and released at its end.
@@ -382,31 +444,31 @@ class RuntimeChannel(object):
                 % (src.name, prim.name)
             )
 
-        for phase in prim.produce_phases[src.name]:
+        schedule = self._produce_costs.get(src.name)
+        if schedule is None:
+            schedule = _CostSchedule(
+                prim.produce_phases[src.name], self._token_size
+            )
+            self._produce_costs[src.name] = schedule
+
+        for i, (phase, resources) in enumerate(schedule.phases):
             log.debug('start communication phase "%s"', phase.name)
 
             # 1. request all resouces
             requests = []
-            for r in phase.resources:
-                log.debug("via resource: %s", r.name)
-                if hasattr(r, "simpy_resource"):
-                    req = r.simpy_resource.request()
-                    requests.append(req)
-                    log.debug("request resource %s", r.name)
-                    yield req
-                else:
-                    requests.append(None)
+            for r in resources:
+                req = r.simpy_resource.request()
+                requests.append(req)
+                log.debug("request resource %s", r.name)
+                yield req
 
             # pay for the delay
-            size = num * self._token_size
-            ticks = phase.get_costs(size)
-            yield self.env.timeout(ticks)
+            yield self.env.timeout(schedule.ticks(i, num))
 
             # release all resources that we requested before
-            for res, req in zip(phase.resources, requests):
-                if req is not None:
-                    log.debug("release resource %s", r.name)
-                    res.simpy_resource.release(req)
+            for r, req in zip(resources, requests):
+                log.debug("release resource %s", r.name)
+                r.simpy_resource.release(req)
 
             log.debug("communication phase completed")
 
@@ -447,3 +509,6 @@ class RuntimeChannel(object):
             )
 
         self._primitive = mapping_info.primitive
+        # the cost schedules are recreated for the new primitive on first use
+        self._consume_costs = {}
+        self._produce_costs = {}
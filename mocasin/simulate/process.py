@@ -17,7 +17,7 @@ import logging
 import more_itertools
 import weakref
 
-from mocasin.common.trace import SegmentType
+from mocasin.common.trace import CompiledTrace, SegmentType
 from mocasin.simulate.adapter import SimulateLoggerAdapter
 
 log = logging.getLogger(__name__)
@@ -52,6 +52,18 @@ class InterruptSource(enum.Enum):
         due to a change in the number of running threads"""
 
 
+# Precomputed tables for the process state machine. States are looked up by
+# name and the entry action of each state is indexed by the state value.
+_PROCESS_STATES = dict(ProcessState.__members__)
+_STATE_CALLBACKS = {
+    ProcessState.CREATED.value: "_cb_created",
+    ProcessState.READY.value: "_cb_ready",
+    ProcessState.RUNNING.value: "_cb_running",
+    ProcessState.BLOCKED.value: "_cb_blocked",
+    ProcessState.FINISHED.value: "_cb_finished",
+}
+
+
 class RuntimeProcess(object):
     """Runtime instance of a process.
 
@@ -97,6 +109,14 @@ class RuntimeProcess(object):
           * :func:`unblock`: Transition from :const:`~ProcessState.BLOCKED` to
             :const:`~ProcessState.READY`
 
+    **Fast Path:**
+        If the fast path mode of the system is enabled
+        (:attr:`RuntimeSystem.fast_path`), the state events are only created
+        when they are accessed (e.g., to register a callback), the entry
+        actions are not registered, and debug messages are only generated if
+        debug logging is enabled. This reduces the overhead of each state
+        transition without changing the simulation results.
+
     Note:
         This class should never be instantiated directly. Instead a subclass
         that overrides :func:`workload` should be defined.
@@ -132,18 +152,18 @@ class RuntimeProcess(object):
         self._state = ProcessState.CREATED
         self.processor = None
         self._log = SimulateLoggerAdapter(log, self.full_name, self.env)
+        self._fast_path = app.system.fast_path
+        self._log_enabled = not self._fast_path or log.isEnabledFor(
+            logging.DEBUG
+        )
 
-        # setup the events
-        self.created = self.env.event()
-        self.created.callbacks.append(self._cb_created)
-        self.ready = self.env.event()
-        self.ready.callbacks.append(self._cb_ready)
-        self.running = self.env.event()
-        self.running.callbacks.append(self._cb_running)
-        self.finished = self.env.event()
-        self.finished.callbacks.append(self._cb_finished)
-        self.blocked = self.env.event()
-        self.blocked.callbacks.append(self._cb_blocked)
+        # setup the events (indexed by the state value)
+        if self._fast_path:
+            self._events = [None] * len(_STATE_CALLBACKS)
+        else:
+            self._events = [
+                self._new_state_event(i) for i in range(len(_STATE_CALLBACKS))
+            ]
 
         # internal event for interrupts
         self._interrupt = self.env.event()
@@ -177,6 +197,44 @@ class RuntimeProcess(object):
         """Return the application this process belongs to."""
         return self._app()
 
+    def _new_state_event(self, index):
+        event = self.env.event()
+        event.callbacks.append(getattr(self, _STATE_CALLBACKS[index]))
+        return event
+
+    def _state_event(self, state):
+        event = self._events[state.value]
+        if event is None:
+            # fast path: the event is only created on demand
+            event = self.env.event()
+            self._events[state.value] = event
+        return event
+
+    @property
+    def created(self):
+        """~simpy.events.Event: triggers on entering the CREATED state"""
+        return self._state_event(ProcessState.CREATED)
+
+    @property
+    def ready(self):
+        """~simpy.events.Event: triggers on entering the READY state"""
+        return self._state_event(ProcessState.READY)
+
+    @property
+    def running(self):
+        """~simpy.events.Event: triggers on entering the RUNNING state"""
+        return self._state_event(ProcessState.RUNNING)
+
+    @property
+    def blocked(self):
+        """~simpy.events.Event: triggers on entering the BLOCKED state"""
+        return self._state_event(ProcessState.BLOCKED)
+
+    @property
+    def finished(self):
+        """~simpy.events.Event: triggers on entering the FINISHED state"""
+        return self._state_event(ProcessState.FINISHED)
+
     def _transition(self, state_name):
         """Helper function for convenient state transitions.
 
@@ -186,16 +244,12 @@ class RuntimeProcess(object):
         Args:
             state_name(str): name of the state to be transitioned to
         """
-        if not hasattr(ProcessState, state_name):
+        state = _PROCESS_STATES.get(state_name)
+        if state is None:
             raise RuntimeError(
                 "Tried to transition to an invalid state (%s)" % (state_name)
             )
 
-        event_name = state_name.lower()
-        cb_name = "_cb_" + state_name.lower()
-        assert hasattr(self, event_name)
-        assert hasattr(self, cb_name)
-
         # record the transition in the simulation trace
         if self.app.system.app_trace_enabled:
             self.trace_writer.end_duration(
@@ -206,14 +260,18 @@ class RuntimeProcess(object):
             )
 
         # update the state
-        self._state = getattr(ProcessState, state_name)
-
-        old_event = getattr(self, event_name)
-        old_event.succeed(self)
-
-        new_event = self.env.event()
-        new_event.callbacks.append(getattr(self, "_cb_" + event_name))
-        setattr(self, event_name, new_event)
+        self._state = state
+
+        index = state.value
+        old_event = self._events[index]
+        if self._fast_path:
+            # only trigger the event if it was requested by someone
+            if old_event is not None:
+                self._events[index] = None
+                old_event.succeed(self)
+        else:
+            old_event.succeed(self)
+            self._events[index] = self._new_state_event(index)
 
     def check_state(self, state):
         """Compare to internal state
@@ -239,7 +297,8 @@ class RuntimeProcess(object):
             AssertionError: if not in :const:`ProcessState.CREATED` state
         """
         assert self._state == ProcessState.CREATED
-        self._log.debug("Process starts.")
+        if self._log_enabled:
+            self._log.debug("Process starts.")
         self.processor = None
         self._transition("READY")
 
@@ -255,9 +314,10 @@ class RuntimeProcess(object):
             AssertionError: if not in :const:`ProcessState.READY` state
         """
         assert self._state == ProcessState.READY
-        self._log.debug(
-            "Start workload execution on processor %s", processor.name
-        )
+        if self._log_enabled:
+            self._log.debug(
+                "Start workload execution on processor %s", processor.name
+            )
         self.processor = processor
         self._transition("RUNNING")
 
@@ -268,10 +328,11 @@ class RuntimeProcess(object):
             AssertionError: if not in :const:`ProcessState.RUNNING` state
         """
         assert self._state == ProcessState.RUNNING
-        self._log.debug(
-            "Notify adapt workload execution on processor %s",
-            self.processor.name,
-        )
+        if self._log_enabled:
+            self._log.debug(
+                "Notify adapt workload execution on processor %s",
+                self.processor.name,
+            )
 
         old_event = self._interrupt
         self._interrupt = self.env.event()
@@ -287,9 +348,10 @@ class RuntimeProcess(object):
             AssertionError: if not in :const:`ProcessState.RUNNING` state
         """
         assert self._state == ProcessState.RUNNING
-        self._log.debug(
-            "Stop workload execution on processor %s", self.processor.name
-        )
+        if self._log_enabled:
+            self._log.debug(
+                "Stop workload execution on processor %s", self.processor.name
+            )
         self.processor = None
         self._transition("READY")
 
@@ -300,9 +362,11 @@ class RuntimeProcess(object):
             AssertionError: if not in :const:`ProcessState.RUNNING` state
         """
         assert self._state == ProcessState.RUNNING
-        self._log.debug(
-            "Preempt workload execution on processor %s", self.processor.name
-        )
+        if self._log_enabled:
+            self._log.debug(
+                "Preempt workload execution on processor %s",
+                self.processor.name,
+            )
         old_event = self._interrupt
         self._interrupt = self.env.event()
         old_event.succeed(InterruptSource.PREEMPT)
@@ -315,13 +379,15 @@ class RuntimeProcess(object):
         Raises:
             AssertionError: if not in :const:`ProcessState.RUNNING` state
         """
-        self._log.debug("Workload execution finished.")
+        if self._log_enabled:
+            self._log.debug("Workload execution finished.")
         self.processor = None
         self._transition("FINISHED")
 
     def kill(self):
         """Request termination of a running process"""
-        self._log.debug("Kill request")
+        if self._log_enabled:
+            self._log.debug("Kill request")
         if self._state == ProcessState.RUNNING:
             old_event = self._interrupt
             self._interrupt = self.env.event()
@@ -336,7 +402,8 @@ class RuntimeProcess(object):
         :const:`~ProcessState.BLOCKED` state.
         """
         assert self._state == ProcessState.RUNNING
-        self._log.debug("Process blocks")
+        if self._log_enabled:
+            self._log.debug("Process blocks")
         self.processor = None
         self._transition("BLOCKED")
 
@@ -355,7 +422,8 @@ class RuntimeProcess(object):
             return
 
         assert self._state == ProcessState.BLOCKED
-        self._log.debug("Process unblocks")
+        if self._log_enabled:
+            self._log.debug("Process unblocks")
         self.processor = None
         self._transition("READY")
 
@@ -392,11 +460,8 @@ class RuntimeProcess(object):
         assert self._state == ProcessState.FINISHED
         self._log.debug("Entered FINISHED state")
 
-        self.created.callbacks.remove(self._cb_created)
-        self.ready.callbacks.remove(self._cb_ready)
-        self.running.callbacks.remove(self._cb_running)
-        self.finished.callbacks.remove(self._cb_finished)
-        self.blocked.callbacks.remove(self._cb_blocked)
+        for index, event in enumerate(self._events):
+            event.callbacks.remove(getattr(self, _STATE_CALLBACKS[index]))
 
     def _cb_blocked(self, event):
         """Callback invoked upon entering the :const:`~ProcessState.BLOCKED`
@@ -442,7 +507,8 @@ class RuntimeDataflowProcess(RuntimeProcess):
         _channels(dict[str, RuntimeChannel]): Dictionary of channel names and
             there corresponding runtime object. This only includes channels
             that may be accessed by this process.
-        _trace (generator): a generator of trace segments
+        _trace (iterator): a seekable iterator over trace segments or a
+            :class:`~mocasin.common.trace.CompiledTraceCursor`
         _current_segment: The trace segment that is currently
             processed
     Args:
@@ -466,17 +532,23 @@ class RuntimeDataflowProcess(RuntimeProcess):
         self._current_segment = None
         self._remaining_compute_cycles = None
 
-        # a seekable iterator over all segments in the process trace
-        self._trace = more_itertools.seekable(
-            app_trace.get_trace(name), maxlen=16
-        )
+        if isinstance(app_trace, CompiledTrace):
+            # replay the compiled trace without creating segment objects
+            compiled_trace = app_trace.get_compiled_trace(name)
+            self._trace = compiled_trace.cursor()
+            self._total_cycles = compiled_trace.total_cycles()
+        else:
+            # a seekable iterator over all segments in the process trace
+            self._trace = more_itertools.seekable(
+                app_trace.get_trace(name), maxlen=16
+            )
+            self._total_cycles = app_trace.accumulate_processor_cycles(name)
 
         self._current_segment = None
         self._remaining_compute_cycles = None
 
         # keep track of the total cycles to process and the sum of cycles
         # already processed
-        self._total_cycles = app_trace.accumulate_processor_cycles(name)
         self._total_cycles_processed = {p: 0 for p in self._total_cycles.keys()}
 
         # lets the workload method know whether it is run for the first time
@@ -523,33 +595,37 @@ class RuntimeDataflowProcess(RuntimeProcess):
             AssertionError: if not in :const:`ProcessState.CREATED` state
         """
         assert self._state == ProcessState.CREATED
-        self._log.debug("Process starts.")
+        if self._log_enabled:
+            self._log.debug("Process starts.")
 
         self.processor = None
 
         if self._wait_for_initial_tokens:
-            # collect all initial read segments in the traces
-            initial_read_segments = []
+            # collect all initial reads in the traces. Note that only the
+            # channel and number of tokens are stored, as a compiled trace
+            # cursor reuses the same object for all segments.
+            initial_reads = []
             for segment in self._trace:
                 if segment.segment_type == SegmentType.READ_TOKEN:
                     # collect read segments
-                    initial_read_segments.append(segment)
+                    initial_reads.append((segment.channel, segment.num_tokens))
                 else:
                     break  # abort at the fist occurrence of any other segment
-                # reset the seekable iterator to its initial state
+            # reset the iterator to its initial state
             self._trace.seek(0)
 
-            # iterate over the initial read segments and see if we would need
+            # iterate over the initial reads and see if we would need
             # to block and wait for tokens in the channels
             channel_token_pairs = []
-            for segment in initial_read_segments:
-                channel = self._channels[segment.channel]()
-                if not channel.can_consume(self, segment.num_tokens):
-                    channel_token_pairs.append((channel, segment.num_tokens))
-                    self._log.debug(
-                        f"Process blocks because it needs {segment.num_tokens} "
-                        f"initial tokens in channel {segment.channel}"
-                    )
+            for channel_name, num_tokens in initial_reads:
+                channel = self._channels[channel_name]()
+                if not channel.can_consume(self, num_tokens):
+                    channel_token_pairs.append((channel, num_tokens))
+                    if self._log_enabled:
+                        self._log.debug(
+                            f"Process blocks because it needs {num_tokens} "
+                            f"initial tokens in channel {channel_name}"
+                        )
 
             if len(channel_token_pairs) > 0:
                 self.env.process(
@@ -570,9 +646,10 @@ class RuntimeDataflowProcess(RuntimeProcess):
             # wait for a token to be produced on any of the channels
             yield self.env.any_of(token_produced_events)
 
-        self._log.debug(
-            "Initial tokens are available now on all channels -> unblock"
-        )
+        if self._log_enabled:
+            self._log.debug(
+                "Initial tokens are available now on all channels -> unblock"
+            )
         self.unblock()
 
     def workload(self):
@@ -585,7 +662,8 @@ class RuntimeDataflowProcess(RuntimeProcess):
         execution is resumed on the next call of this method.
         """
 
-        self._log.debug("start workload execution")
+        if self._log_enabled:
+            self._log.debug("start workload execution")
 
         self._init_workload()
 
@@ -625,15 +703,18 @@ class RuntimeDataflowProcess(RuntimeProcess):
             if interrupt.triggered:
                 if interrupt.value == InterruptSource.KILL:
                     self._finish()
-                    self._log.debug("process was killed")
+                    if self._log_enabled:
+                        self._log.debug("process was killed")
                 elif interrupt.value == InterruptSource.PREEMPT:
                     self._deactivate()
-                    self._log.debug("process was preempted")
+                    if self._log_enabled:
+                        self._log.debug("process was preempted")
                 elif interrupt.value == InterruptSource.ADAPT:
-                    self._log.debug(
-                        "process was adapted during a segment of type %s",
-                        s.segment_type,
-                    )
+                    if self._log_enabled:
+                        self._log.debug(
+                            "process was adapted during a segment of type %s",
+                            s.segment_type,
+                        )
                     if s.segment_type == SegmentType.COMPUTE:
                         continue  # Must skip self._update_current_segment() as the compute segment has not finished
                 else:
@@ -647,7 +728,8 @@ class RuntimeDataflowProcess(RuntimeProcess):
             self._update_current_segment()
 
         # reached the end of the trace
-        self._log.debug("process terminates")
+        if self._log_enabled:
+            self._log.debug("process terminates")
         self._finish()
 
     def _init_workload(self):
@@ -655,11 +737,13 @@ class RuntimeDataflowProcess(RuntimeProcess):
 
         if self._is_running:
             # we are resuming from an earlier workload execution, nothing to do
-            self._log.debug("resume workload execution")
+            if self._log_enabled:
+                self._log.debug("resume workload execution")
         else:
             # we start up workload execution for the first time and need
             # to initialize the current trace segment
-            self._log.debug("init workload execution")
+            if self._log_enabled:
+                self._log.debug("init workload execution")
             self._is_running = True
             self._update_current_segment()
             self._remaining_compute_cycles = None
@@ -687,11 +771,15 @@ class RuntimeDataflowProcess(RuntimeProcess):
         # requests and process it only after the operation completes.
         s = self._current_segment
         c = self._channels[s.channel]()
-        self._log.debug(f"read {s.num_tokens} tokens from channel {s.channel}")
+        if self._log_enabled:
+            self._log.debug(
+                f"read {s.num_tokens} tokens from channel {s.channel}"
+            )
         if c.can_consume(self, s.num_tokens):
             return self.env.process(c.consume(self, s.num_tokens))
         else:
-            self._log.debug("not enough tokens available -> block")
+            if self._log_enabled:
+                self._log.debug("not enough tokens available -> block")
             self._block()
             self.env.process(c.wait_for_tokens(self, s.num_tokens))
             return None
@@ -702,11 +790,15 @@ class RuntimeDataflowProcess(RuntimeProcess):
         # processed after this operation completes.
         s = self._current_segment
         c = self._channels[s.channel]()
-        self._log.debug(f"write {s.num_tokens} tokens to channel {s.channel}")
+        if self._log_enabled:
+            self._log.debug(
+                f"write {s.num_tokens} tokens to channel {s.channel}"
+            )
         if c.can_produce(self, s.num_tokens):
             return self.env.process(c.produce(self, s.num_tokens))
         else:
-            self._log.debug("not enough slots available -> block")
+            if self._log_enabled:
+                self._log.debug("not enough slots available -> block")
             self._block()
             self.env.process(c.wait_for_slots(self, s.num_tokens))
             return None
@@ -724,7 +816,8 @@ class RuntimeDataflowProcess(RuntimeProcess):
             processor_cycles = self._remaining_compute_cycles
 
         cycles = processor_cycles[self.processor.type]
-        self._log.debug(f"process for {cycles} cycles")
+        if self._log_enabled:
+            self._log.debug(f"process for {cycles} cycles")
         ticks = self.processor.ticks(cycles)
 
         timeout = self.env.timeout(ticks)
@@ -762,9 +855,10 @@ class RuntimeDataflowProcess(RuntimeProcess):
 
                 # update total processed cycles
                 self._total_cycles_processed[processor] += cycles_processed
-            self._log.debug(
-                f"process was deactivated after {cycles_processed} cycles"
-            )
+            if self._log_enabled:
+                self._log.debug(
+                    f"process was deactivated after {cycles_processed} cycles"
+                )
 
     def get_progress(self):
         """Calculate how far the process has progressed its execution
@@ -28,6 +28,9 @@ class RuntimeSystem:
     Attributes:
         platform (Platform): the underlying platform of the system
         trace_writer (TraceWriter): a trace writer to record simulation traces
+        fast_path (bool): If true, runtime processes avoid the bookkeeping
+            overhead of state transitions that nobody observes. This needs to
+            be set before any process is created.
         _env: the simpy environment
         _processes (set(RuntimeProcess)): set of all processes that where
             executed by the system
@@ -57,6 +60,7 @@ class RuntimeSystem:
         self.app_trace_enabled = False
         self.platform_trace_enabled = False
         self.load_trace_cfg = None
+        self.fast_path = False
 
         self.energy_estimator = EnergyEstimator(platform, env)
 
@@ -272,6 +276,31 @@ class RuntimeSystem:
         """The simpy environment"""
         return self._env
 
+    def open_simulation_trace(self, path, buffer_size=10000):
+        """Stream a json trace of the simulated system to ``path``
+
+        This needs to be called before the simulation starts. The events are
+        written incrementally while the simulation runs, which keeps the
+        memory usage constant. Call :meth:`write_simulation_trace` with the
+        same path to finish the trace. If ``path`` ends with ``.gz``, the
+        trace is compressed.
+
+        Args:
+            path (str): path to the file that should be generated
+            buffer_size (int): number of events buffered before they are
+                written
+        """
+        self.trace_writer.open(path, buffer_size)
+
+    def close_simulation_trace(self):
+        """Finish a json trace opened with :meth:`open_simulation_trace`
+
+        This writes the remaining events and closes the file, such that the
+        trace remains readable even if the simulation was aborted. It does
+        nothing if the trace is not streamed or was already finished.
+        """
+        self.trace_writer.close()
+
     def write_simulation_trace(self, path):
         """Write a json trace of the simulated system to ``path``
 
@@ -24,10 +24,11 @@ def env():
     return simpy.Environment()
 
 
-@pytest.fixture
-def system(env, mocker):
+@pytest.fixture(params=[False, True], ids=["default", "fast_path"])
+def system(env, mocker, request):
     m = mocker.Mock()
     m.env = env
+    m.fast_path = request.param
     return m
 
 
@@ -7,7 +7,7 @@ import simpy
 
 import pytest
 from mocasin.common.mapping import ChannelMappingInfo
-from mocasin.common.platform import Primitive
+from mocasin.common.platform import FrequencyDomain, Primitive
 from mocasin.simulate.process import ProcessState
 
 
@@ -254,7 +254,8 @@ class TestRuntimeChannel:
 
         # setup the primitive
         prim = Primitive("test_prim")
-        channel._primitive = prim
+        info = ChannelMappingInfo(primitive=prim, capacity=4)
+        channel.update_mapping_info(info)
 
         # sink1 processor not added yet -> should fail
         with pytest.raises(RuntimeError):
@@ -282,6 +283,8 @@ class TestRuntimeChannel:
             p.resources = []
             phases.append(p)
         prim.consume_phases[sink1.processor.name] = phases
+        # the costs are cached until the mapping is updated
+        channel.update_mapping_info(info)
 
         event = channel.tokens_consumed
         process = env.process(channel.consume(sink1, 2))
@@ -301,6 +304,7 @@ class TestRuntimeChannel:
                 r.simpy_resource = simpy.Resource(env)
                 resources.append(r)
                 p.resources.append(r)
+        channel.update_mapping_info(info)
 
         start = env.now
         event = channel.tokens_consumed
@@ -368,6 +372,8 @@ class TestRuntimeChannel:
             p.resources = []
             phases.append(p)
         prim.produce_phases[src.processor.name] = phases
+        # the costs are cached until the mapping is updated
+        channel.update_mapping_info(info)
 
         event = channel.tokens_produced
         process = env.process(channel.produce(src, 2))
@@ -388,6 +394,7 @@ class TestRuntimeChannel:
                 r.simpy_resource = simpy.Resource(env)
                 resources.append(r)
                 p.resources.append(r)
+        channel.update_mapping_info(info)
 
         start = env.now
         event = channel.tokens_produced
@@ -413,3 +420,44 @@ class TestRuntimeChannel:
         assert env.now - start == 151
 
         assert all([r.simpy_resource.count == 0 for r in resources])
+
+    def test_consume_cached_costs(self, env, channel, running_process, mocker):
+        sink = running_process
+        src = mocker.Mock()
+        channel.set_src(src)
+        channel.add_sink(sink)
+        channel._fifo_state[sink.name] = 4
+
+        domain = FrequencyDomain("fd_test", 1000)
+        resource = mocker.Mock(frequency_domain=domain)
+        del resource.simpy_resource
+        phase = mocker.Mock()
+        phase.get_costs.return_value = 10
+        phase.direction = "read"
+        phase.resources = [resource]
+        prim = Primitive("test_prim")
+        prim.add_consumer(sink.processor, [phase])
+        channel.update_mapping_info(
+            ChannelMappingInfo(primitive=prim, capacity=4)
+        )
+
+        for _ in range(2):
+            env.process(channel.consume(sink, 1))
+            env.run()
+        # the costs are only calculated once
+        phase.get_costs.assert_called_once_with(8)
+        assert env.now == 20
+
+        # changing unrelated or unchanged frequencies keeps the costs
+        FrequencyDomain("fd_other", 1000).frequency = 2000
+        domain.frequency = 1000
+        env.process(channel.consume(sink, 1))
+        env.run()
+        phase.get_costs.assert_called_once_with(8)
+
+        # a frequency change of the phase's resources invalidates the costs
+        domain.frequency = 2000
+        env.process(channel.consume(sink, 1))
+        env.run()
+        assert phase.get_costs.call_count == 2
+        assert env.now == 40
@@ -9,6 +9,7 @@ import more_itertools
 import weakref
 
 from mocasin.common.trace import (
+    CompiledProcessTrace,
     ComputeSegment,
     ReadTokenSegment,
     WriteTokenSegment,
@@ -357,6 +358,38 @@ class TestRuntimeDataflowProcess:
         env.run()
         assert dataflow_process._state == ProcessState.BLOCKED
 
+    def test_workload_compiled_trace(
+        self, env, dataflow_process, processor, empty_channel
+    ):
+        trace = CompiledProcessTrace.from_segments(self.write_trace_generator())
+        dataflow_process._trace = trace.cursor()
+        env.run()
+        dataflow_process._channels["chan"] = weakref.ref(empty_channel)
+        dataflow_process.start()
+        env.run()
+        dataflow_process.activate(processor)
+        env.run()
+        finished = env.process(dataflow_process.workload())
+        env.run(finished)
+        assert dataflow_process._state == ProcessState.FINISHED
+        assert env.now == 5015
+
+    def test_workload_compiled_wait_for_initial_token(
+        self, env, dataflow_process, processor, empty_channel
+    ):
+        trace = CompiledProcessTrace.from_segments(
+            self.initial_read_trace_generator()
+        )
+        dataflow_process._wait_for_initial_tokens = True
+        dataflow_process._trace = trace.cursor()
+        env.run()
+        dataflow_process._channels["chan"] = weakref.ref(empty_channel)
+        dataflow_process.start()
+        env.run()
+        assert dataflow_process._state == ProcessState.BLOCKED
+        # the cursor is rewound after inspecting the initial reads
+        assert next(dataflow_process._trace).channel == "chan"
+
     def test_workload_write_block(
         self, env, dataflow_process, processor, full_channel
     ):
@@ -0,0 +1,91 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+import gzip
+import json
+
+import pytest
+
+from mocasin.simulate.trace_writer import TraceWriter
+
+
+def record_events(env, writer):
+    writer.begin_duration("cpu0", "p0", "compute", category="Process")
+    env.run(1000000)
+    writer.update_counter("load", "cpu0", [0.5], category="Load")
+    writer.end_duration("cpu0", "p0", "compute", args={"reason": "done"})
+    writer.begin_duration("cpu1", "p1", "compute")
+    env.run(2000000)
+    writer.end_duration("cpu1", "p1", "compute")
+
+
+def test_write_trace(env, tmpdir):
+    writer = TraceWriter(env)
+    record_events(env, writer)
+    path = str(tmpdir.join("trace.json"))
+    writer.write_trace(path)
+    with open(path) as f:
+        events = json.load(f)
+    phases = ["M", "M", "B", "M", "C", "E", "M", "M", "B", "E"]
+    assert [e["ph"] for e in events] == phases
+    assert events[5]["args"] == {"reason": "done"}
+    assert events[-1]["ts"] == 2.0
+
+
+@pytest.mark.parametrize("buffer_size", [1, 3, 100])
+@pytest.mark.parametrize("file_name", ["trace.json", "trace.json.gz"])
+def test_stream_trace(env, tmpdir, buffer_size, file_name):
+    reference = TraceWriter(env)
+    record_events(env, reference)
+    expected_path = str(tmpdir.join("expected.json"))
+    reference.write_trace(expected_path)
+    with open(expected_path) as f:
+        expected = json.load(f)
+
+    env = type(env)()
+    writer = TraceWriter(env)
+    path = str(tmpdir.join(file_name))
+    writer.open(path, buffer_size=buffer_size)
+    record_events(env, writer)
+    assert len(writer._trace) < buffer_size
+    writer.write_trace(path)
+
+    open_file = gzip.open if file_name.endswith(".gz") else open
+    with open_file(path, "rt") as f:
+        assert json.load(f) == expected
+
+
+def test_stream_trace_empty(env, tmpdir):
+    writer = TraceWriter(env)
+    path = str(tmpdir.join("trace.json"))
+    writer.open(path)
+    writer.close()
+    with open(path) as f:
+        assert json.load(f) == []
+
+
+def test_stream_trace_wrong_path(env, tmpdir):
+    writer = TraceWriter(env)
+    writer.open(str(tmpdir.join("trace.json")))
+    with pytest.raises(ValueError):
+        writer.write_trace(str(tmpdir.join("other.json")))
+    writer.close()
+
+
+def test_stream_trace_aborted(env, tmpdir):
+    writer = TraceWriter(env)
+    path = str(tmpdir.join("trace.json"))
+    writer.open(path, buffer_size=3)
+    with pytest.raises(RuntimeError):
+        try:
+            record_events(env, writer)
+            raise RuntimeError
+        finally:
+            writer.close()
+    with open(path) as f:
+        assert len(json.load(f)) == 10
+    # closing a finished trace does not modify the file
+    writer.write_trace(str(tmpdir.join("other.json")))
+    writer.close()
+    with open(path) as f:
+        assert len(json.load(f)) == 10
@@ -4,6 +4,7 @@
 # Authors: Christian Menard
 
 from dataclasses import dataclass, field
+import gzip
 import json
 import typing
 
@@ -29,11 +30,23 @@ class TraceWriter:
     given names are actually processes or threads. This allows custom grouping
     as suits the application.
 
+    By default, all events are kept in memory until :meth:`write_trace` is
+    called. For long simulations, call :meth:`open` before the simulation
+    starts. Then, the events are streamed to the output file in chunks of
+    `buffer_size` events, such that the memory usage stays constant. If the
+    file name ends with ``.gz``, the trace is compressed with gzip. The
+    trace viewer can open compressed traces directly.
+
     Attributes:
         _env: the simpy environment
-        _trace (list(dict)): the generated json trace
+        _trace (list(dict)): the events that were not yet written to a file
         _processes (dict(str, ProcessInfo)): all known processes
         _pid_counter (int): counter used to generate new process IDs
+        _file: the output file events are streamed to or ``None``
+        _path (str): the path of the output file or ``None``
+        _buffer_size (int): the number of events buffered before they are
+            written to the output file
+        _first_chunk (bool): true if no event was written to the output file
     Args:
         env: the simpy environment
     """
@@ -43,6 +56,67 @@ class TraceWriter:
         self._trace = []
         self._processes = {}
         self._pid_counter = 0
+        self._file = None
+        self._path = None
+        self._buffer_size = None
+        self._first_chunk = True
+        self._encoder = json.JSONEncoder(separators=(",", ":"))
+
+    @staticmethod
+    def _open_file(path):
+        if str(path).endswith(".gz"):
+            return gzip.open(path, "wt", compresslevel=6)
+        return open(path, "w")
+
+    def open(self, path, buffer_size=10000):
+        """Stream all events to a file
+
+        Events recorded before this call are written as well. The stream
+        needs to be finished by calling :meth:`close` or :meth:`write_trace`.
+
+        Args:
+            path (str): path to the output file. If it ends with ``.gz``, the
+                output is compressed.
+            buffer_size (int, optional): number of events that are buffered
+                before they are written to the file
+        """
+        if self._file is not None:
+            raise RuntimeError(f"The trace is already written to {self._path}")
+        self._file = self._open_file(path)
+        self._path = path
+        self._buffer_size = buffer_size
+        self._first_chunk = True
+        self._file.write("[")
+        self._flush()
+
+    def close(self):
+        """Write all buffered events and finish the output file"""
+        if self._file is None:
+            return
+        self._flush()
+        self._file.write("]\n")
+        self._file.close()
+        self._file = None
+        self._path = None
+
+    def _flush(self):
+        """Write the buffered events to the output file"""
+        if not self._trace:
+            return
+        # encode the whole chunk at once and strip the enclosing brackets
+        chunk = self._encoder.encode(self._trace)[1:-1]
+        if not self._first_chunk:
+            self._file.write(",")
+        self._file.write(chunk)
+        self._first_chunk = False
+        self._trace.clear()
+
+    def _append(self, event):
+        """Record an event"""
+        trace = self._trace
+        trace.append(event)
+        if self._file is not None and len(trace) >= self._buffer_size:
+            self._flush()
 
     def _add_new_process(self, name):
         """Register a new process and assign an ID
@@ -53,7 +127,7 @@ class TraceWriter:
         assert name not in self._processes
         pid = self._pid_counter
         self._pid_counter += 1
-        self._trace.append(
+        self._append(
             {
                 "name": "process_name",
                 "ph": "M",
@@ -74,7 +148,7 @@ class TraceWriter:
         pid = process_info.pid
         tid = process_info.tid_counter
         process_info.tid_counter += 1
-        self._trace.append(
+        self._append(
             {
                 "name": "thread_name",
                 "ph": "M",
@@ -149,9 +223,9 @@ class TraceWriter:
         if category is not None:
             event["cat"] = category
         if args is not None:
-            args["args"] = args
+            event["args"] = args
 
-        self._trace.append(event)
+        self._append(event)
 
     def end_duration(self, process, thread, name, category=None, args=None):
         """Generate an end duration event.
@@ -179,9 +253,9 @@ class TraceWriter:
         if category is not None:
             event["cat"] = category
         if args is not None:
-            args["args"] = args
+            event["args"] = args
 
-        self._trace.append(event)
+        self._append(event)
 
     def update_counter(self, process, counter, data, category=None):
         """Generate a counter event.
@@ -208,13 +282,25 @@ class TraceWriter:
         if category is not None:
             event["cat"] = category
 
-        self._trace.append(event)
+        self._append(event)
 
     def write_trace(self, path):
         """Write the trace to a file
 
+        If the trace is streamed to `path` already (see :meth:`open`), this
+        finishes the output file.
+
         Args:
-            path (str): path to the output file
+            path (str): path to the output file. If it ends with ``.gz``, the
+                output is compressed.
         """
-        with open(path, "w") as f:
+        if self._file is not None:
+            if path != self._path:
+                raise ValueError(
+                    f"The trace is streamed to {self._path} and cannot be "
+                    f"written to {path}"
+                )
+            self.close()
+            return
+        with self._open_file(path) as f:
             json.dump(self._trace, f)
@@ -117,6 +117,16 @@ def calculate_platform_symmetries(cfg):
     calculate_platform_symmetries(cfg)
 
 
+@hydra.main(
+    config_path="conf", config_name="convert_maps_trace", version_base="1.1"
+)
+def convert_maps_trace(cfg):
+    """Convert a MAPS trace to a binary format that is faster to replay"""
+    from mocasin.tasks.convert_maps_trace import convert_maps_trace
+
+    convert_maps_trace(cfg)
+
+
 @hydra.main(config_path="conf", config_name="simulate", version_base="1.1")
 def simulate(cfg):
     """Replay traces to simulate the execution of a dataflow application on a
@@ -0,0 +1,22 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+from mocasin.maps.trace import convert_trace
+
+
+def convert_maps_trace(cfg):
+    """Convert a MAPS trace directory to the binary trace format
+
+    The binary trace can be read by
+    :class:`~mocasin.maps.trace.MapsBinaryTrace` (``trace=maps_binary_reader``)
+    without parsing the text trace files.
+
+    Args:
+        cfg(~omegaconf.dictconfig.DictConfig): the hydra configuration object
+
+    **Hydra Parameters**:
+        * **trace_dir:** the directory containing the ``*.cpntrace`` files
+        * **output_file:** path of the binary trace file. If not set, the file
+          is written to ``trace.cpnbin`` in the trace directory.
+    """
+    convert_trace(cfg["trace_dir"], cfg["output_file"])
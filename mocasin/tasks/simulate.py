@@ -52,41 +52,50 @@ def simulate(cfg):
                     load_cfg["granularity"],
                     load_cfg["time_frame"],
                 )
+            if trace_cfg.get("stream", False):
+                simulation.system.open_simulation_trace(
+                    trace_cfg["file"], trace_cfg.get("buffer_size", 10000)
+                )
 
-        log.info("Start the simulation")
-        start = timeit.default_timer()
-        simulation.run()
-        stop = timeit.default_timer()
-        log.info("Simulation done")
-
-        result = simulation.result
-
-        exec_time = float(result.exec_time) / 1000000000.0
-        print("Total simulated time: " + str(exec_time) + " ms")
-        print("Total simulation time: " + str(stop - start) + " s")
-        summary = {}
-        summary["Total_simulated_time_ms"] = str(exec_time)
-        summary["Total_simulation_time_s"] = str(stop - start)
-
-        if result.total_energy is not None:
-            total_energy = float(result.total_energy) / 1000000000.0
-            static_energy = float(result.static_energy) / 1000000000.0
-            dynamic_energy = float(result.dynamic_energy) / 1000000000.0
-            avg_power = total_energy / exec_time
-            print(f"Total energy consumption: {total_energy:.9f} mJ")
-            print(f"      ---  static energy: {static_energy:.9f} mJ")
-            print(f"      --- dynamic energy: {dynamic_energy:.9f} mJ")
-            print(f"Average power: {avg_power:.6f} W")
-
-            summary["total_energy_mj"] = f"{total_energy:.9f}"
-            summary["static_energy_mj"] = f"{static_energy:.9f}"
-            summary["dynamic_energy_mj"] = f"{dynamic_energy:.9f}"
-            summary["avg_power_W"] = f"{avg_power:.6f}"
-
-        summary_to_file(summary)
-
-        if trace_cfg is not None and trace_cfg["file"] is not None:
-            simulation.system.write_simulation_trace(trace_cfg["file"])
+        try:
+            log.info("Start the simulation")
+            start = timeit.default_timer()
+            simulation.run()
+            stop = timeit.default_timer()
+            log.info("Simulation done")
+
+            result = simulation.result
+
+            exec_time = float(result.exec_time) / 1000000000.0
+            print("Total simulated time: " + str(exec_time) + " ms")
+            print("Total simulation time: " + str(stop - start) + " s")
+            summary = {}
+            summary["Total_simulated_time_ms"] = str(exec_time)
+            summary["Total_simulation_time_s"] = str(stop - start)
+
+            if result.total_energy is not None:
+                total_energy = float(result.total_energy) / 1000000000.0
+                static_energy = float(result.static_energy) / 1000000000.0
+                dynamic_energy = float(result.dynamic_energy) / 1000000000.0
+                avg_power = total_energy / exec_time
+                print(f"Total energy consumption: {total_energy:.9f} mJ")
+                print(f"      ---  static energy: {static_energy:.9f} mJ")
+                print(f"      --- dynamic energy: {dynamic_energy:.9f} mJ")
+                print(f"Average power: {avg_power:.6f} W")
+
+                summary["total_energy_mj"] = f"{total_energy:.9f}"
+                summary["static_energy_mj"] = f"{static_energy:.9f}"
+                summary["dynamic_energy_mj"] = f"{dynamic_energy:.9f}"
+                summary["avg_power_W"] = f"{avg_power:.6f}"
+
+            summary_to_file(summary)
+
+            if trace_cfg is not None and trace_cfg["file"] is not None:
+                simulation.system.write_simulation_trace(trace_cfg["file"])
+        finally:
+            # finish a streamed trace even if the simulation was aborted, so
+            # that it remains valid json
+            simulation.system.close_simulation_trace()
         hydra.utils.call(cfg["cleanup"])
 
 
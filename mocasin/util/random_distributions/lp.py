@@ -3,6 +3,7 @@
 #
 # Author: Andres Goens
 
+import numpy as np
 from scipy.stats import gengamma
 import random
 
@@ -11,22 +12,39 @@ import random
 # Calafiore, G., Dabbene, F. & Tempo, R. Uniform sample generation in l p balls for probabilistic robustness analysis.
 # def uniformFromLPBall():
 def p_norm(x, p):
-    res = sum(map(lambda t: abs(t) ** p, x))
+    """The p-norm of a vector, or of each row of a matrix"""
+    res = np.sum(np.abs(np.asarray(x)) ** p, axis=-1)
     return res ** (1 / p)
 
 
 def uniform_from_p_ball(p=1, n=2):
+    return uniform_from_p_ball_batch(p=p, n=n, num=1)[0]
+
+
+def uniform_from_p_ball_batch(p=1, n=2, num=1):
+    """Sample `num` points uniformly from the n-dimensional unit p-ball.
+
+    The random numbers are drawn in the same order as when sampling the
+    points one after another, so the generated points do not depend on the
+    batch size.
+
+    Returns:
+        numpy.ndarray: an array of shape (num, n) with one point per row
+    """
     a, c = 1 / p, p
     # 1. Sample n real scalars i.i.d. from the generalized Gamma distribution ξi ∼ G ̃ ( 1 , p). p
-    r = gengamma.rvs(a, c, size=n)
-    signs = random.choices([1, -1], k=n)
+    r = gengamma.rvs(a, c, size=(num, n))
+    signs = np.empty((num, n))
+    w = np.empty(num)
+    for i in range(num):
+        signs[i] = random.choices([1, -1], k=n)
+        w[i] = random.random()
     # 2. Construct a vector x ∈ Rn with components xi = siξi, where si are independent uniformly random signs.
-    vec = r * signs
+    vecs = r * signs
     # 3. Compute z = w1/n, where w is a random variable uniformly distributed in the interval [0,1].
-    z = random.random() ** (1 / n)
-    y = z * 1 / p_norm(vec, p) * vec
+    z = w ** (1 / n)
     # 4. Return y = z x , where ∥x∥p = (∑n |xi|p)1/p.
-    return y
+    return (z / p_norm(vecs, p))[:, None] * vecs
 
 
 if __name__ == "__main__":
@@ -0,0 +1,31 @@
+# Copyright (C) 2026 TU Dresden
+# Licensed under the ISC license (see LICENSE.txt)
+
+import random
+
+import numpy as np
+import pytest
+
+from mocasin.util.random_distributions import lp
+
+
+@pytest.mark.parametrize("p", [1, 2, 3.5])
+def test_uniform_from_p_ball_batch(p):
+    random.seed(42)
+    np.random.seed(42)
+    points = lp.uniform_from_p_ball_batch(p=p, n=5, num=200)
+    assert points.shape == (200, 5)
+    assert np.all(lp.p_norm(points, p) <= 1)
+
+    # the points are the same as when sampled one after another
+    random.seed(42)
+    np.random.seed(42)
+    single = [lp.uniform_from_p_ball(p=p, n=5) for _ in range(200)]
+    assert np.allclose(points, single)
+
+
+def test_p_norm():
+    assert lp.p_norm([3, -4], 2) == pytest.approx(5)
+    assert lp.p_norm([3, -4], 1) == pytest.approx(7)
+    norms = lp.p_norm(np.array([[3, -4], [0, 1]]), 2)
+    assert np.allclose(norms, [5, 1])
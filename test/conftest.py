@@ -66,6 +66,7 @@ def fast_mapper(request):
     params=[
         "genetic",
         "gradient_descent",
+        "parallel_tempering",
         "random_walk",
         "simulated_annealing",
         "tabu_search",